@@ -1,4 +1,5 @@
 import os
+import threading
 
 from dotenv import load_dotenv
 from flask import Flask
@@ -8,15 +9,14 @@ from flask_sqlalchemy import SQLAlchemy
 from core.configuration.configuration import get_app_version
 from core.managers.config_manager import ConfigManager
 from core.managers.error_handler_manager import ErrorHandlerManager
+from core.managers.instrumentation_manager import InstrumentationManager
 from core.managers.logging_manager import LoggingManager
 from core.managers.module_manager import ModuleManager
+from core.managers.profiler_manager import ProfilerManager
 
 # Load environment variables
 load_dotenv()
 
-if os.getenv("FAKENODO_URL"):
-    print("Running in FAKENODO mode")
-
 # Create the instances
 db = SQLAlchemy()
 migrate = Migrate()
@@ -33,6 +33,11 @@ def create_app(config_name: str = "development"):
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # Rate limiting (almacén según RATE_LIMIT_BACKEND)
+    from core.security.rate_limiter import init_rate_limiter
+
+    init_rate_limiter(app)
+
     # Register modules
     module_manager = ModuleManager(app)
     module_manager.register_modules()
@@ -46,13 +51,23 @@ def create_app(config_name: str = "development"):
 
     @login_manager.user_loader
     def load_user(user_id):
-        from app.modules.auth.models import User
+        from app.modules.auth.principal import load_principal
 
-        return User.query.get(int(user_id))
+        return load_principal(int(user_id))
 
     # Set up logging
     logging_manager = LoggingManager(app)
     logging_manager.setup_logging()
+    if os.getenv("FAKENODO_URL"):
+        app.logger.info("Running in FAKENODO mode")
+
+    # Consultas SQL y latencia por petición (Server-Timing, log y /metrics)
+    instrumentation_manager = InstrumentationManager(app)
+    instrumentation_manager.setup_instrumentation()
+
+    # Perfilado bajo demanda (sólo con PROFILER_TOKEN)
+    profiler_manager = ProfilerManager(app)
+    profiler_manager.setup_profiler()
 
     # Initialize error handler manager
     error_handler_manager = ErrorHandlerManager(app)
@@ -69,37 +84,48 @@ def create_app(config_name: str = "development"):
         }
 
     def _resolve_path(hubfile_id: int) -> str:
-        try:
-            from app.modules.hubfile.services import HubfileService
+        from app.modules.hubfile.locator import hubfile_locator
 
-            svc = HubfileService()
-            for meth in ("path_for", "get_path", "resolve_path", "file_path"):
-                if hasattr(svc, meth):
-                    return getattr(svc, meth)(hubfile_id)
-        except Exception:
-            pass
-
-        try:
-            from app.modules.dataset.repositories import HubfileRepository
-
-            repo = HubfileRepository()
-            hf = repo.get_by_id(hubfile_id)
-            for attr in ("path", "file_path", "storage_path", "absolute_path"):
-                p = getattr(hf, attr, None)
-                if p:
-                    return p
-        except Exception:
-            pass
-
-        raise RuntimeError(
-            f"No se pudo resolver la ruta del hubfile_id={hubfile_id}. "
-            "Implementa HubfileService.path_for() o asegúrate de que el repositorio expone una ruta."
-        )
+        path = hubfile_locator.resolve(hubfile_id)
+        if path is None:
+            raise RuntimeError(f"No se pudo resolver la ruta del hubfile_id={hubfile_id}.")
+        return path
 
     from app.modules.dataset.services.type_registration import register_dataset_types
 
     register_dataset_types(resolve_path_func=_resolve_path)
 
+    # Precarga del mapa DOI -> dataset; si la BD no está lista se carga en la primera petición
+    if app.config.get("DOI_RESOLVER_WARM_ON_STARTUP", True):
+        from app.modules.dataset.services.doi_resolver import doi_resolver
+
+        try:
+            with app.app_context():
+                doi_resolver.warm()
+        except Exception as exc:
+            app.logger.warning("DOI resolver not warmed at startup: %s", exc)
+
+    # Jobs de publicación en Zenodo sin terminar (reintentos incluidos) de una ejecución anterior. Se
+    # retoman con la primera petición y no en create_app: los hijos de los pools de procesos también
+    # importan la app y no deben lanzar publicaciones
+    if app.config.get("DEPOSITION_RESUME_ON_STARTUP", True):
+        resume_once = threading.Lock()
+
+        @app.before_request
+        def _resume_deposition_jobs():
+            # El lock no se libera nunca: solo la primera petición del proceso lo consigue
+            if not resume_once.acquire(blocking=False):
+                return
+            from app.modules.zenodo.services import deposition_job_service
+
+            try:
+                job_ids = deposition_job_service.resume_pending()
+            except Exception as exc:
+                app.logger.warning("Deposition jobs not resumed: %s", exc)
+                return
+            if job_ids:
+                app.logger.info("Resumed %d deposition job(s)", len(job_ids))
+
     return app
 
 
@@ -58,9 +58,13 @@ class User(db.Model, UserMixin):
 
 
 class UserTwoFactorRecoveryCode(db.Model):
+    __table_args__ = (db.Index("ix_recovery_code_user_id_code_hash", "user_id", "code_hash"),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
     encrypted_code = db.Column(db.String(512), nullable=False)
+    # HMAC del código normalizado (core.services.encryption.keyed_hash) para verificarlo sin descifrar
+    code_hash = db.Column(db.String(64), nullable=True)
 
 
 class UserFollowAuthor(db.Model):
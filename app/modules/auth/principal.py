@@ -0,0 +1,134 @@
+"""
+Principal autenticado: el usuario de la petición con su perfil y los conjuntos de autores y
+comunidades que sigue.
+
+``load_principal`` (el ``user_loader`` de Flask-Login) carga usuario y perfil en una sola consulta
+con ``joinedload``; los conjuntos de seguidos se cargan con una consulta la primera vez que se piden
+y se memorizan hasta el final de la petición.
+
+Con ``PRINCIPAL_CACHE_TTL > 0`` ambos resultados se guardan además entre peticiones durante ese
+número de segundos (caché en proceso). Los cambios de perfil, seguimientos y 2FA llaman a
+``invalidate_principal``; en despliegues con varios procesos el TTL acota lo que puede tardar en
+verse un cambio hecho en otro worker.
+"""
+
+import os
+import time
+from typing import FrozenSet, Optional, Tuple
+
+from flask import current_app, has_app_context, has_request_context, request
+from sqlalchemy import String, cast, inspect, literal, select, union_all
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
+from app.modules.auth.models import User, UserFollowAuthor, UserFollowCommunity
+from app.modules.profile.models import UserProfile
+from core.caching import LRUCache
+
+# En el environ de la petición y no en ``g``: el contexto de aplicación puede sobrevivir a la petición
+_REQUEST_FOLLOWS = "fifahub.principal_follows"
+
+_cache = LRUCache(int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024)))
+
+
+def _ttl() -> float:
+    return float(current_app.config.get("PRINCIPAL_CACHE_TTL", 0)) if has_app_context() else 0.0
+
+
+def _cache_get(key):
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+        _cache.pop(key)
+        return None
+    return value
+
+
+def _cache_put(key, value) -> None:
+    ttl = _ttl()
+    if ttl > 0:
+        _cache.put(key, (time.monotonic() + ttl, value))
+
+
+def _snapshot(instance) -> dict:
+    return {attr.key: getattr(instance, attr.key) for attr in inspect(instance).mapper.column_attrs}
+
+
+def _restore(model, values: dict):
+    """Reconstruye una instancia desde su snapshot y la adjunta a la sesión sin consultar la BD."""
+    instance = model.__mapper__.class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(instance, key, value)
+    make_transient_to_detached(instance)
+    return db.session.merge(instance, load=False)
+
+
+def load_principal(user_id: int) -> Optional[User]:
+    cached = _cache_get(("user", user_id))
+    if cached is not None:
+        user_values, profile_values = cached
+        user = _restore(User, user_values)
+        set_committed_value(user, "profile", _restore(UserProfile, profile_values) if profile_values else None)
+        return user
+
+    user = db.session.execute(
+        select(User).options(joinedload(User.profile)).where(User.id == user_id)
+    ).scalar_one_or_none()
+    if user is not None and _ttl() > 0:
+        _cache_put(("user", user_id), (_snapshot(user), _snapshot(user.profile) if user.profile else None))
+    return user
+
+
+def _follow_sets(user_id: int) -> Tuple[FrozenSet[int], FrozenSet[str]]:
+    memo = request.environ.setdefault(_REQUEST_FOLLOWS, {}) if has_request_context() else {}
+    if user_id in memo:
+        return memo[user_id]
+
+    follows = _cache_get(("follows", user_id))
+    if follows is None:
+        rows = db.session.execute(
+            union_all(
+                select(literal("author").label("kind"), cast(UserFollowAuthor.author_id, String).label("target")).where(
+                    UserFollowAuthor.user_id == user_id
+                ),
+                select(literal("community").label("kind"), UserFollowCommunity.community_id.label("target")).where(
+                    UserFollowCommunity.user_id == user_id
+                ),
+            )
+        ).all()
+        follows = (
+            frozenset(int(target) for kind, target in rows if kind == "author"),
+            frozenset(target for kind, target in rows if kind == "community"),
+        )
+        _cache_put(("follows", user_id), follows)
+    memo[user_id] = follows
+    return follows
+
+
+def followed_author_ids(user) -> FrozenSet[int]:
+    if user is None or not getattr(user, "is_authenticated", False):
+        return frozenset()
+    return _follow_sets(user.id)[0]
+
+
+def followed_community_ids(user) -> FrozenSet[str]:
+    if user is None or not getattr(user, "is_authenticated", False):
+        return frozenset()
+    return _follow_sets(user.id)[1]
+
+
+def invalidate_principal(user_id: Optional[int]) -> None:
+    """Descarta el principal de ``user_id`` de la caché entre peticiones y de la petición actual."""
+    if user_id is None:
+        return
+    _cache.pop(("user", user_id))
+    _cache.pop(("follows", user_id))
+    if has_request_context():
+        request.environ.get(_REQUEST_FOLLOWS, {}).pop(user_id, None)
+
+
+def clear_principal_cache() -> None:
+    _cache.clear()
@@ -1,3 +1,7 @@
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, union_all
+
 from app.modules.auth.models import User, UserFollowAuthor, UserFollowCommunity
 from core.repositories.BaseRepository import BaseRepository
 
@@ -20,6 +24,42 @@ class UserRepository(BaseRepository):
     def get_by_email(self, email: str):
         return self.model.query.filter_by(email=email).first()
 
+    def iter_follower_emails(
+        self, author_id: Optional[int] = None, community_id: Optional[str] = None, batch_size: int = 500
+    ) -> Iterator[List[Tuple[str, bool]]]:
+        """
+        Emails distintos de quienes siguen al autor y/o a la comunidad, en una sola consulta
+        (UNION ALL de ambas tablas de follows + GROUP BY email) leída por lotes con ``yield_per``.
+        Cada elemento es ``(email, sigue_al_autor)``; quien sigue a ambos aparece una vez, como seguidor del autor.
+        """
+        sources = []
+        if author_id is not None:
+            sources.append(
+                select(UserFollowAuthor.user_id.label("user_id"), literal(1).label("via_author")).where(
+                    UserFollowAuthor.author_id == author_id
+                )
+            )
+        if community_id:
+            sources.append(
+                select(UserFollowCommunity.user_id.label("user_id"), literal(0).label("via_author")).where(
+                    UserFollowCommunity.community_id == community_id
+                )
+            )
+        if not sources:
+            return
+
+        follows = (union_all(*sources) if len(sources) > 1 else sources[0]).subquery()
+        stmt = (
+            select(self.model.email, func.max(follows.c.via_author))
+            .join(follows, follows.c.user_id == self.model.id)
+            .where(self.model.email.isnot(None))
+            .group_by(self.model.email)
+            .order_by(self.model.email)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in self.session.execute(stmt).partitions():
+            yield [(email, bool(via_author)) for email, via_author in partition]
+
 
 class UserFollowAuthorRepository(BaseRepository):
     def __init__(self):
@@ -10,7 +10,7 @@ from app.modules.auth.forms import LoginForm, SignupForm, TwoFactorLoginForm, Tw
 from app.modules.auth.services import AuthenticationService, FollowService
 from app.modules.dataset.models import Author
 from app.modules.profile.services import UserProfileService
-from core.security.rate_limiter import check_rate_limit
+from core.security import check_rate_limit, client_identifier, rate_limit
 
 authentication_service = AuthenticationService()
 user_profile_service = UserProfileService()
@@ -53,20 +53,13 @@ def _increment_two_factor_attempts(pending: dict | None):
     return attempts, locked
 
 
-def _client_identifier() -> str:
-    forwarded = request.headers.get("X-Forwarded-For", "").split(",")[0].strip()
-    if forwarded:
-        return forwarded
-    return request.remote_addr or "unknown"
-
-
 def _enforce_two_factor_rate_limit(scope: str, *, api: bool, **kwargs):
     limit = current_app.config.get("TWO_FACTOR_RATE_LIMIT", 10)
     window = current_app.config.get("TWO_FACTOR_RATE_WINDOW", 60)
-    limited, retry_after = check_rate_limit(scope, _client_identifier(), limit, window)
+    limited, retry_after = check_rate_limit(scope, client_identifier(), limit, window)
     if not limited:
         return None
-    logger.warning("Rate limit exceeded for %s from %s", scope, _client_identifier())
+    logger.warning("Rate limit exceeded for %s from %s", scope, client_identifier())
     if api:
         response = jsonify({"message": RATE_LIMIT_MESSAGE})
         response.status_code = 429
@@ -109,6 +102,7 @@ def _render_two_factor_challenge(
 
 
 @auth_bp.route("/signup/", methods=["GET", "POST"])
+@rate_limit("signup", limit="AUTH_RATE_LIMIT", window="AUTH_RATE_WINDOW", methods=("POST",))
 def show_signup_form():
     if current_user.is_authenticated:
         return redirect(url_for("public.index"))
@@ -132,6 +126,7 @@ def show_signup_form():
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
+@rate_limit("login", limit="AUTH_RATE_LIMIT", window="AUTH_RATE_WINDOW", methods=("POST",))
 def login():
     if current_user.is_authenticated:
         return redirect(url_for("public.index"))
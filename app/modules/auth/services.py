@@ -2,7 +2,7 @@ import base64
 import os
 import secrets
 from io import BytesIO
-from typing import List
+from typing import FrozenSet, Iterator, List, Optional, Tuple
 
 import pyotp
 import qrcode
@@ -10,6 +10,7 @@ from flask_login import current_user, login_user
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.modules.auth.models import User, UserFollowAuthor, UserFollowCommunity, UserTwoFactorRecoveryCode
+from app.modules.auth.principal import followed_author_ids, followed_community_ids, invalidate_principal
 from app.modules.auth.repositories import (
     UserFollowAuthorRepository,
     UserFollowCommunityRepository,
@@ -20,7 +21,7 @@ from app.modules.profile.models import UserProfile
 from app.modules.profile.repositories import UserProfileRepository
 from core.configuration.configuration import uploads_folder_name
 from core.services.BaseService import BaseService
-from core.services.encryption import InvalidToken, decrypt_text, encrypt_text
+from core.services.encryption import InvalidToken, decrypt_text, encrypt_text, keyed_hash
 
 
 class AuthenticationService(BaseService):
@@ -75,6 +76,7 @@ class AuthenticationService(BaseService):
     def update_profile(self, user_profile_id, form):
         if form.validate():
             updated_instance = self.update(user_profile_id, **form.data)
+            invalidate_principal(getattr(updated_instance, "id", None))
             return updated_instance, None
 
         return None, form.errors
@@ -107,6 +109,7 @@ class AuthenticationService(BaseService):
         user.two_factor_enabled = False
         self._recovery_codes_query(user).delete()
         self.repository.session.commit()
+        invalidate_principal(user.id)
         return {
             "secret": secret,
             "otpauth_url": otpauth_url,
@@ -122,7 +125,7 @@ class AuthenticationService(BaseService):
         for _ in range(count):
             code = secrets.token_hex(5)
             encrypted = encrypt_text(code)
-            record = UserTwoFactorRecoveryCode(user_id=user.id, encrypted_code=encrypted)
+            record = UserTwoFactorRecoveryCode(user_id=user.id, encrypted_code=encrypted, code_hash=keyed_hash(code))
             self.repository.session.add(record)
             codes.append(code)
         return codes
@@ -147,18 +150,36 @@ class AuthenticationService(BaseService):
         if not candidate:
             raise ValueError("Código inválido")
 
-        records = self._recovery_codes_query(user).all()
+        # Una consulta indexada por (user_id, code_hash) y una comparación en tiempo constante
+        candidate_hash = keyed_hash(candidate)
+        record = self._recovery_codes_query(user).filter_by(code_hash=candidate_hash).first()
+        if record is None:
+            record = self._match_legacy_recovery_code(user, candidate)
+        if record is not None and secrets.compare_digest(record.code_hash or "", candidate_hash):
+            self.repository.session.delete(record)
+            self.repository.session.commit()
+            return True
+
+        raise ValueError("Código de recuperación inválido")
+
+    def _match_legacy_recovery_code(self, user: User, candidate: str) -> Optional[UserTwoFactorRecoveryCode]:
+        """
+        Códigos anteriores a ``code_hash`` que la migración no pudo rellenar: se descifran y se completan.
+        El relleno se confirma aunque el código no coincida, para no descifrarlos de nuevo en cada intento.
+        """
+        records = self._recovery_codes_query(user).filter(UserTwoFactorRecoveryCode.code_hash.is_(None)).all()
+        match = None
         for record in records:
             try:
                 stored = decrypt_text(record.encrypted_code).lower()
             except InvalidToken:
                 continue
-            if secrets.compare_digest(stored, candidate):
-                self.repository.session.delete(record)
-                self.repository.session.commit()
-                return True
-
-        raise ValueError("Código de recuperación inválido")
+            record.code_hash = keyed_hash(stored)
+            if match is None and secrets.compare_digest(stored, candidate):
+                match = record
+        if records:
+            self.repository.session.commit()
+        return match
 
     def verify_two_factor_setup(self, user: User, code: str) -> list[str]:
         if user is None:
@@ -174,6 +195,7 @@ class AuthenticationService(BaseService):
         user.two_factor_secret = encrypt_text(secret)
         codes = self._generate_recovery_codes(user)
         self.repository.session.commit()
+        invalidate_principal(user.id)
         return codes
 
     def complete_two_factor_login(self, user: User, code: str, remember: bool = True):
@@ -231,6 +253,7 @@ class AuthenticationService(BaseService):
         user.two_factor_secret = None
         self._recovery_codes_query(user).delete()
         self.repository.session.commit()
+        invalidate_principal(user.id)
         return method_used or "totp"
 
 
@@ -239,6 +262,7 @@ class FollowService(BaseService):
         super().__init__(UserFollowAuthorRepository())
         self.user_follow_author_repository = UserFollowAuthorRepository()
         self.user_follow_community_repository = UserFollowCommunityRepository()
+        self.user_repository = UserRepository()
 
     def _ensure_user(self, user: User):
         if user is None:
@@ -277,6 +301,8 @@ class FollowService(BaseService):
             )
         except SQLAlchemyError as exc:
             raise RuntimeError("Failed to follow author") from exc
+        finally:
+            invalidate_principal(user.id)
 
     def unfollow_author(self, user: User, author: Author) -> bool:
         self._ensure_user(user)
@@ -285,6 +311,8 @@ class FollowService(BaseService):
             return self.user_follow_author_repository.delete_by_user_and_author(user.id, author.id)
         except SQLAlchemyError as exc:
             raise RuntimeError("Failed to unfollow author") from exc
+        finally:
+            invalidate_principal(user.id)
 
     def follow_community(self, user: User, community) -> UserFollowCommunity:
         self._ensure_user(user)
@@ -299,6 +327,8 @@ class FollowService(BaseService):
             )
         except SQLAlchemyError as exc:
             raise RuntimeError("Failed to follow community") from exc
+        finally:
+            invalidate_principal(user.id)
 
     def unfollow_community(self, user: User, community) -> bool:
         self._ensure_user(user)
@@ -307,19 +337,28 @@ class FollowService(BaseService):
             return self.user_follow_community_repository.delete_by_user_and_community(user.id, community_id)
         except SQLAlchemyError as exc:
             raise RuntimeError("Failed to unfollow community") from exc
+        finally:
+            invalidate_principal(user.id)
 
     def get_followed_authors_for_user(self, user: User) -> List[Author]:
         self._ensure_user(user)
-        rows = self.user_follow_author_repository.get_for_user(user.id)
-        if not rows:
+        author_ids = self.get_followed_author_ids(user)
+        if not author_ids:
             return []
-        author_ids = [row.author_id for row in rows]
         return Author.query.filter(Author.id.in_(author_ids)).all()
 
     def get_followed_communities_for_user(self, user: User) -> List[str]:
         self._ensure_user(user)
-        rows = self.user_follow_community_repository.get_for_user(user.id)
-        return [row.community_id for row in rows]
+        return sorted(self.get_followed_community_ids(user))
+
+    def get_followed_author_ids(self, user: User) -> FrozenSet[int]:
+        """Ids de autores seguidos, memorizados durante la petición (ver ``app.modules.auth.principal``)."""
+        self._ensure_user(user)
+        return followed_author_ids(user)
+
+    def get_followed_community_ids(self, user: User) -> FrozenSet[str]:
+        self._ensure_user(user)
+        return followed_community_ids(user)
 
     def get_followers_for_author(self, author: Author) -> List[User]:
         self._ensure_author(author)
@@ -329,6 +368,14 @@ class FollowService(BaseService):
         user_ids = [row.user_id for row in rows]
         return User.query.filter(User.id.in_(user_ids)).all()
 
+    def iter_follower_emails(
+        self, author: Optional[Author] = None, community=None, batch_size: int = 500
+    ) -> Iterator[List[Tuple[str, bool]]]:
+        """Lotes de ``(email, sigue_al_autor)`` sin duplicados entre seguidores del autor y de la comunidad."""
+        author_id = getattr(author, "id", None)
+        community_id = self._normalize_community_id(community) if community else None
+        return self.user_repository.iter_follower_emails(author_id, community_id, batch_size=batch_size)
+
     def get_followers_for_community(self, community) -> List[User]:
         community_id = self._normalize_community_id(community)
         rows = self.user_follow_community_repository.get_for_community(community_id)
@@ -0,0 +1,73 @@
+import pytest
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.auth.principal import clear_principal_cache, followed_author_ids, load_principal
+from app.modules.auth.services import AuthenticationService, FollowService
+from app.modules.conftest import count_queries
+from app.modules.dataset.models import Author
+
+
+@pytest.fixture
+def principal_cache_ttl(test_app):
+    test_app.config["PRINCIPAL_CACHE_TTL"] = 60
+    clear_principal_cache()
+    yield
+    test_app.config["PRINCIPAL_CACHE_TTL"] = 0
+    clear_principal_cache()
+
+
+def _create_user(email: str) -> User:
+    return AuthenticationService().create_with_profile(name="Foo", surname="Bar", email=email, password="pwd12345")
+
+
+def test_load_principal_loads_profile_in_one_query(test_app, clean_database):
+    with test_app.app_context():
+        user_id = _create_user("principal1@example.com").id
+        db.session.expunge_all()
+
+        with count_queries() as statements:
+            user = load_principal(user_id)
+            assert user.profile.name == "Foo"
+        assert len(statements) == 1
+
+
+def test_follow_sets_memoized_per_request_and_invalidated_on_follow(test_app, clean_database):
+    with test_app.app_context():
+        user = _create_user("principal2@example.com")
+        author = Author(id=user.id + 100, name="Followed", affiliation="Test")
+        db.session.add(author)
+        db.session.commit()
+        db.session.refresh(user)
+        service = FollowService()
+
+        with test_app.test_request_context("/"):
+            with count_queries() as statements:
+                assert followed_author_ids(user) == frozenset()
+                assert service.get_followed_community_ids(user) == frozenset()
+            assert len(statements) == 1
+
+            service.follow_author(user, author)
+            assert service.get_followed_author_ids(user) == frozenset({author.id})
+
+
+def test_cross_request_cache_hits_until_invalidated(test_app, clean_database, principal_cache_ttl):
+    with test_app.app_context():
+        user_id = _create_user("principal3@example.com").id
+        load_principal(user_id)
+        db.session.expunge_all()
+
+        with count_queries() as statements:
+            user = load_principal(user_id)
+            assert user.email == "principal3@example.com"
+            assert user.profile.surname == "Bar"
+            assert user.two_factor_enabled is False
+        assert statements == []
+
+        service = AuthenticationService()
+        service.generate_two_factor_setup(user)
+        db.session.expunge_all()
+
+        with count_queries() as statements:
+            load_principal(user_id)
+        assert len(statements) == 1
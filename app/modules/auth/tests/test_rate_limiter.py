@@ -0,0 +1,214 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from core.security.rate_limiter import (
+    MemoryBackend,
+    RateLimiter,
+    RedisBackend,
+    SQLiteBackend,
+    rate_limit,
+    sliding_window,
+    token_bucket,
+)
+
+
+class FakeRedis:
+    """Lo justo del cliente redis-py para RedisBackend: pipeline con WATCH/MULTI y SET con PX."""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+    def scan_iter(self, match="*"):
+        prefix = match.rstrip("*")
+        return [key for key in list(self.data) if key.startswith(prefix)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class _FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        self.server.lock.acquire()
+
+    def get(self, key):
+        value = self.server.data.get(key)
+        return value[0].encode() if value else None
+
+    def multi(self):
+        pass
+
+    def set(self, key, value, px=None):
+        self.pending.append((key, value, px))
+
+    def execute(self):
+        try:
+            for key, value, px in self.pending:
+                self.server.data[key] = (value, px)
+        finally:
+            self.server.lock.release()
+
+
+def test_sliding_window_weights_previous_window():
+    state = None
+    for _ in range(10):
+        state, limited, _, _ = sliding_window(state, 100.0, 10, 60)
+        assert not limited
+    state, limited, retry_after, _ = sliding_window(state, 110.0, 10, 60)
+    assert limited and retry_after >= 1
+
+    # Mitad de la ventana siguiente: la anterior pesa 5, quedan 5 peticiones
+    allowed = 0
+    for _ in range(10):
+        state, limited, _, _ = sliding_window(state, 150.0, 10, 60)
+        allowed += not limited
+    assert allowed == 5
+
+
+def test_token_bucket_refills_over_time():
+    state = None
+    for _ in range(3):
+        state, limited, _, _ = token_bucket(state, 0.0, 3, 30)
+        assert not limited
+    state, limited, retry_after, _ = token_bucket(state, 0.0, 3, 30)
+    assert limited and retry_after == 10
+    state, limited, _, _ = token_bucket(state, 10.0, 3, 30)
+    assert not limited
+
+
+def test_memory_backend_expires_and_caps_keys():
+    backend = MemoryBackend(shards=4, max_keys=40, sweep_interval=0)
+    for i in range(200):
+        backend.hit(f"scan:10.0.0.{i}", 5, 1, sliding_window, now=0.0)
+    assert len(backend) <= 40
+
+    # Las entradas caducadas se barren al volver a tocar cada shard
+    for i in range(20):
+        backend.hit(f"scan:10.0.1.{i}", 5, 1, sliding_window, now=10.0)
+    assert len(backend) == 20
+
+
+def test_memory_backend_is_consistent_under_threads():
+    limiter = RateLimiter(MemoryBackend(shards=8))
+    results = []
+
+    def worker():
+        for _ in range(50):
+            results.append(limiter.hit("login", "1.2.3.4", 100, 60)[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(False) == 100
+
+
+@pytest.mark.parametrize("algorithm", ["sliding_window", "token_bucket"])
+def test_sqlite_backend_is_shared_between_instances(tmp_path, algorithm):
+    path = str(tmp_path / "rate.sqlite3")
+    first = RateLimiter(SQLiteBackend(path), algorithm=algorithm)
+    second = RateLimiter(SQLiteBackend(path), algorithm=algorithm)
+
+    assert not first.hit("download", "1.2.3.4", 2, 60)[0]
+    assert not first.hit("download", "1.2.3.4", 2, 60)[0]
+    limited, retry_after = second.hit("download", "1.2.3.4", 2, 60)
+    assert limited and retry_after >= 1
+    assert not second.hit("download", "5.6.7.8", 2, 60)[0]
+
+    first.reset()
+    assert not second.hit("download", "1.2.3.4", 2, 60)[0]
+
+
+def test_redis_backend_sets_expiry():
+    server = FakeRedis()
+    limiter = RateLimiter(RedisBackend(server))
+    assert not limiter.hit("explore", "1.2.3.4", 1, 30)[0]
+    assert limiter.hit("explore", "1.2.3.4", 1, 30)[0]
+    _, px = server.data["ratelimit:explore:1.2.3.4"]
+    assert px == 60_000
+
+    limiter.reset()
+    assert server.data == {}
+
+
+def test_decorator_returns_429_with_retry_after(monkeypatch):
+    from core.security import rate_limiter
+
+    monkeypatch.setattr(rate_limiter, "limiter", RateLimiter(MemoryBackend()))
+    app = Flask(__name__)
+    app.config.update(RATE_LIMIT_TRUSTED_PROXIES=1, PING_LIMIT=2)
+
+    @app.route("/ping")
+    @rate_limit("ping", limit="PING_LIMIT", window=60)
+    def ping():
+        return "pong"
+
+    client = app.test_client()
+    headers = {"X-Forwarded-For": "6.6.6.6, 10.0.0.1"}
+    assert client.get("/ping", headers=headers).status_code == 200
+    assert client.get("/ping", headers=headers).status_code == 200
+    response = client.get("/ping", headers=headers, environ_base={"REMOTE_ADDR": "10.0.0.9"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    # Falsear la primera entrada de X-Forwarded-For no cambia de cubo
+    spoofed = {"X-Forwarded-For": "7.7.7.7, 10.0.0.1"}
+    assert client.get("/ping", headers=spoofed).status_code == 429
+    assert client.get("/ping", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 200
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(monkeypatch):
+    from core.security import rate_limiter
+
+    monkeypatch.setattr(rate_limiter, "limiter", RateLimiter(MemoryBackend()))
+    app = Flask(__name__)
+    app.config.update(PING_LIMIT=1)
+
+    @app.route("/ping")
+    @rate_limit("ping", limit="PING_LIMIT", window=60)
+    def ping():
+        return "pong"
+
+    client = app.test_client()
+    assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+    # Cambiar la cabecera en cada petición no abre un cubo nuevo: cuenta remote_addr
+    assert client.get("/ping", headers={"X-Forwarded-For": "2.2.2.2"}).status_code == 429
+
+
+def test_production_config_keys_clients_behind_one_proxy(monkeypatch):
+    from core.managers.config_manager import ProductionConfig
+    from core.security import rate_limiter
+
+    monkeypatch.setattr(rate_limiter, "limiter", RateLimiter(MemoryBackend()))
+    app = Flask(__name__)
+    app.config.from_object(ProductionConfig)
+    app.config.update(PING_LIMIT=1)
+
+    @app.route("/ping")
+    @rate_limit("ping", limit="PING_LIMIT", window=60)
+    def ping():
+        return "pong"
+
+    # Todas las peticiones llegan desde nginx; cada cliente trae su propia entrada en X-Forwarded-For
+    client = app.test_client()
+    nginx = {"REMOTE_ADDR": "172.18.0.5"}
+    assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}, environ_base=nginx).status_code == 200
+    assert client.get("/ping", headers={"X-Forwarded-For": "2.2.2.2"}, environ_base=nginx).status_code == 200
+    assert client.get("/ping", headers={"X-Forwarded-For": "1.1.1.1"}, environ_base=nginx).status_code == 429
@@ -184,6 +184,49 @@ def test_recovery_code_invalid_value(test_app, clean_database):
         assert service.use_recovery_code(user, codes[1]) is True
 
 
+def test_recovery_code_verified_without_decrypting(test_app, clean_database, monkeypatch):
+    with test_app.app_context():
+        service, user, codes = _prepare_user_with_two_factor("recover6@example.com")
+
+        def fail(*args, **kwargs):
+            raise AssertionError("recovery codes must be matched by hash")
+
+        monkeypatch.setattr("app.modules.auth.services.decrypt_text", fail)
+        assert service.use_recovery_code(user, codes[2].upper()) is True
+        with pytest.raises(ValueError):
+            service.use_recovery_code(user, "0000000000")
+
+
+def test_legacy_recovery_code_without_hash_is_backfilled(test_app, clean_database):
+    from app.modules.auth.models import UserTwoFactorRecoveryCode
+
+    with test_app.app_context():
+        service, user, codes = _prepare_user_with_two_factor("recover7@example.com")
+        service._recovery_codes_query(user).update({"code_hash": None})
+        service.repository.session.commit()
+
+        assert service.use_recovery_code(user, codes[3]) is True
+        remaining = service._recovery_codes_query(user).all()
+        assert len(remaining) == 7
+        assert all(record.code_hash for record in remaining)
+        assert UserTwoFactorRecoveryCode.query.filter_by(user_id=user.id, code_hash=None).count() == 0
+
+
+def test_legacy_backfill_is_kept_after_a_wrong_code(test_app, clean_database):
+    from app.modules.auth.models import UserTwoFactorRecoveryCode
+
+    with test_app.app_context():
+        service, user, _codes = _prepare_user_with_two_factor("recover8@example.com")
+        service._recovery_codes_query(user).update({"code_hash": None})
+        service.repository.session.commit()
+
+        with pytest.raises(ValueError):
+            service.use_recovery_code(user, "0000000000")
+        service.repository.session.rollback()
+
+        assert UserTwoFactorRecoveryCode.query.filter_by(user_id=user.id, code_hash=None).count() == 0
+
+
 @pytest.fixture(autouse=True)
 def set_two_factor_key(monkeypatch):
     monkeypatch.setenv("TWO_FACTOR_ENCRYPTION_KEY", "test-two-factor-key")
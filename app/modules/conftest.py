@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
 
 from app import create_app, db
 from app.modules.auth.models import User
@@ -87,3 +90,23 @@ def logout(test_client):
         response: Response to GET request to log out.
     """
     return test_client.get("/logout", follow_redirects=True)
+
+
+@contextmanager
+def count_queries():
+    """
+    Records the SQL statements executed on the app's engine inside the block.
+
+    Yields:
+        list: Statements executed so far; it keeps growing while the block runs.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
@@ -1,26 +1,150 @@
-from flask import jsonify
+from flask import Response, current_app, jsonify, request, stream_with_context, url_for
+from sqlalchemy import func
 
-from app.modules.dataset.models import BaseDataset
+from app import db
+from app.modules.dataset.models import BaseDataset, DSMetaData
+from app.modules.dataset.services.catalog_export import CatalogExporter, parse_watermark
+from core.decorators import Validators, conditional, make_etag
+from core.security import rate_limit
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+MAX_PAGE_SIZE = 1000
+# Filas por consulta al recorrer el catálogo completo
+BATCH_SIZE = 500
+
+
+def _positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise ValueError(value)
+    return number
+
+
+def _projection_page(after_id, limit):
+    """Una página (id desc) con sólo las columnas del listado: sin objetos ORM ni carga perezosa."""
+    table = BaseDataset.__table__
+    query = (
+        db.select(table.c.id, table.c.type, DSMetaData.title, table.c.rows_count)
+        .outerjoin(DSMetaData, DSMetaData.id == table.c.ds_meta_data_id)
+        .order_by(table.c.id.desc())
+        .limit(limit)
+    )
+    if after_id is not None:
+        query = query.where(table.c.id < after_id)
+    return db.session.execute(query).all()
+
+
+def _iter_projection(after_id=None):
+    while True:
+        rows = _projection_page(after_id, BATCH_SIZE)
+        yield from rows
+        if len(rows) < BATCH_SIZE:
+            return
+        after_id = rows[-1].id
+
+
+def _as_item(row):
+    item = {"id": row.id, "type": row.type, "title": row.title}
+    if row.type == "tabular":
+        item["rows_count"] = row.rows_count
+    return item
+
+
+def _encode_array(rows):
+    dumps = current_app.json.dumps
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + dumps(_as_item(row))
+    yield "]\n"
+
+
+def _encode_ndjson(rows):
+    dumps = current_app.json.dumps
+    for row in rows:
+        yield dumps(_as_item(row)) + "\n"
+
+
+def _wants_ndjson():
+    return request.args.get("format") == "ndjson" or request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _collection_validators():
+    # Alta, baja o cambio de cualquier dataset mueve alguno de los tres valores
+    count, max_id, revisions = db.session.execute(
+        db.select(func.count(BaseDataset.id), func.max(BaseDataset.id), func.sum(BaseDataset.revision))
+    ).one()
+    # Cada página y cada formato es una representación distinta
+    page = (request.args.get("limit"), request.args.get("after_id"))
+    fmt = "ndjson" if _wants_ndjson() else "json"
+    return Validators(make_etag("datasets", count, max_id, revisions, fmt, *page))
+
+
+def _dataset_validators(dataset_id):
+    # La vista reutiliza el objeto del identity map: no hay consulta extra
+    dataset = db.session.get(BaseDataset, dataset_id)
+    if dataset is None:
+        return None
+    return Validators(make_etag("dataset", dataset.id, dataset.revision, dataset.download_count))
 
 
 def init_blueprint_api(bp):
     @bp.route("/api/datasets-polymorphic", methods=["GET"])
+    @conditional(_collection_validators, vary=("Accept",))
     def list_polymorphic():
-        items = BaseDataset.query.order_by(BaseDataset.id.desc()).all()
+        """
+        Catálogo ``[{id, type, title[, rows_count]}]`` ordenado por id descendente.
+
+        ``?limit=N&after_id=X`` pagina por clave (siguiente página en la cabecera ``Link``);
+        sin ``limit`` se devuelve el catálogo completo. ``?format=ndjson`` (o ``Accept:
+        application/x-ndjson``) devuelve un objeto por línea. La respuesta se genera por lotes.
+        """
+        limit = request.args.get("limit", type=_positive_int)
+        after_id = request.args.get("after_id", type=_positive_int)
+        if ("limit" in request.args and limit is None) or ("after_id" in request.args and after_id is None):
+            return jsonify({"message": "limit and after_id must be positive integers"}), 400
+
+        headers = {}
+        if limit is not None:
+            limit = min(limit, MAX_PAGE_SIZE)
+            rows = _projection_page(after_id, limit)
+            if len(rows) == limit:
+                next_url = url_for(request.endpoint, **{**request.args.to_dict(), "after_id": rows[-1].id})
+                headers["Link"] = f'<{next_url}>; rel="next"'
+            rows = iter(rows)
+        else:
+            rows = _iter_projection(after_id)
+
+        if _wants_ndjson():
+            body, mimetype = _encode_ndjson(rows), NDJSON_MIMETYPE
+        else:
+            body, mimetype = _encode_array(rows), "application/json"
+        return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
 
-        def as_dict(ds):
-            data = {
-                "id": ds.id,
-                "type": ds.type,
-                "title": ds.ds_meta_data.title if ds.ds_meta_data else None,
-            }
-            if ds.type == "tabular":
-                data["rows_count"] = getattr(ds, "rows_count", None)
-            return data
+    @bp.route("/api/datasets/export", methods=["GET"])
+    @rate_limit("export", limit="EXPORT_RATE_LIMIT", window="EXPORT_RATE_WINDOW")
+    def export_catalog():
+        """
+        Volcado NDJSON del catálogo completo (``?compression=gzip`` para gzip). Con
+        ``?updated_since=<ISO 8601>`` sólo lo creado o modificado desde entonces; la cabecera
+        ``X-Export-Watermark`` es el valor para la siguiente sincronización (se solapa con esta: deduplicar por
+        id+revision).
+        """
+        try:
+            updated_since = parse_watermark(request.args.get("updated_since"))
+        except ValueError:
+            return jsonify({"message": "updated_since must be an ISO 8601 date"}), 400
 
-        return jsonify([as_dict(x) for x in items])
+        exporter = CatalogExporter(updated_since=updated_since)
+        headers = {"X-Export-Watermark": exporter.watermark.isoformat() + "Z"}
+        if request.args.get("compression") == "gzip":
+            headers["Content-Disposition"] = "attachment; filename=datasets.ndjson.gz"
+            body, mimetype = exporter.iter_gzip(), "application/gzip"
+        else:
+            body, mimetype = exporter.iter_ndjson(), NDJSON_MIMETYPE
+        return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
 
     @bp.route("/api/datasets/<int:dataset_id>", methods=["GET"])
+    @conditional(_dataset_validators)
     def dataset_detail(dataset_id):
         dataset = BaseDataset.query.get_or_404(dataset_id)
         payload = {
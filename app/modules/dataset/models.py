@@ -1,8 +1,10 @@
 from datetime import datetime
 from enum import Enum
+from itertools import chain
 
 from flask import request
 from sqlalchemy import Enum as SQLAlchemyEnum
+from sqlalchemy import event, inspect
 
 from app import db
 
@@ -30,6 +32,9 @@ class PublicationType(Enum):
 
 
 class Author(db.Model):
+    # Sólo en SQLite: InnoDB ya indexa las claves foráneas
+    __table_args__ = (db.Index("ix_author_ds_meta_data_id", "ds_meta_data_id").ddl_if(dialect="sqlite"),)
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     affiliation = db.Column(db.String(120))
@@ -43,8 +48,8 @@ class Author(db.Model):
 
 class DSMetrics(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    number_of_models = db.Column(db.String(120))
-    number_of_features = db.Column(db.String(120))
+    number_of_models = db.Column(db.Integer)
+    number_of_features = db.Column(db.Integer)
 
     def __repr__(self):
         return f"DSMetrics<models={self.number_of_models}, features={self.number_of_features}>"
@@ -57,7 +62,7 @@ class DSMetaData(db.Model):
     description = db.Column(db.Text, nullable=False)
     publication_type = db.Column(SQLAlchemyEnum(PublicationType), nullable=False)
     publication_doi = db.Column(db.String(120))
-    dataset_doi = db.Column(db.String(120))
+    dataset_doi = db.Column(db.String(120), index=True)
     tags = db.Column(db.String(120))
     ds_metrics_id = db.Column(db.Integer, db.ForeignKey("ds_metrics.id"))
     ds_metrics = db.relationship("DSMetrics", uselist=False, backref="ds_meta_data", cascade="all, delete")
@@ -66,6 +71,8 @@ class DSMetaData(db.Model):
 
 class BaseDataset(db.Model):
     __tablename__ = "data_set"
+    # Listados "mis datasets" (sincronizados / sin sincronizar) ordenados por fecha
+    __table_args__ = (db.Index("ix_data_set_user_id_created_at", "user_id", "created_at"),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
@@ -74,6 +81,9 @@ class BaseDataset(db.Model):
     type = db.Column(db.String(50), nullable=False, server_default="uvl", index=True)
     view_count = db.Column(db.Integer, nullable=False, default=0, server_default="0", index=True)
     download_count = db.Column(db.Integer, nullable=False, default=0, server_default="0", index=True)
+    # Se incrementa en cada cambio de contenido (ver _bump_dataset_revisions); invalida los fragmentos cacheados
+    revision = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    updated_at = db.Column(db.DateTime, nullable=True)
 
     ds_meta_data = db.relationship("DSMetaData", backref=db.backref("data_set", uselist=False))
 
@@ -162,6 +172,14 @@ class UVLDataset(BaseDataset):
             "files_count": self.get_files_count(),
             "total_size_in_bytes": self.get_file_total_size(),
             "total_size_in_human_format": self.get_file_total_size_for_human(),
+            "metrics": self.get_metrics(),
+        }
+
+    def get_metrics(self):
+        metrics = self.ds_meta_data.ds_metrics
+        return {
+            "number_of_models": metrics.number_of_models if metrics else None,
+            "number_of_features": metrics.number_of_features if metrics else None,
         }
 
     def __repr__(self):
@@ -185,6 +203,10 @@ class DSDownloadRecord(db.Model):
 
 
 class DSViewRecord(db.Model):
+    __table_args__ = (
+        db.Index("ix_ds_view_record_dataset_id_view_cookie_user_id", "dataset_id", "view_cookie", "user_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     dataset_id = db.Column(db.Integer, db.ForeignKey("data_set.id"))
@@ -196,6 +218,9 @@ class DSViewRecord(db.Model):
 
 
 class DOIMapping(db.Model):
+    # Índice de cobertura: la resolución de un DOI antiguo no necesita leer la fila
+    __table_args__ = (db.Index("ix_doi_mapping_dataset_doi_old_dataset_doi_new", "dataset_doi_old", "dataset_doi_new"),)
+
     id = db.Column(db.Integer, primary_key=True)
     dataset_doi_old = db.Column(db.String(120))
     dataset_doi_new = db.Column(db.String(120))
@@ -219,3 +244,75 @@ class DatasetVersion(db.Model):
 
     def __repr__(self):
         return f"DatasetVersion<{self.dataset_id}:{self.version}>"
+
+
+# ---------------------------------------------------------------------------
+# Revisión de datasets
+# ---------------------------------------------------------------------------
+# Columnas de data_set que cambian sin alterar lo que se muestra en la ficha del dataset
+REVISION_IGNORED_ATTRS = frozenset({"view_count", "download_count", "revision", "updated_at"})
+
+# tabla -> [(relación hacia el padre, clave ajena de respaldo)]. Se recorre hasta llegar al dataset.
+_REVISION_PARENTS = {
+    "ds_meta_data": [("data_set", None)],
+    "ds_metrics": [("ds_meta_data", None)],
+    "author": [("ds_meta_data", "ds_meta_data_id")],
+    "dataset_version": [("dataset", "dataset_id")],
+    "feature_model": [("data_set", "data_set_id")],
+    "fm_meta_data": [("feature_model", None)],
+    "fm_metrics": [("fm_meta_data", None)],
+    "file": [("feature_model", "feature_model_id")],
+    "tabular_meta_data": [("dataset", "dataset_id")],
+    "tabular_column": [("meta_data", "meta_id")],
+}
+
+
+def _parents(session, obj, relationship: str, foreign_key):
+    value = getattr(obj, relationship, None)
+    if value is None and foreign_key and getattr(obj, foreign_key, None) is not None:
+        # Objeto pendiente creado sólo con la clave ajena: la relación no se carga todavía
+        target = inspect(obj).mapper.relationships[relationship].mapper.class_
+        value = session.get(target, getattr(obj, foreign_key))
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _owning_datasets(session, obj):
+    if isinstance(obj, BaseDataset):
+        yield obj
+        return
+    for relationship, foreign_key in _REVISION_PARENTS.get(getattr(obj, "__tablename__", None), ()):
+        for parent in _parents(session, obj, relationship, foreign_key):
+            yield from _owning_datasets(session, parent)
+
+
+def _content_changed(dataset) -> bool:
+    state = inspect(dataset)
+    return any(attr.key not in REVISION_IGNORED_ATTRS and attr.history.has_changes() for attr in state.attrs)
+
+
+@event.listens_for(db.session, "before_flush")
+def _bump_dataset_revisions(session, flush_context, instances):
+    """
+    Incrementa ``revision`` (y ``updated_at``) de los datasets cuyo contenido o el de sus objetos
+    dependientes (metadatos, autores, modelos, ficheros, versiones, columnas) cambia en este flush.
+    Los contadores de vistas/descargas no cuentan como cambio.
+    """
+    touched = {}
+    with session.no_autoflush:
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if isinstance(obj, BaseDataset):
+                if obj in session.dirty and not _content_changed(obj):
+                    continue
+            elif obj in session.dirty and not session.is_modified(obj):
+                continue
+            for dataset in _owning_datasets(session, obj):
+                touched[id(dataset)] = dataset
+
+    now = datetime.utcnow()
+    for dataset in touched.values():
+        if dataset in session.new or dataset in session.deleted:
+            continue
+        dataset.revision = (dataset.revision or 0) + 1
+        dataset.updated_at = now
@@ -64,6 +64,21 @@ class DataSetRepository(BaseRepository):
     def __init__(self):
         super().__init__(DataSet)
 
+    def stats(self, dataset_id: int):
+        """(id, revision, download_count, views) en una consulta; ``None`` si no existe."""
+        views = (
+            self.model.query.session.query(func.count(DSViewRecord.id))
+            .filter(DSViewRecord.dataset_id == self.model.id)
+            .scalar_subquery()
+        )
+        return (
+            self.model.query.with_entities(
+                self.model.id, self.model.revision, self.model.download_count, views.label("views")
+            )
+            .filter(self.model.id == dataset_id)
+            .first()
+        )
+
     def get_synchronized(self, current_user_id: int) -> DataSet:
         return (
             self.model.query.join(DSMetaData)
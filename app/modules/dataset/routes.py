@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import shutil
@@ -16,28 +15,31 @@ from app import db
 from app.modules.auth.services import FollowService
 from app.modules.dataset import dataset_bp
 from app.modules.dataset.forms import DataSetForm
-from app.modules.dataset.models import Author, BaseDataset, DatasetVersion, DSMetaData
+from app.modules.dataset.models import Author, BaseDataset, DSMetaData
 from app.modules.dataset.services import (
     AuthorService,
     DataSetService,
-    DOIMappingService,
     DSDownloadRecordService,
-    DSMetaDataService,
     DSViewRecordService,
+    doi_resolver,
 )
+from app.modules.dataset.services.detail_fragments import render_detail_blocks
 from app.modules.dataset.services.notification_utils import get_dataset_community_id
 from app.modules.dataset.services.resolvers import render_detail
+from app.modules.featuremodel.services import FMAnalysisService
+from app.modules.flamapy.validation import uvl_validation_service
+from app.modules.hubfile.storage import dataset_folder
 from app.modules.recommendation.service import RecommendationService
-from app.modules.zenodo.services import ZenodoService
+from app.modules.zenodo.services import deposition_job_service
+from core.decorators import Validators, conditional, make_etag
+from core.security import rate_limit
+from core.services.hashing import DigestIndex, save_stream
 
 logger = logging.getLogger(__name__)
 
 
 dataset_service = DataSetService()
 author_service = AuthorService()
-dsmetadata_service = DSMetaDataService()
-zenodo_service = ZenodoService()
-doi_mapping_service = DOIMappingService()
 ds_view_record_service = DSViewRecordService()
 ds_download_record_service = DSDownloadRecordService()
 ds_download_record_service = DSDownloadRecordService()
@@ -49,13 +51,12 @@ _TRENDING_CACHE_AT = None
 _TRENDING_CACHE_TTL = timedelta(hours=1)
 
 
-@dataset_bp.route("/datasets/trending", methods=["GET"])
-def trending_datasets():
+def _trending_payload():
     global _TRENDING_CACHE, _TRENDING_CACHE_AT
 
     now = datetime.now(timezone.utc)
     if _TRENDING_CACHE and _TRENDING_CACHE_AT and now - _TRENDING_CACHE_AT < _TRENDING_CACHE_TTL:
-        return jsonify(_TRENDING_CACHE)
+        return _TRENDING_CACHE
 
     datasets = dataset_service.getTrendingDatasets()
     payload = [
@@ -87,8 +88,19 @@ def trending_datasets():
 
     _TRENDING_CACHE = payload
     _TRENDING_CACHE_AT = now
+    return payload
+
+
+def _trending_validators():
+    # El listado se recalcula como mucho una vez por hora: la fecha de cálculo identifica la versión
+    _trending_payload()
+    return Validators(make_etag("trending", _TRENDING_CACHE_AT.isoformat()), _TRENDING_CACHE_AT)
+
 
-    return jsonify(payload)
+@dataset_bp.route("/datasets/trending", methods=["GET"])
+@conditional(_trending_validators)
+def trending_datasets():
+    return jsonify(_trending_payload())
 
 
 @dataset_bp.route("/dataset/upload", methods=["GET", "POST"])
@@ -114,37 +126,17 @@ def create_dataset():
                 400,
             )
 
-        # send dataset as deposition to Zenodo
-        data = {}
         try:
-            zenodo_response_json = zenodo_service.create_new_deposition(dataset)
-            response_data = json.dumps(zenodo_response_json)
-            data = json.loads(response_data)
-        except Exception as exc:
-            data = {}
-            zenodo_response_json = {}
-            logger.exception(f"Exception while create dataset data in Zenodo {exc}")
-
-        if data.get("conceptrecid"):
-            deposition_id = data.get("id")
-
-            # update dataset with deposition id in Zenodo
-            dataset_service.update_dsmetadata(dataset.ds_meta_data_id, deposition_id=deposition_id)
+            FMAnalysisService().schedule_dataset(dataset)
+        except Exception:
+            logger.exception("Could not schedule feature model analysis for dataset_id=%s", dataset.id)
 
-            try:
-                # iterate for each feature model (one feature model = one request to Zenodo)
-                for feature_model in dataset.feature_models:
-                    zenodo_service.upload_file(dataset, deposition_id, feature_model)
-
-                # publish deposition
-                zenodo_service.publish_deposition(deposition_id)
-
-                # update DOI
-                deposition_doi = zenodo_service.get_doi(deposition_id)
-                dataset_service.update_dsmetadata(dataset.ds_meta_data_id, dataset_doi=deposition_doi)
-            except Exception as e:
-                msg = f"it has not been possible upload feature models in Zenodo and update the DOI: {e}"
-                return jsonify({"message": msg}), 200
+        # send dataset as deposition to Zenodo in the background; the UI polls the job status
+        job = None
+        try:
+            job = deposition_job_service.enqueue(dataset)
+        except Exception as exc:
+            logger.exception(f"Exception while scheduling the Zenodo deposition {exc}")
 
         # Delete temp folder
         file_path = current_user.temp_folder()
@@ -152,11 +144,26 @@ def create_dataset():
             shutil.rmtree(file_path)
 
         msg = "Everything works!"
-        return jsonify({"message": msg}), 200
+        response = {"message": msg}
+        if job is not None:
+            response["deposition_status_url"] = url_for("dataset.deposition_status", dataset_id=dataset.id)
+        return jsonify(response), 200
 
     return render_template("dataset/upload_dataset.html", form=form)
 
 
+@dataset_bp.route("/dataset/<int:dataset_id>/deposition", methods=["GET"])
+@login_required
+def deposition_status(dataset_id):
+    dataset = dataset_service.get_or_404(dataset_id)
+    if dataset.user_id != current_user.id:
+        abort(403)
+    job = deposition_job_service.get_for_dataset(dataset_id)
+    if job is None:
+        return jsonify({"status": "none", "doi": dataset.ds_meta_data.dataset_doi}), 404
+    return jsonify(job.to_dict()), 200
+
+
 @dataset_bp.route("/dataset/list", methods=["GET", "POST"])
 @login_required
 def list_dataset():
@@ -167,45 +174,73 @@ def list_dataset():
     )
 
 
+def _unique_temp_filename(temp_folder: str, filename: str) -> str:
+    if not os.path.exists(os.path.join(temp_folder, filename)):
+        return filename
+    base_name, extension = os.path.splitext(filename)
+    i = 1
+    while os.path.exists(os.path.join(temp_folder, f"{base_name} ({i}){extension}")):
+        i += 1
+    return f"{base_name} ({i}){extension}"
+
+
 @dataset_bp.route("/dataset/file/upload", methods=["POST"])
 @login_required
 def upload():
-    file = request.files["file"]
+    files = [f for f in request.files.getlist("file") if f]
     temp_folder = current_user.temp_folder()
 
-    if not file or not file.filename.endswith(".uvl"):
+    if not files or any(not f.filename.endswith(".uvl") for f in files):
         return jsonify({"message": "No valid file"}), 400
 
     # create temp folder
     if not os.path.exists(temp_folder):
         os.makedirs(temp_folder)
 
-    file_path = os.path.join(temp_folder, file.filename)
-
-    if os.path.exists(file_path):
-        # Generate unique filename (by recursion)
-        base_name, extension = os.path.splitext(file.filename)
-        i = 1
-        while os.path.exists(os.path.join(temp_folder, f"{base_name} ({i}){extension}")):
-            i += 1
-        new_filename = f"{base_name} ({i}){extension}"
-        file_path = os.path.join(temp_folder, new_filename)
-    else:
-        new_filename = file.filename
-
+    digest_index = DigestIndex(temp_folder)
+    saved = []
     try:
-        file.save(file_path)
+        for file in files:
+            new_filename = _unique_temp_filename(temp_folder, file.filename)
+            file_path = os.path.join(temp_folder, new_filename)
+            digest = save_stream(file, file_path)
+            digest_index.put(new_filename, digest)
+            saved.append((new_filename, file_path, digest.md5))
     except Exception as e:
         return jsonify({"message": str(e)}), 500
 
+    # Parseo completo de todos los ficheros a la vez (en paralelo si hay varios)
+    verdicts = uvl_validation_service.validate_many(saved)
+    invalid = {name: verdicts[name]["errors"] for name, _path, _md5 in saved if not verdicts[name]["valid"]}
+    for name, path, _md5 in saved:
+        if name in invalid:
+            os.remove(path)
+            digest_index.discard(name)
+
+    valid_names = [name for name, _path, _md5 in saved if name not in invalid]
+    if len(saved) == 1:
+        if invalid:
+            errors = next(iter(invalid.values()))
+            return jsonify({"message": "; ".join(errors), "errors": errors}), 400
+        return (
+            jsonify(
+                {
+                    "message": "UVL uploaded and validated successfully",
+                    "filename": valid_names[0],
+                }
+            ),
+            200,
+        )
+
     return (
         jsonify(
             {
-                "message": "UVL uploaded and validated successfully",
-                "filename": new_filename,
+                "message": "UVL uploaded and validated successfully" if not invalid else "Some UVL files are invalid",
+                "filenames": valid_names,
+                "errors": invalid,
             }
         ),
-        200,
+        200 if not invalid else 400,
     )
 
 
@@ -218,16 +253,19 @@ def delete():
 
     if os.path.exists(filepath):
         os.remove(filepath)
+        DigestIndex(temp_folder).discard(filename)
         return jsonify({"message": "File deleted successfully"})
 
     return jsonify({"error": "Error: File not found"})
 
 
 @dataset_bp.route("/dataset/download/<int:dataset_id>", methods=["GET"])
+@rate_limit("download", limit="DOWNLOAD_RATE_LIMIT", window="DOWNLOAD_RATE_WINDOW")
 def download_dataset(dataset_id):
     dataset = BaseDataset.query.get_or_404(dataset_id)
 
-    file_path = f"uploads/user_{dataset.user_id}/dataset_{dataset.id}/"
+    # Misma carpeta que resuelven los hubfiles (WORKING_DIR y UPLOADS_DIR), no una ruta relativa al cwd
+    file_path = dataset_folder(dataset.user_id, dataset.id)
 
     temp_dir = tempfile.mkdtemp()
     zip_path = os.path.join(temp_dir, f"dataset_{dataset_id}.zip")
@@ -271,24 +309,27 @@ def download_dataset(dataset_id):
             user_cookie=user_cookie,
             user_id=current_user.id if current_user.is_authenticated else None,
         )
-        logger.info("Recorded download for dataset_id=%s; new_count=%s", dataset.id, dataset.download_count)
     except Exception:
         logger.exception("Failed to record download for dataset_id=%s", dataset.id)
 
     return resp
 
 
+def _stats_validators(dataset_id):
+    # Los mismos contadores que devuelve la vista, en una consulta: el 304 no hace más trabajo
+    stats = dataset_service.get_stats(dataset_id)
+    if stats is None:
+        return None
+    return Validators(make_etag("stats", stats["dataset_id"], stats["revision"], stats["downloads"], stats["views"]))
+
+
 @dataset_bp.route("/datasets/<int:dataset_id>/stats", methods=["GET"])
+@conditional(_stats_validators)
 def dataset_stats(dataset_id):
-    dataset = dataset_service.get_or_404(dataset_id)
-    views = ds_view_record_service.count_for_dataset(dataset.id)
-    return jsonify(
-        {
-            "dataset_id": dataset.id,
-            "downloads": dataset.download_count or 0,
-            "views": views,
-        }
-    )
+    stats = dataset_service.get_stats(dataset_id)
+    if stats is None:
+        abort(404)
+    return jsonify({"dataset_id": stats["dataset_id"], "downloads": stats["downloads"], "views": stats["views"]})
 
 
 @dataset_bp.route("/dataset/view/<int:dataset_id>", methods=["GET"])
@@ -297,50 +338,55 @@ def view_dataset(dataset_id: int):
     dataset = BaseDataset.query.get_or_404(dataset_id)
 
     detail_template, detail_ctx = render_detail(dataset.type, dataset)
+    blocks = render_detail_blocks(dataset, detail_template, detail_ctx)
     detail_ctx["related_datasets"] = RecommendationService.get_related_datasets(dataset.id)
-    versions = DatasetVersion.query.filter_by(dataset_id=dataset.id).order_by(DatasetVersion.created_at.desc()).all()
 
     return render_template(
         "dataset/view_dataset.html",
         detail_template=detail_template,
-        versions=versions,
+        blocks=blocks,
         **detail_ctx,
     )
 
 
 @dataset_bp.route("/doi/<path:doi>/", methods=["GET"])
 def subdomain_index(doi):
+    # DOI -> dataset (o DOI nuevo si es un DOI antiguo) desde el mapa en memoria
+    resolved = doi_resolver.resolve(doi)
+    if resolved is None:
+        abort(404)
 
-    # Check if the DOI is an old DOI
-    new_doi = doi_mapping_service.get_new_doi(doi)
-    if new_doi:
+    dataset = None
+    if not resolved.redirect_doi:
+        dataset = db.session.get(BaseDataset, resolved.dataset_id)
+        if dataset is None or dataset.ds_meta_data.dataset_doi != doi:
+            # Entrada obsoleta (dataset borrado o DOI cambiado en otro proceso): se descarta y se busca de nuevo
+            doi_resolver.invalidate(doi)
+            resolved = doi_resolver.resolve(doi)
+            if resolved is None:
+                abort(404)
+            dataset = None if resolved.redirect_doi else db.session.get(BaseDataset, resolved.dataset_id)
+
+    if resolved.redirect_doi:
         # Redirect to the same path with the new DOI
-        return redirect(url_for("dataset.subdomain_index", doi=new_doi), code=302)
-
-    # Try to search the dataset by the provided DOI (which should already be the new one)
-    ds_meta_data = dsmetadata_service.filter_by_doi(doi)
-
-    if not ds_meta_data:
+        return redirect(url_for("dataset.subdomain_index", doi=resolved.redirect_doi), code=302)
+    if dataset is None:
         abort(404)
 
-    # Get dataset
-    dataset = ds_meta_data.data_set
-
     # cookie de vistas
     user_cookie = ds_view_record_service.create_cookie(dataset=dataset)
 
     # resolver de detalle (tu flujo original)
     detail_template, detail_ctx = render_detail(dataset.type, dataset)
+    # detalle del tipo + historial de versiones, cacheados por revisión del dataset
+    blocks = render_detail_blocks(dataset, detail_template, detail_ctx)
     detail_ctx["related_datasets"] = RecommendationService.get_related_datasets(dataset.id)
 
-    # 🔹 NUEVO: versiones ordenadas (últimas primero) y pasadas a la plantilla
-    versions = DatasetVersion.query.filter_by(dataset_id=dataset.id).order_by(DatasetVersion.created_at.desc()).all()
-
     resp = make_response(
         render_template(
             "dataset/view_dataset.html",
             detail_template=detail_template,
-            versions=versions,  # <- aquí van las versiones
+            blocks=blocks,
             **detail_ctx,  # meta=..., dataset=..., etc.
         )
     )
@@ -359,15 +405,13 @@ def get_unsynchronized_dataset(dataset_id):
         abort(404)
 
     detail_template, detail_ctx = render_detail(dataset.type, dataset)
+    blocks = render_detail_blocks(dataset, detail_template, detail_ctx)
     detail_ctx["related_datasets"] = RecommendationService.get_related_datasets(dataset.id)
 
-    # 🔹 NUEVO: versiones también para no sincronizados (si existen)
-    versions = DatasetVersion.query.filter_by(dataset_id=dataset.id).order_by(DatasetVersion.created_at.desc()).all()
-
     return render_template(
         "dataset/view_dataset.html",
         detail_template=detail_template,
-        versions=versions,  # <- aquí van las versiones
+        blocks=blocks,
         **detail_ctx,  # meta=..., dataset=..., etc.
     )
 
@@ -385,7 +429,7 @@ def authors_list():
 
     followed_author_ids = set()
     if current_user.is_authenticated:
-        followed_author_ids = {a.id for a in follow_service.get_followed_authors_for_user(current_user)}
+        followed_author_ids = follow_service.get_followed_author_ids(current_user)
 
     author_rows = []
     for author, dataset_count in authors:
@@ -419,7 +463,7 @@ def communities_list():
     rows = []
     followed_communities = set()
     if current_user.is_authenticated:
-        followed_communities = set(follow_service.get_followed_communities_for_user(current_user))
+        followed_communities = follow_service.get_followed_community_ids(current_user)
 
     for community_id, data in sorted(communities.items()):
         followers = follow_service.get_followers_for_community(community_id) or []
@@ -444,8 +488,7 @@ def author_detail(author_id: int):
 
     is_following_author = False
     if current_user.is_authenticated:
-        followed_authors = follow_service.get_followed_authors_for_user(current_user)
-        is_following_author = any(a.id == author.id for a in followed_authors)
+        is_following_author = author.id in follow_service.get_followed_author_ids(current_user)
 
     datasets = (
         BaseDataset.query.join(DSMetaData, BaseDataset.ds_meta_data_id == DSMetaData.id)
@@ -476,8 +519,7 @@ def community_detail(community_id: str):
 
     is_following_community = False
     if current_user.is_authenticated:
-        followed_communities = follow_service.get_followed_communities_for_user(current_user)
-        is_following_community = community_identifier in followed_communities
+        is_following_community = community_identifier in follow_service.get_followed_community_ids(current_user)
 
     datasets = BaseDataset.query.options(joinedload(BaseDataset.ds_meta_data)).order_by(BaseDataset.id.desc()).all()
     community_datasets = [ds for ds in datasets if get_dataset_community_id(ds) == community_identifier]
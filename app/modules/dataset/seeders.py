@@ -24,7 +24,7 @@ class DataSetSeeder(BaseSeeder):
             raise Exception("Users not found. Please seed users first.")
 
         # Create DSMetrics instance
-        ds_metrics = DSMetrics(number_of_models="5", number_of_features="50")
+        ds_metrics = DSMetrics(number_of_models=5, number_of_features=50)
         seeded_ds_metrics = self.seed([ds_metrics])[0]
 
         # Create DSMetaData instances
@@ -1,6 +1,8 @@
 # app/modules/dataset/services/__init__.py
 
 # Importa los servicios clásicos desde el archivo que acabas de mover
+from .catalog_export import CatalogExporter
+from .doi_resolver import DOIResolver, doi_resolver
 from .services import (
     AuthorService,
     DataSetService,
@@ -17,8 +19,11 @@ from .versioning_strategies import TabularVersionStrategy, UVLVersionStrategy
 
 __all__ = [
     "AuthorService",
+    "CatalogExporter",
     "DataSetService",
     "DOIMappingService",
+    "DOIResolver",
+    "doi_resolver",
     "DSDownloadRecordService",
     "DSMetaDataService",
     "DSViewRecordService",
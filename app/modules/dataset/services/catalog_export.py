@@ -0,0 +1,189 @@
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.modules.dataset.models import BaseDataset, DSMetaData
+
+# Segundos que el watermark retrocede respecto al inicio del volcado (ver CatalogExporter)
+DEFAULT_WATERMARK_OVERLAP = 300
+
+
+def parse_watermark(value: Optional[str]) -> Optional[datetime]:
+    """ISO 8601 -> datetime naive en UTC (como las fechas de la BD). Lanza ``ValueError`` si no es válida."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class CatalogExporter:
+    """
+    Exporta el catálogo completo (metadatos, autores, ficheros y esquema tabular) como NDJSON, un
+    dataset por línea, opcionalmente comprimido con gzip.
+
+    Recorre los datasets por lotes de ``batch_size`` ordenados por id (paginación por clave) en una
+    sesión propia que se vacía tras cada lote, de modo que la memoria no crece con el tamaño del
+    catálogo. Cada lote hace una consulta por relación (autores, ficheros, columnas).
+
+    ``updated_since`` devuelve sólo los datasets creados o modificados desde esa fecha; ``watermark``
+    es el valor a usar en la siguiente sincronización incremental. Los borrados no se exportan.
+
+    ``updated_at`` se fija al hacer flush, no al confirmar: una transacción en curso al empezar el
+    volcado puede confirmar filas con fecha anterior a ese instante. Por eso el watermark es el inicio
+    menos ``overlap`` segundos (``EXPORT_WATERMARK_OVERLAP``) y las sincronizaciones se solapan; los
+    consumidores deduplican por id+revision.
+    """
+
+    def __init__(self, updated_since: Optional[datetime] = None, batch_size: int = 500, overlap: Optional[int] = None):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if overlap is None:
+            overlap = current_app.config.get("EXPORT_WATERMARK_OVERLAP", DEFAULT_WATERMARK_OVERLAP)
+        self.updated_since = updated_since
+        self.batch_size = batch_size
+        # Naive en UTC, como las fechas de la BD
+        started = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.watermark = started - timedelta(seconds=overlap)
+        self.exported = 0
+
+    def _batch_query(self, after_id: int):
+        query = (
+            db.select(BaseDataset)
+            .options(selectinload(BaseDataset.ds_meta_data).selectinload(DSMetaData.authors))
+            .where(BaseDataset.id > after_id)
+            .order_by(BaseDataset.id)
+            .limit(self.batch_size)
+        )
+        if self.updated_since is not None:
+            changed_at = func.coalesce(BaseDataset.updated_at, BaseDataset.created_at)
+            query = query.where(changed_at >= self.updated_since)
+        return query
+
+    @staticmethod
+    def _files_by_dataset(session, dataset_ids: List[int]) -> Dict[int, List[dict]]:
+        from app.modules.featuremodel.models import FeatureModel
+        from app.modules.hubfile.models import Hubfile
+
+        rows = session.execute(
+            db.select(
+                FeatureModel.data_set_id, Hubfile.id, Hubfile.name, Hubfile.checksum, Hubfile.sha256, Hubfile.size
+            )
+            .join(Hubfile, Hubfile.feature_model_id == FeatureModel.id)
+            .where(FeatureModel.data_set_id.in_(dataset_ids))
+            .order_by(Hubfile.id)
+        ).all()
+        files = defaultdict(list)
+        for dataset_id, file_id, name, checksum, sha256, size in rows:
+            files[dataset_id].append(
+                {"id": file_id, "name": name, "checksum": checksum, "sha256": sha256, "size_in_bytes": size}
+            )
+        return files
+
+    @staticmethod
+    def _tabular_by_dataset(session, dataset_ids: List[int]) -> Dict[int, dict]:
+        from app.modules.tabular.models import TabularColumn, TabularMetaData
+
+        metas = session.execute(db.select(TabularMetaData).where(TabularMetaData.dataset_id.in_(dataset_ids))).scalars()
+        tabular = {}
+        by_meta = {}
+        for meta in metas:
+            tabular[meta.dataset_id] = by_meta[meta.id] = {
+                "n_rows": meta.n_rows,
+                "n_cols": meta.n_cols,
+                "delimiter": meta.delimiter,
+                "encoding": meta.encoding,
+                "has_header": meta.has_header,
+                "primary_keys": meta.primary_keys,
+                "columns": [],
+            }
+        if by_meta:
+            columns = session.execute(
+                db.select(
+                    TabularColumn.meta_id,
+                    TabularColumn.name,
+                    TabularColumn.dtype,
+                    TabularColumn.null_count,
+                    TabularColumn.unique_count,
+                )
+                .where(TabularColumn.meta_id.in_(list(by_meta)))
+                .order_by(TabularColumn.id)
+            ).all()
+            for meta_id, name, dtype, null_count, unique_count in columns:
+                by_meta[meta_id]["columns"].append(
+                    {"name": name, "dtype": dtype, "null_count": null_count, "unique_count": unique_count}
+                )
+        return tabular
+
+    @staticmethod
+    def _record(dataset, files: List[dict], tabular: Optional[dict]) -> dict:
+        md = dataset.ds_meta_data
+        record = {
+            "id": dataset.id,
+            "type": dataset.type,
+            "created_at": _iso(dataset.created_at),
+            "updated_at": _iso(dataset.updated_at),
+            "revision": dataset.revision,
+            "title": md.title if md else None,
+            "description": md.description if md else None,
+            "publication_type": md.publication_type.value if md and md.publication_type else None,
+            "publication_doi": md.publication_doi if md else None,
+            "dataset_doi": md.dataset_doi if md else None,
+            "tags": [tag.strip() for tag in md.tags.split(",") if tag.strip()] if md and md.tags else [],
+            "authors": [author.to_dict() for author in md.authors] if md else [],
+            "files": files,
+        }
+        if dataset.type == "tabular":
+            record["tabular"] = tabular
+        return record
+
+    def iter_records(self) -> Iterator[dict]:
+        session = db.session.session_factory()
+        try:
+            after_id = 0
+            while True:
+                batch = session.execute(self._batch_query(after_id)).scalars().all()
+                if not batch:
+                    return
+                ids = [dataset.id for dataset in batch]
+                files = self._files_by_dataset(session, ids)
+                tabular = self._tabular_by_dataset(session, ids)
+                for dataset in batch:
+                    yield self._record(dataset, files.get(dataset.id, []), tabular.get(dataset.id))
+                    self.exported += 1
+                after_id = ids[-1]
+                # Suelta los objetos del lote: la memoria no depende del tamaño del catálogo
+                session.expunge_all()
+                if len(batch) < self.batch_size:
+                    return
+        finally:
+            session.close()
+
+    def iter_ndjson(self) -> Iterator[bytes]:
+        for record in self.iter_records():
+            yield json.dumps(record, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+
+    def iter_gzip(self) -> Iterator[bytes]:
+        return gzip_chunks(self.iter_ndjson())
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime en streaming (formato gzip) sin acumular el contenido completo."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
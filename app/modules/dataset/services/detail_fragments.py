@@ -0,0 +1,41 @@
+from typing import Any, Dict, Optional
+
+from flask import render_template
+from markupsafe import Markup
+
+from app.modules.dataset.models import BaseDataset, DatasetVersion
+from core.caching import FragmentCache
+
+dataset_fragments = FragmentCache()
+
+# Bloques de ui_blocks() que se renderizan en cada petición (contadores de vistas/descargas, DOI, etc.)
+LIVE_BLOCKS = frozenset({"common-meta"})
+
+
+def _versions(dataset_id: int):
+    return DatasetVersion.query.filter_by(dataset_id=dataset_id).order_by(DatasetVersion.created_at.desc()).all()
+
+
+def render_detail_blocks(
+    dataset: BaseDataset, detail_template: Optional[str], detail_ctx: Dict[str, Any]
+) -> Dict[str, Markup]:
+    """
+    Renderiza (o toma de la caché) los bloques de ``dataset.ui_blocks()`` que sólo dependen del
+    dataset: ``detail`` (la plantilla del tipo, con sus bloques propios como ``table-schema`` o
+    ``sample-rows``) y ``versioning``. La clave incluye ``dataset.revision``, que cambia con cada
+    modificación del dataset o de sus objetos dependientes, y ``created_at``: un dataset recreado
+    con el mismo id (BD restaurada o recreada) vuelve a empezar en la revisión 0.
+    """
+    declared = [block for block in dataset.ui_blocks() if block not in LIVE_BLOCKS]
+    key = (dataset.id, dataset.created_at, dataset.revision or 0)
+    blocks = {}
+    if detail_template:
+        blocks["detail"] = dataset_fragments.get_or_render(
+            (detail_template, tuple(declared)) + key, lambda: render_template(detail_template, **detail_ctx)
+        )
+    if "versioning" in declared:
+        blocks["versioning"] = dataset_fragments.get_or_render(
+            ("versioning",) + key,
+            lambda: render_template("dataset/_version_history.html", versions=_versions(dataset.id)),
+        )
+    return blocks
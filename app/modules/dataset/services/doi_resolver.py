@@ -0,0 +1,107 @@
+import logging
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from app import db
+from app.modules.dataset.models import BaseDataset, DOIMapping, DSMetaData
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedDOI(NamedTuple):
+    dataset_id: Optional[int]
+    # DOI actual cuando ``doi`` es un DOI antiguo (DOIMapping): la página redirige a él
+    redirect_doi: Optional[str] = None
+
+
+class DOIResolver:
+    """
+    Mapa en memoria ``doi -> (dataset_id, redirect_doi)`` para las páginas ``/doi/<doi>/``.
+
+    Se precarga al arrancar (``warm``); si la base de datos aún no está disponible se carga en la
+    primera resolución. Un DOI que no está en el mapa (p. ej. asignado por otro worker) se busca en
+    la base de datos y se añade. ``register``/``register_mapping`` se llaman al asignar un DOI o
+    crear un mapeo.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, ResolvedDOI] = {}
+        self._lock = threading.Lock()
+        self._warm = False
+
+    def warm(self) -> int:
+        datasets = db.session.execute(
+            db.select(DSMetaData.dataset_doi, BaseDataset.id)
+            .join(BaseDataset, BaseDataset.ds_meta_data_id == DSMetaData.id)
+            .where(DSMetaData.dataset_doi.isnot(None))
+        ).all()
+        mappings = db.session.execute(
+            db.select(DOIMapping.dataset_doi_old, DOIMapping.dataset_doi_new).where(
+                DOIMapping.dataset_doi_old.isnot(None)
+            )
+        ).all()
+
+        entries = {old: ResolvedDOI(None, new) for old, new in mappings if new}
+        # Un DOI con dataset propio gana a un mapeo que lo redirija
+        entries.update({doi: ResolvedDOI(dataset_id) for doi, dataset_id in datasets})
+        with self._lock:
+            self._entries = entries
+            self._warm = True
+        return len(entries)
+
+    def _lookup(self, doi: str) -> Optional[ResolvedDOI]:
+        mapping = db.session.execute(
+            db.select(DOIMapping.dataset_doi_new).where(DOIMapping.dataset_doi_old == doi).limit(1)
+        ).scalar()
+        if mapping:
+            return ResolvedDOI(None, mapping)
+        dataset_id = db.session.execute(
+            db.select(BaseDataset.id)
+            .join(DSMetaData, BaseDataset.ds_meta_data_id == DSMetaData.id)
+            .where(DSMetaData.dataset_doi == doi)
+            .limit(1)
+        ).scalar()
+        return ResolvedDOI(dataset_id) if dataset_id is not None else None
+
+    def resolve(self, doi: str) -> Optional[ResolvedDOI]:
+        if not self._warm:
+            try:
+                self.warm()
+            except Exception:
+                # No se reintenta en cada petición: el mapa se rellena con las búsquedas individuales
+                self._warm = True
+                logger.exception("Could not warm the DOI resolver; falling back to per-request lookups")
+        with self._lock:
+            entry = self._entries.get(doi)
+        if entry is not None:
+            return entry
+
+        entry = self._lookup(doi)
+        if entry is not None:
+            with self._lock:
+                self._entries[doi] = entry
+        return entry
+
+    def register(self, doi: Optional[str], dataset_id: int) -> None:
+        if not doi:
+            return
+        with self._lock:
+            self._entries[doi] = ResolvedDOI(dataset_id)
+
+    def register_mapping(self, old_doi: Optional[str], new_doi: Optional[str]) -> None:
+        if not old_doi or not new_doi:
+            return
+        with self._lock:
+            self._entries[old_doi] = ResolvedDOI(None, new_doi)
+
+    def invalidate(self, doi: Optional[str] = None) -> None:
+        """Descarta un DOI (o todo el mapa, que se recarga en la siguiente resolución)."""
+        with self._lock:
+            if doi is None:
+                self._entries = {}
+                self._warm = False
+            else:
+                self._entries.pop(doi, None)
+
+
+doi_resolver = DOIResolver()
@@ -0,0 +1,170 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from flask import current_app
+
+from app.modules.dataset.services.notification_service import DatasetNotification, NotificationService
+from core.services import email_service
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """
+    Cola acotada + pool fijo de workers para las notificaciones de datasets nuevos.
+
+    Los workers resuelven los seguidores de cada dataset y acumulan los avisos por destinatario;
+    cada ``digest_window`` segundos se envía un solo correo por seguidor con todos sus avisos
+    (los seguidores con los mismos avisos comparten mensaje). Los envíos reutilizan la conexión
+    SMTP persistente de ``EmailService``.
+    """
+
+    def __init__(
+        self,
+        service: Optional[NotificationService] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        digest_window: Optional[float] = None,
+    ) -> None:
+        self.service = service or NotificationService()
+        self._workers = workers
+        self._queue_size = queue_size
+        self._digest_window = digest_window
+        self._queue: Optional[queue.Queue] = None
+        self._threads: List[threading.Thread] = []
+        self._app = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: Dict[str, Dict[int, DatasetNotification]] = defaultdict(dict)
+        self._oldest: Optional[float] = None
+        self._stopping = False
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            app = current_app._get_current_object()
+            config = app.config
+            self._app = app
+            self._workers = self._workers or config.get("NOTIFICATION_WORKERS", 2)
+            self._queue_size = self._queue_size or config.get("NOTIFICATION_QUEUE_SIZE", 1000)
+            if self._digest_window is None:
+                self._digest_window = config.get("NOTIFICATION_DIGEST_WINDOW", 5)
+            self._queue = queue.Queue(maxsize=self._queue_size)
+            self._stopping = False
+
+            for i in range(self._workers):
+                self._threads.append(threading.Thread(target=self._work, name=f"notify-{i}", daemon=True))
+            self._threads.append(threading.Thread(target=self._flush_loop, name="notify-digest", daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+    def submit(self, dataset_id: int, timeout: float = 1.0) -> bool:
+        """Encola un dataset. Si la cola sigue llena tras ``timeout`` segundos se descarta (y se registra)."""
+        self._ensure_started()
+        try:
+            self._queue.put(dataset_id, timeout=timeout)
+        except queue.Full:
+            logger.error("Notification queue full (%s); dropping dataset_id=%s", self._queue_size, dataset_id)
+            return False
+        return True
+
+    def drain(self) -> int:
+        """Espera a que se procese la cola y envía los digests pendientes. Devuelve los mensajes enviados."""
+        if self._queue is not None:
+            self._queue.join()
+        return self.flush()
+
+    def shutdown(self) -> None:
+        if not self._threads:
+            return
+        self.drain()
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for _ in range(self._workers):
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _work(self) -> None:
+        from app.modules.dataset.models import BaseDataset
+
+        while True:
+            dataset_id = self._queue.get()
+            try:
+                if dataset_id is _STOP:
+                    return
+                with self._app.app_context():
+                    dataset = BaseDataset.query.get(dataset_id)
+                    if dataset is None:
+                        logger.warning("Notification worker: no dataset found for id=%s", dataset_id)
+                        continue
+                    self._add(self.service.build_notifications(dataset))
+            except Exception:
+                logger.exception("Error in notification worker for dataset_id=%s", dataset_id)
+            finally:
+                self._queue.task_done()
+
+    def _add(self, notifications: List[DatasetNotification]) -> None:
+        if not notifications:
+            return
+        with self._lock:
+            for notification in notifications:
+                for email in notification.recipients:
+                    # Un seguidor del autor y de la comunidad recibe el dataset una sola vez
+                    self._pending[email].setdefault(notification.dataset_id, notification)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._wakeup.notify_all()
+
+    # ------------------------------------------------------------------
+    # Digest
+    # ------------------------------------------------------------------
+    def _flush_loop(self) -> None:
+        while True:
+            with self._lock:
+                while not self._stopping and (
+                    self._oldest is None or time.monotonic() - self._oldest < self._digest_window
+                ):
+                    timeout = None if self._oldest is None else self._digest_window - (time.monotonic() - self._oldest)
+                    self._wakeup.wait(timeout=timeout)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Notification digest flush failed")
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(dict)
+            self._oldest = None
+        if not pending:
+            return 0
+
+        groups: Dict[tuple, List[str]] = defaultdict(list)
+        for email, notifications in pending.items():
+            groups[tuple(notifications.values())].append(email)
+
+        with self._app.app_context():
+            for notifications, recipients in groups.items():
+                subject, html_body = self.service.render_digest(notifications)
+                email_service.send_email(subject=subject, recipients=sorted(recipients), html_body=html_body)
+        return len(groups)
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -1,8 +1,9 @@
 import logging
-import threading
-from typing import Iterable
+from dataclasses import dataclass
+from html import escape
+from typing import Iterator, List, Optional, Sequence
 
-from flask import current_app, url_for
+from flask import current_app
 
 from app.modules.auth.services import FollowService
 from app.modules.dataset.models import DataSet
@@ -10,81 +11,79 @@ from app.modules.dataset.services.notification_utils import (
     get_dataset_community_id,
     get_dataset_primary_author,
 )
-from app.modules.tabular.models import TabularDataset
 from core.services import email_service
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class DatasetNotification:
+    """Aviso de un dataset nuevo para los seguidores de un autor (``kind="author"``) o de una comunidad."""
+
+    kind: str
+    source: str
+    dataset_id: int
+    title: str
+    description: str
+    url: str
+    recipients: tuple = ()
+
+    @property
+    def subject(self) -> str:
+        if self.kind == "author":
+            return f"[fifahub] New dataset from {self.source}"
+        return f"[fifahub] New dataset in community {self.source}"
+
+    @property
+    def html_body(self) -> str:
+        if self.kind == "author":
+            intro = (
+                "<p>You are receiving this email because you follow this author.</p>"
+                f"<p><strong>{self.source}</strong> published a new dataset:</p>"
+            )
+        else:
+            intro = (
+                "<p>You are receiving this email because you follow this community.</p>"
+                f"<p>New dataset in <strong>{self.source}</strong>:</p>"
+            )
+        return (
+            intro + f"<p><strong>{self.title}</strong></p>"
+            f"<p>{self.description}</p>"
+            f'<p><a href="{self.url}">View dataset</a></p>'
+        )
+
+
 class NotificationService:
     def __init__(self, follow_service: FollowService | None = None):
         self.follow_service = follow_service or FollowService()
 
     def trigger_new_dataset_notifications_async(self, dataset) -> None:
-        """Lanza un hilo para procesar las notificaciones de un dataset recién creado."""
+        """Encola el dataset en el dispatcher (pool acotado de workers con digest por seguidor)."""
+        from app.modules.dataset.services.notification_dispatcher import notification_dispatcher
+
         dataset_id = getattr(dataset, "id", None)
         if not dataset_id:
             return
+        notification_dispatcher.submit(dataset_id)
 
-        app = current_app._get_current_object()
-
-        def _worker(dataset_id=dataset_id, app=app):
-            try:
-                with app.app_context():
-                    ds = TabularDataset.query.get(dataset_id)
-                    if ds is None:
-                        logger.warning(
-                            "Notification worker: no TabularDataset found for id=%s",
-                            dataset_id,
-                        )
-                        return
-
-                    logger.info(
-                        "Notification worker: processing dataset_id=%s",
-                        dataset_id,
-                    )
-                    self.notify_new_dataset_sync(ds)
-            except Exception:
-                logger.exception(
-                    "Error in notification worker for dataset_id=%s",
-                    dataset_id,
-                )
-
-        t = threading.Thread(target=_worker, daemon=True)
-        t.start()
-
-    def notify_new_dataset_sync(self, dataset: DataSet) -> None:
-        """Envía notificaciones (autor y comunidad) para un dataset dado."""
-        dataset_id = getattr(dataset, "id", None)
-
+    def build_notifications(self, dataset: DataSet) -> List[DatasetNotification]:
+        """Avisos (autor y comunidad) de un dataset, sin enviarlos."""
         try:
-            self._notify_author_followers(dataset)
+            return list(self.iter_notifications(dataset))
         except Exception:
-            logger.exception(
-                "Author notification failed for dataset_id=%s",
-                dataset_id,
-            )
-
-        try:
-            self._notify_community_followers(dataset)
-        except Exception:
-            logger.exception(
-                "Community notification failed for dataset_id=%s",
-                dataset_id,
-            )
-
-    def _notify_author_followers(self, dataset: DataSet) -> None:
+            logger.exception("Notification resolution failed for dataset_id=%s", getattr(dataset, "id", None))
+            return []
+
+    def iter_notifications(self, dataset: DataSet) -> Iterator[DatasetNotification]:
+        """
+        Resuelve los destinatarios con una sola consulta (emails distintos, por lotes) y genera un aviso
+        de autor y otro de comunidad por lote. Quien sigue a ambos solo recibe el aviso del autor.
+        """
         author = get_dataset_primary_author(dataset)
-        if not author:
-            return
-
-        followers = self.follow_service.get_followers_for_author(author) or []
-        if not followers:
+        community_id = get_dataset_community_id(dataset)
+        if getattr(author, "id", None) is None and not community_id:
             return
 
-        author_name = getattr(author, "name", "author")
-        subject = f"[fifahub] New dataset from {author_name}"
-        dataset_url = self._dataset_url(dataset)
         description = (
             getattr(
                 getattr(dataset, "ds_meta_data", None),
@@ -93,57 +92,72 @@ class NotificationService:
             )
             or ""
         )
+        common = {
+            "dataset_id": dataset.id,
+            "title": self._dataset_title(dataset),
+            "description": description,
+            "url": self._dataset_url(dataset),
+        }
+        batch_size = current_app.config.get("NOTIFICATION_RECIPIENT_BATCH", 500)
+        batches = self.follow_service.iter_follower_emails(author=author, community=community_id, batch_size=batch_size)
+        for batch in batches:
+            author_emails = tuple(email for email, via_author in batch if via_author)
+            community_emails = tuple(email for email, via_author in batch if not via_author)
+            if author_emails:
+                yield DatasetNotification(
+                    kind="author", source=getattr(author, "name", "author"), recipients=author_emails, **common
+                )
+            if community_emails:
+                yield DatasetNotification(kind="community", source=community_id, recipients=community_emails, **common)
 
-        html_body = (
-            "<p>You are receiving this email because you follow this author.</p>"
-            f"<p><strong>{author_name}</strong> published a new dataset:</p>"
-            f"<p><strong>{self._dataset_title(dataset)}</strong></p>"
-            f"<p>{description}</p>"
-            f'<p><a href="{dataset_url}">View dataset</a></p>'
-        )
-
-        self._send_to_users(followers, subject, html_body)
+    def notify_new_dataset_sync(self, dataset: DataSet) -> None:
+        """Envía notificaciones (autor y comunidad) para un dataset dado."""
+        dataset_id = getattr(dataset, "id", None)
 
-    def _notify_community_followers(self, dataset: DataSet) -> None:
-        community_id = get_dataset_community_id(dataset)
-        if not community_id:
-            return
+        try:
+            for notification in self.iter_notifications(dataset):
+                try:
+                    self._send(notification)
+                except Exception:
+                    logger.exception(
+                        "%s notification failed for dataset_id=%s",
+                        notification.kind.capitalize(),
+                        dataset_id,
+                    )
+        except Exception:
+            logger.exception(
+                "Notification resolution failed for dataset_id=%s",
+                dataset_id,
+            )
 
-        followers = self.follow_service.get_followers_for_community(community_id) or []
-        if not followers:
+    @staticmethod
+    def _send(notification: Optional[DatasetNotification]) -> None:
+        if notification is None or not notification.recipients:
             return
 
-        subject = f"[fifahub] New dataset in community {community_id}"
-        dataset_url = self._dataset_url(dataset)
-        description = (
-            getattr(
-                getattr(dataset, "ds_meta_data", None),
-                "description",
-                "",
-            )
-            or ""
+        email_service.send_email(
+            subject=notification.subject,
+            recipients=list(notification.recipients),
+            html_body=notification.html_body,
         )
 
-        html_body = (
-            "<p>You are receiving this email because you follow this community.</p>"
-            f"<p>New dataset in <strong>{community_id}</strong>:</p>"
-            f"<p><strong>{self._dataset_title(dataset)}</strong></p>"
-            f"<p>{description}</p>"
-            f'<p><a href="{dataset_url}">View dataset</a></p>'
+    @staticmethod
+    def render_digest(notifications: Sequence[DatasetNotification]) -> tuple:
+        """(asunto, html) de un único correo que agrupa varios avisos para el mismo seguidor."""
+        if len(notifications) == 1:
+            return notifications[0].subject, notifications[0].html_body
+
+        items = "".join(
+            f'<li><a href="{escape(n.url)}"><strong>{n.title}</strong></a> '
+            f"({'from' if n.kind == 'author' else 'in community'} {n.source})</li>"
+            for n in notifications
         )
-
-        self._send_to_users(followers, subject, html_body)
-
-    def _send_to_users(self, users: Iterable, subject: str, html_body: str) -> None:
-        emails = [getattr(u, "email", None) for u in users if getattr(u, "email", None)]
-        if not emails:
-            return
-
-        email_service.send_email(
-            subject=subject,
-            recipients=emails,
-            html_body=html_body,
+        subject = f"[fifahub] {len(notifications)} new datasets from authors and communities you follow"
+        html_body = (
+            "<p>You are receiving this email because you follow these authors or communities.</p>"
+            f"<p>New datasets:</p><ul>{items}</ul>"
         )
+        return subject, html_body
 
     @staticmethod
     def _dataset_title(dataset: DataSet) -> str:
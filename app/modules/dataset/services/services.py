@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 import shutil
@@ -26,17 +25,29 @@ from app.modules.hubfile.repositories import (
     HubfileRepository,
     HubfileViewRecordRepository,
 )
+from app.modules.hubfile.services import HubfileService
 from core.services.BaseService import BaseService
+from core.services.hashing import DigestIndex, FileDigest, digest_file
 
 logger = logging.getLogger(__name__)
+# Una traza por descarga: se muestrea con LOG_SAMPLING
+download_logger = logging.getLogger("app.modules.dataset.downloads")
 
 
 def calculate_checksum_and_size(file_path):
-    file_size = os.path.getsize(file_path)
-    with open(file_path, "rb") as file:
-        content = file.read()
-        hash_md5 = hashlib.md5(content).hexdigest()
-        return hash_md5, file_size
+    digest = digest_file(file_path)
+    return digest.md5, digest.size
+
+
+def get_upload_digest(folder: str, filename: str) -> FileDigest:
+    """
+    Devuelve los digests calculados al subir el fichero a la carpeta temporal.
+    Solo si no se registraron (p. ej. ficheros copiados a mano) se recalculan leyendo por bloques.
+    """
+    digest = DigestIndex(folder).get(filename)
+    if digest is None:
+        digest = digest_file(os.path.join(folder, filename))
+    return digest
 
 
 class DataSetService(BaseService):
@@ -61,9 +72,14 @@ class DataSetService(BaseService):
 
         os.makedirs(dest_dir, exist_ok=True)
 
+        hubfile_service = HubfileService()
         for feature_model in dataset.feature_models:
             uvl_filename = feature_model.fm_meta_data.uvl_filename
             shutil.move(os.path.join(source_dir, uvl_filename), dest_dir)
+            # Deduplica en el almacén de blobs; la ruta del dataset queda como enlace al blob
+            for hubfile in feature_model.files:
+                if hubfile.name == uvl_filename:
+                    hubfile_service.store_blob(hubfile, os.path.join(dest_dir, uvl_filename))
 
     def get_synchronized(self, current_user_id: int) -> DataSet:
         return self.repository.get_synchronized(current_user_id)
@@ -102,6 +118,17 @@ class DataSetService(BaseService):
     def total_dataset_views(self) -> int:
         return self.dsviewrecord_repostory.total_dataset_views()
 
+    def get_stats(self, dataset_id: int) -> Optional[dict]:
+        row = self.repository.stats(dataset_id)
+        if row is None:
+            return None
+        return {
+            "dataset_id": row.id,
+            "revision": row.revision,
+            "downloads": row.download_count or 0,
+            "views": row.views,
+        }
+
     def get_trending_datasets(self, limit: int = 5):
         """
         Datasets de los últimos 30 días ordenados por descargas; si no hay, top descargas global.
@@ -143,14 +170,14 @@ class DataSetService(BaseService):
                 )
 
                 # associated files in feature model
-                file_path = os.path.join(current_user.temp_folder(), uvl_filename)
-                checksum, size = calculate_checksum_and_size(file_path)
+                digest = get_upload_digest(current_user.temp_folder(), uvl_filename)
 
                 file = self.hubfilerepository.create(
                     commit=False,
                     name=uvl_filename,
-                    checksum=checksum,
-                    size=size,
+                    checksum=digest.md5,
+                    sha256=digest.sha256,
+                    size=digest.size,
                     feature_model_id=fm.id,
                 )
                 fm.files.append(file)
@@ -189,7 +216,7 @@ class DSDownloadRecordService(BaseService):
                 download_cookie=user_cookie,
             )
             db.session.commit()
-            logger.info(
+            download_logger.info(
                 "Dataset %s download counter updated to %s (cookie=%s)",
                 dataset.id,
                 dataset.download_count,
@@ -244,6 +271,13 @@ class DOIMappingService(BaseService):
     def __init__(self):
         super().__init__(DOIMappingRepository())
 
+    def create(self, **kwargs):
+        from app.modules.dataset.services.doi_resolver import doi_resolver
+
+        mapping = super().create(**kwargs)
+        doi_resolver.register_mapping(mapping.dataset_doi_old, mapping.dataset_doi_new)
+        return mapping
+
     def get_new_doi(self, old_doi: str) -> str:
         doi_mapping = self.repository.get_new_doi(old_doi)
         if doi_mapping:
@@ -4,7 +4,7 @@ from app.modules.tabular.forms import TabularDatasetForm
 from app.modules.tabular.ingest import TabularIngestor
 from app.modules.tabular.renderers import TabularDetailRenderer, TabularFacetProvider
 from app.modules.uvl.forms import UVLDatasetForm
-from app.modules.uvl.renderers import UVLDetailRenderer
+from app.modules.uvl.renderers import UVLDetailRenderer, UVLFacetProvider
 
 from .interfaces import DatasetTypeSpec
 from .registry import registry
@@ -28,7 +28,7 @@ def register_dataset_types(resolve_path_func=None) -> None:
             ingestor=_NoopIngestor(),
             validator=_NoopValidator(),
             detail_renderer=UVLDetailRenderer(),
-            facets=(),
+            facets=(UVLFacetProvider(),),
         )
     )
 
@@ -10,37 +10,35 @@ class TabularVersionStrategy:
     def snapshot(self, dataset):
         from app.modules.hubfile.services import HubfileService
 
-        hsvc = HubfileService()
+        files = [f for fm in dataset.feature_models for f in fm.files if f.name.lower().endswith(".csv")]
+        paths = HubfileService().get_paths_by_hubfile_ids(f.id for f in files)
         summary, total_rows, max_cols = [], 0, 0
 
-        for fm in dataset.feature_models:
-            for f in fm.files:
-                if not f.name.lower().endswith(".csv"):
-                    continue
-
-                path = Path(hsvc.get_path_by_hubfile(f))
-                n_rows, n_cols = 0, None
-                if path.exists():
-                    try:
-                        with path.open("r", encoding="utf-8", newline="") as fh:
-                            reader = csv.reader(fh)
-                            for i, row in enumerate(reader):
-                                if i == 0:
-                                    n_cols = len(row)
-                                n_rows += 1
-                    except Exception:
-                        pass
-
-                total_rows += n_rows
-                max_cols = max(max_cols, n_cols or 0)
-                summary.append(
-                    {
-                        "file": f.name,
-                        "rows": n_rows,
-                        "columns": n_cols,
-                        "size": getattr(f, "size", None),
-                    }
-                )
+        for f in files:
+            path = paths.get(f.id)
+            n_rows, n_cols = 0, None
+            if path and Path(path).exists():
+                try:
+                    with open(path, "r", encoding="utf-8", newline="") as fh:
+                        reader = csv.reader(fh)
+                        for i, row in enumerate(reader):
+                            if i == 0:
+                                n_cols = len(row)
+                            n_rows += 1
+                except Exception:
+                    pass
+
+            total_rows += n_rows
+            max_cols = max(max_cols, n_cols or 0)
+            summary.append(
+                {
+                    "file": f.name,
+                    "rows": n_rows,
+                    "columns": n_cols,
+                    "size": getattr(f, "size", None),
+                    "sha256": getattr(f, "sha256", None),
+                }
+            )
 
         return {
             "type": "tabular",
@@ -57,28 +55,26 @@ class UVLVersionStrategy:
     def snapshot(self, dataset):
         from app.modules.hubfile.services import HubfileService
 
-        hsvc = HubfileService()
+        files = [f for fm in dataset.feature_models for f in fm.files if f.name.lower().endswith(".uvl")]
+        paths = HubfileService().get_paths_by_hubfile_ids(f.id for f in files)
         summary = []
 
-        for fm in dataset.feature_models:
-            for f in fm.files:
-                if not f.name.lower().endswith(".uvl"):
-                    continue
-
-                path = Path(hsvc.get_path_by_hubfile(f))
-                chars = 0
-                if path.exists():
-                    try:
-                        chars = len(path.read_text(encoding="utf-8", errors="ignore"))
-                    except Exception:
-                        pass
-
-                summary.append(
-                    {
-                        "file": f.name,
-                        "chars": chars,
-                        "size": getattr(f, "size", None),
-                    }
-                )
+        for f in files:
+            path = paths.get(f.id)
+            chars = 0
+            if path and Path(path).exists():
+                try:
+                    chars = len(Path(path).read_text(encoding="utf-8", errors="ignore"))
+                except Exception:
+                    pass
+
+            summary.append(
+                {
+                    "file": f.name,
+                    "chars": chars,
+                    "size": getattr(f, "size", None),
+                    "sha256": getattr(f, "sha256", None),
+                }
+            )
 
         return {"type": "uvl", "files": summary}
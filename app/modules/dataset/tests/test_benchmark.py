@@ -0,0 +1,59 @@
+import io
+import zipfile
+
+from app import db
+from core.services.benchmark import (
+    CatalogSize,
+    compare,
+    default_scenarios,
+    percentile,
+    report,
+    run_benchmarks,
+    seed_catalog,
+)
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 21))
+
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile([], 95) == 0.0
+
+
+def test_scenarios_run_against_seeded_catalog(test_app, clean_database, tmp_path, monkeypatch):
+    monkeypatch.setitem(test_app.config, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setenv("WORKING_DIR", str(tmp_path))
+    size = CatalogSize(datasets=6, authors=2, columns=3, users=3, follows=2, csv_rows=5)
+    with test_app.app_context():
+        catalog = seed_catalog(db, size)
+        db.session.remove()
+
+    # La descarga empaqueta los ficheros sembrados, no un zip vacío
+    with test_app.test_client() as client:
+        response = client.get(f"/dataset/download/{catalog.dataset_ids[0]}")
+        with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+            assert len(archive.namelist()) == 1
+
+        results = run_benchmarks(test_app, catalog, default_scenarios(), iterations=2, warmup=0)
+
+    document = report(results, size, 2)
+    scenarios = document["scenarios"]
+    assert set(scenarios) >= {"homepage", "explore_search", "doi_page", "download", "recommendations", "tabular_ingest"}
+    assert all(row["errors"] == 0 for row in scenarios.values()), scenarios
+    assert scenarios["doi_page"]["queries"] > 0
+    assert scenarios["homepage"]["samples"] == 2
+
+
+def test_compare_flags_latency_and_query_regressions():
+    baseline = {"scenarios": {"doi_page": {"p95_ms": 10.0, "queries": 5, "errors": 0}}}
+
+    def current(p95_ms, queries, errors=0):
+        return {"scenarios": {"doi_page": {"p95_ms": p95_ms, "queries": queries, "errors": errors}}}
+
+    assert compare(current(12.0, 5), baseline) == []
+    regressions = compare(current(20.0, 7), baseline)
+    assert [(r.metric, r.baseline, r.current) for r in regressions] == [("p95_ms", 10.0, 20.0), ("queries", 5, 7)]
+    assert compare(current(20.0, 7), baseline, tolerance=1.5, query_tolerance=2) == []
+    assert [r.metric for r in compare(current(50.0, 7), baseline, tolerance=None)] == ["queries"]
+    assert [r.metric for r in compare(current(10.0, 5, errors=1), baseline)] == ["errors"]
@@ -0,0 +1,112 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+from click.testing import CliRunner
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import Author, DataSet, DSMetaData, PublicationType
+from app.modules.dataset.services import CatalogExporter
+from app.modules.featuremodel.models import FeatureModel
+from app.modules.hubfile.models import Hubfile
+from app.modules.tabular.models import TabularColumn, TabularDataset, TabularMetaData
+from rosemary.commands.export_catalog import export_catalog
+
+
+def _seed():
+    user = User(email="export@example.com")
+    user.set_password("pwd12345")
+    db.session.add(user)
+    db.session.flush()
+
+    uvl_md = DSMetaData(title="UVL", description="d", publication_type=PublicationType.OTHER, tags="a, b")
+    tab_md = DSMetaData(title="CSV", description="d", publication_type=PublicationType.REPORT)
+    db.session.add_all([uvl_md, tab_md])
+    db.session.flush()
+    db.session.add(Author(name="Ada", ds_meta_data_id=uvl_md.id))
+
+    uvl = DataSet(user_id=user.id, ds_meta_data_id=uvl_md.id)
+    tab = TabularDataset(user_id=user.id, ds_meta_data_id=tab_md.id, rows_count=3)
+    db.session.add_all([uvl, tab])
+    db.session.flush()
+    fm = FeatureModel(data_set_id=uvl.id)
+    db.session.add(fm)
+    db.session.flush()
+    db.session.add(Hubfile(name="model.uvl", feature_model_id=fm.id, size=10, checksum="c1"))
+    meta = TabularMetaData(dataset_id=tab.id, n_rows=3, n_cols=1, delimiter=",")
+    db.session.add(meta)
+    db.session.flush()
+    db.session.add(TabularColumn(meta_id=meta.id, name="age", dtype="int"))
+    db.session.commit()
+    return uvl.id, tab.id
+
+
+def test_exporter_streams_batches_with_related_data(test_app, clean_database):
+    with test_app.app_context():
+        uvl_id, tab_id = _seed()
+        records = list(CatalogExporter(batch_size=1).iter_records())
+
+    assert [record["id"] for record in records] == [uvl_id, tab_id]
+    uvl, tab = records
+    assert uvl["authors"] == [{"name": "Ada", "affiliation": None, "orcid": None}]
+    assert uvl["tags"] == ["a", "b"]
+    assert [f["name"] for f in uvl["files"]] == ["model.uvl"]
+    assert "tabular" not in uvl
+    assert tab["tabular"]["columns"] == [{"name": "age", "dtype": "int", "null_count": 0, "unique_count": 0}]
+
+
+def test_export_endpoint_ndjson_gzip_and_watermark(test_client, clean_database):
+    with test_client.application.app_context():
+        uvl_id, tab_id = _seed()
+        # El dataset UVL no cambia desde hace un día (UPDATE directo: no pasa por el contador de revisión)
+        old = datetime.utcnow() - timedelta(days=1)
+        db.session.execute(
+            db.update(DataSet.__table__).where(DataSet.id == uvl_id).values(created_at=old, updated_at=old)
+        )
+        db.session.commit()
+
+    response = test_client.get("/api/datasets/export")
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["X-Export-Watermark"]
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [uvl_id, tab_id]
+
+    since = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    compressed = test_client.get(f"/api/datasets/export?compression=gzip&updated_since={since}")
+    assert compressed.mimetype == "application/gzip"
+    lines = gzip.decompress(compressed.data).decode("utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [tab_id]
+
+    assert test_client.get("/api/datasets/export?updated_since=yesterday").status_code == 400
+
+
+def test_watermark_overlaps_transactions_in_flight(test_app, clean_database):
+    with test_app.app_context():
+        uvl_id, _tab_id = _seed()
+        started = datetime.now(timezone.utc).replace(tzinfo=None)
+        first = CatalogExporter(overlap=60)
+        list(first.iter_records())
+        assert first.watermark < started
+
+        # Una transacción que hizo flush antes del volcado y confirma después: updated_at < inicio
+        flushed_at = started - timedelta(seconds=5)
+        db.session.execute(db.update(DataSet.__table__).where(DataSet.id == uvl_id).values(updated_at=flushed_at))
+        db.session.commit()
+
+        since = [r["id"] for r in CatalogExporter(updated_since=first.watermark).iter_records()]
+        without_overlap = [r["id"] for r in CatalogExporter(updated_since=started).iter_records()]
+
+    assert uvl_id in since
+    assert uvl_id not in without_overlap
+
+
+def test_export_command_writes_gzip_file(test_app, clean_database, tmp_path):
+    with test_app.app_context():
+        _seed()
+        target = tmp_path / "catalog.ndjson.gz"
+        result = CliRunner().invoke(export_catalog, ["-o", str(target), "--batch-size", "1"])
+
+    assert result.exit_code == 0, result.output
+    assert "Exported 2 dataset(s)" in result.output
+    assert len(gzip.decompress(target.read_bytes()).splitlines()) == 2
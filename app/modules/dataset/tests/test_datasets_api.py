@@ -0,0 +1,68 @@
+import json
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.conftest import count_queries
+from app.modules.dataset.models import DSMetaData, PublicationType, UVLDataset
+from app.modules.tabular.models import TabularDataset
+
+
+def _seed():
+    user = User(email="api-list@example.com")
+    user.set_password("pwd12345")
+    db.session.add(user)
+    db.session.flush()
+    ids = []
+    for title, model, extra in [
+        ("UVL A", UVLDataset, {}),
+        ("Tab B", TabularDataset, {"rows_count": 7}),
+        ("UVL C", UVLDataset, {}),
+    ]:
+        md = DSMetaData(title=title, description="Desc", publication_type=PublicationType.OTHER)
+        db.session.add(md)
+        db.session.flush()
+        dataset = model(user_id=user.id, ds_meta_data_id=md.id, **extra)
+        db.session.add(dataset)
+        db.session.flush()
+        ids.append(dataset.id)
+    db.session.commit()
+    return ids
+
+
+def test_polymorphic_listing_keeps_array_shape_with_projection_query(test_client, clean_database):
+    with test_client.application.app_context():
+        first, second, third = _seed()
+
+    with count_queries() as statements:
+        response = test_client.get("/api/datasets-polymorphic")
+        body = response.get_json()
+
+    assert response.status_code == 200
+    assert body == [
+        {"id": third, "type": "uvl", "title": "UVL C"},
+        {"id": second, "type": "tabular", "title": "Tab B", "rows_count": 7},
+        {"id": first, "type": "uvl", "title": "UVL A"},
+    ]
+    # Validador del ETag + una consulta de proyección, sin cargas perezosas por fila
+    assert len(statements) == 2
+
+
+def test_polymorphic_listing_keyset_pagination_and_ndjson(test_client, clean_database):
+    with test_client.application.app_context():
+        first, second, third = _seed()
+
+    page = test_client.get("/api/datasets-polymorphic?limit=2")
+    assert [item["id"] for item in page.get_json()] == [third, second]
+    assert f"after_id={second}" in page.headers["Link"]
+
+    last = test_client.get(f"/api/datasets-polymorphic?limit=2&after_id={second}")
+    assert [item["id"] for item in last.get_json()] == [first]
+    assert "Link" not in last.headers
+
+    ndjson = test_client.get("/api/datasets-polymorphic?format=ndjson")
+    assert ndjson.mimetype == "application/x-ndjson"
+    lines = ndjson.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [third, second, first]
+
+    assert test_client.get("/api/datasets-polymorphic?limit=0").status_code == 400
+    assert test_client.get("/api/datasets-polymorphic?after_id=abc").status_code == 400
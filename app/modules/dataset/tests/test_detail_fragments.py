@@ -0,0 +1,86 @@
+from app import db
+from app.modules.auth.models import User
+from app.modules.conftest import count_queries
+from app.modules.dataset.models import DataSet, DatasetVersion, DSMetaData, PublicationType
+
+
+def _create_dataset(email: str, doi: str) -> DataSet:
+    user = User(email=email)
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(title="Cached", description="Desc", publication_type=PublicationType.OTHER, dataset_doi=doi)
+    db.session.add(md)
+    db.session.flush()
+    dataset = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(dataset)
+    db.session.commit()
+    return dataset
+
+
+def test_revision_bumps_on_content_changes_only(test_app, clean_database):
+    with test_app.app_context():
+        dataset = _create_dataset("rev@example.com", "10.1234/rev")
+        assert dataset.revision == 0
+
+        dataset.view_count += 1
+        dataset.download_count += 1
+        db.session.commit()
+        assert dataset.revision == 0
+
+        dataset.ds_meta_data.title = "Renamed"
+        db.session.commit()
+        assert dataset.revision == 1
+        assert dataset.updated_at is not None
+
+        # Objeto dependiente creado sólo con la clave ajena
+        db.session.add(DatasetVersion(dataset_id=dataset.id, version="1.0.0"))
+        db.session.commit()
+        assert dataset.revision == 2
+
+
+def test_detail_blocks_are_cached_per_revision(test_client, clean_database):
+    app = test_client.application
+    with app.app_context():
+        dataset = _create_dataset("fragments@example.com", "10.1234/fragments")
+        dataset_id = dataset.id
+
+    assert test_client.get("/doi/10.1234/fragments/").status_code == 200
+    with count_queries() as statements:
+        response = test_client.get("/doi/10.1234/fragments/")
+    assert response.status_code == 200
+    assert b"No versions yet" in response.data
+    assert not [s for s in statements if "FROM dataset_version" in s]
+
+    with app.app_context():
+        db.session.add(DatasetVersion(dataset_id=dataset_id, version="2.0.0", change_note="Nueva versión"))
+        db.session.commit()
+
+    response = test_client.get("/doi/10.1234/fragments/")
+    assert b"v2.0.0" in response.data
+    assert b"No versions yet" not in response.data
+
+
+def test_recreated_dataset_does_not_reuse_cached_blocks(test_client, clean_database):
+    app = test_client.application
+    with app.app_context():
+        dataset = _create_dataset("first@example.com", "10.1234/recreated")
+        dataset_id = dataset.id
+        # INSERT directo: no pasa por el contador, así que el bloque queda cacheado con revisión 0
+        db.session.execute(
+            db.insert(DatasetVersion.__table__).values(dataset_id=dataset_id, version="3.0.0", change_note="Antigua")
+        )
+        db.session.commit()
+        assert dataset.revision == 0
+    assert b"v3.0.0" in test_client.get("/doi/10.1234/recreated/").data
+
+    # Misma BD recreada: el nuevo dataset reutiliza el id y vuelve a la revisión 0
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        dataset = _create_dataset("second@example.com", "10.1234/recreated")
+        assert (dataset.id, dataset.revision) == (dataset_id, 0)
+
+    response = test_client.get("/doi/10.1234/recreated/")
+    assert response.status_code == 200
+    assert b"v3.0.0" not in response.data
+    assert b"No versions yet" in response.data
@@ -0,0 +1,66 @@
+from app import db
+from app.modules.auth.models import User
+from app.modules.conftest import count_queries
+from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from app.modules.dataset.services import DOIMappingService, DOIResolver, doi_resolver
+
+
+def _create_dataset(email: str, doi: str) -> DataSet:
+    user = User(email=email)
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(title="DOI Dataset", description="Desc", publication_type=PublicationType.OTHER, dataset_doi=doi)
+    db.session.add(md)
+    db.session.flush()
+    dataset = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(dataset)
+    db.session.commit()
+    return dataset
+
+
+def test_warm_resolver_answers_without_queries(test_app, clean_database):
+    with test_app.app_context():
+        dataset_id = _create_dataset("doi-warm@example.com", "10.1234/warm").id
+        resolver = DOIResolver()
+        resolver.warm()
+        resolver.register_mapping("10.1234/old", "10.1234/warm")
+
+        with count_queries() as statements:
+            assert resolver.resolve("10.1234/warm").dataset_id == dataset_id
+            assert resolver.resolve("10.1234/old").redirect_doi == "10.1234/warm"
+        assert statements == []
+
+        # DOI desconocido: se busca en la BD una vez
+        assert resolver.resolve("10.1234/missing") is None
+
+
+def test_doi_page_uses_resolver_and_mappings(test_client, clean_database):
+    with test_client.application.app_context():
+        dataset = _create_dataset("doi-page@example.com", "10.1234/page")
+        DOIMappingService().create(dataset_doi_old="10.1234/page-old", dataset_doi_new="10.1234/page")
+        dataset_id = dataset.id
+
+    response = test_client.get("/doi/10.1234/page-old/")
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/doi/10.1234/page/")
+
+    # Una entrada obsoleta (p. ej. de otro proceso) se corrige en lugar de servir otro dataset
+    doi_resolver.register("10.1234/page", dataset_id + 1000)
+    response = test_client.get("/doi/10.1234/page/")
+    assert response.status_code == 200
+    assert doi_resolver.resolve("10.1234/page").dataset_id == dataset_id
+
+    assert test_client.get("/doi/10.1234/unknown/").status_code == 404
+
+
+def test_stale_entry_follows_a_mapping_created_elsewhere(test_client, clean_database):
+    with test_client.application.app_context():
+        dataset = _create_dataset("doi-moved@example.com", "10.1234/moved-old")
+        doi_resolver.register("10.1234/moved-old", dataset.id)
+        # Otro proceso cambia el DOI y guarda la correspondencia antiguo -> nuevo
+        dataset.ds_meta_data.dataset_doi = "10.1234/moved-new"
+        DOIMappingService().create(dataset_doi_old="10.1234/moved-old", dataset_doi_new="10.1234/moved-new")
+
+    response = test_client.get("/doi/10.1234/moved-old/")
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/doi/10.1234/moved-new/")
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.conftest import count_queries
+from app.modules.dataset.models import DataSet, DSMetaData, DSViewRecord, PublicationType
+
+
+def _create_dataset(email: str) -> DataSet:
+    user = User(email=email)
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(title="Cacheable", description="Desc", publication_type=PublicationType.OTHER)
+    db.session.add(md)
+    db.session.flush()
+    dataset = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(dataset)
+    db.session.commit()
+    return dataset
+
+
+def test_dataset_api_answers_304_until_revision_changes(test_client, clean_database):
+    with test_client.application.app_context():
+        dataset_id = _create_dataset("etag@example.com").id
+
+    first = test_client.get(f"/api/datasets/{dataset_id}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert "public" in first.headers["Cache-Control"]
+    assert "max-age=60" in first.headers["Cache-Control"]
+
+    cached = test_client.get(f"/api/datasets/{dataset_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+    assert cached.headers["ETag"] == etag
+
+    with test_client.application.app_context():
+        db.session.get(DataSet, dataset_id).ds_meta_data.title = "Renamed"
+        db.session.commit()
+
+    changed = test_client.get(f"/api/datasets/{dataset_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["title"] == "Renamed"
+    assert changed.headers["ETag"] != etag
+
+    listing = test_client.get("/api/datasets-polymorphic")
+    assert listing.get_json()[0]["id"] == dataset_id
+    assert "Accept" in listing.headers["Vary"]
+    not_modified = test_client.get("/api/datasets-polymorphic", headers={"If-None-Match": listing.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert "Accept" in not_modified.headers["Vary"]
+
+    # Otro formato u otra página no reutiliza el ETag del listado JSON completo
+    etag = {"If-None-Match": listing.headers["ETag"]}
+    for url, headers in (
+        ("/api/datasets-polymorphic", {**etag, "Accept": "application/x-ndjson"}),
+        ("/api/datasets-polymorphic?format=ndjson", etag),
+        ("/api/datasets-polymorphic?limit=1", etag),
+    ):
+        response = test_client.get(url, headers=headers)
+        # La respuesta se genera en streaming: se consume para cerrar su contexto
+        assert response.status_code == 200 and response.get_data()
+
+    assert test_client.get("/api/datasets/999999").status_code == 404
+
+
+def test_trending_and_stats_conditional_requests(test_client, clean_database):
+    with test_client.application.app_context():
+        dataset_id = _create_dataset("trending-etag@example.com").id
+
+    trending = test_client.get("/datasets/trending")
+    assert trending.status_code == 200
+    last_modified = trending.headers["Last-Modified"]
+    later = (datetime.utcnow() + timedelta(minutes=5)).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    assert test_client.get("/datasets/trending", headers={"If-Modified-Since": later}).status_code == 304
+    assert test_client.get("/datasets/trending", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    # Validadores de los contadores: el 304 se responde con una sola consulta
+    stats = test_client.get(f"/datasets/{dataset_id}/stats")
+    assert stats.get_json() == {"dataset_id": dataset_id, "downloads": 0, "views": 0}
+    with count_queries() as statements:
+        repeat = test_client.get(f"/datasets/{dataset_id}/stats", headers={"If-None-Match": stats.headers["ETag"]})
+    assert repeat.status_code == 304
+    assert len(statements) == 1
+
+    with test_client.application.app_context():
+        db.session.add(DSViewRecord(dataset_id=dataset_id, view_cookie="c1"))
+        db.session.commit()
+    changed = test_client.get(f"/datasets/{dataset_id}/stats", headers={"If-None-Match": stats.headers["ETag"]})
+    assert changed.status_code == 200 and changed.get_json()["views"] == 1
+    assert test_client.get("/datasets/999999/stats").status_code == 404
@@ -0,0 +1,47 @@
+from click.testing import CliRunner
+
+from app import db
+from core.services.index_advisor import advise, create_indexes, render_migration, summarize
+from rosemary.commands.index_advisor import index_advisor
+
+
+def _report(reports, name):
+    return next(report for report in reports if report.query.name == name)
+
+
+def test_schema_covers_hot_path_queries(test_app, clean_database):
+    with test_app.app_context():
+        reports = advise(db.engine)
+
+        assert all(report.error is None for report in reports)
+        assert summarize(reports) == {}
+        assert _report(reports, "doi_lookup").full_scans == []
+
+
+def test_missing_index_is_reported_and_rendered(test_app, clean_database):
+    with test_app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_ds_meta_data_dataset_doi")
+        # Las conexiones del pool guardan sentencias preparadas con el esquema anterior
+        db.engine.dispose()
+
+        reports = advise(db.engine)
+        doi_lookup = _report(reports, "doi_lookup")
+        assert doi_lookup.full_scans == ["ds_meta_data"]
+        assert [spec.index_name for spec in doi_lookup.missing] == ["ix_ds_meta_data_dataset_doi"]
+
+        missing = summarize(reports)["ds_meta_data"]
+        _, source = render_migration(missing, "c4a7e9d2b815")
+        assert 'down_revision = "c4a7e9d2b815"' in source
+        assert 'op.create_index("ix_ds_meta_data_dataset_doi", "ds_meta_data", ["dataset_doi"])' in source
+        compile(source, "migration.py", "exec")
+
+        result = CliRunner().invoke(index_advisor, ["--apply"])
+        assert result.exit_code == 0, result.output
+        assert "doi_lookup: full scan on ds_meta_data" in result.output
+        assert summarize(advise(db.engine)) == {}
+
+
+def test_create_indexes_is_noop_for_empty_list(test_app, clean_database):
+    with test_app.app_context():
+        assert create_indexes(db.engine, []) == []
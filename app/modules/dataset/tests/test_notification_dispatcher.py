@@ -0,0 +1,119 @@
+import socketserver
+import threading
+
+import pytest
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.auth.services import FollowService
+from app.modules.dataset.models import Author, DSMetaData, PublicationType
+from app.modules.dataset.services.notification_dispatcher import NotificationDispatcher
+from app.modules.tabular.models import TabularDataset
+from core.services import email_service
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: acepta todo y guarda los mensajes recibidos."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            verb = line.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250 stand-in")
+            elif verb == "RCPT":
+                recipients.append(line.split(":", 1)[1].strip("<> "))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                body = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    body.append(data.decode())
+                self.server.messages.append({"recipients": recipients, "body": "".join(body)})
+                recipients = []
+                self.reply("250 OK queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_server(test_app, monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+    server.daemon_threads = True
+    server.connections, server.messages = 0, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for key, value in {
+        "MAIL_SERVER": "127.0.0.1",
+        "MAIL_PORT": server.server_address[1],
+        "MAIL_USE_TLS": False,
+        "MAIL_USE_SSL": False,
+        "MAIL_USERNAME": None,
+        "MAIL_DEFAULT_SENDER": "noreply@fifahub.test",
+    }.items():
+        monkeypatch.setitem(test_app.config, key, value)
+    try:
+        yield server
+    finally:
+        email_service.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_email_service_reuses_one_connection(test_app, smtp_server):
+    with test_app.app_context():
+        for i in range(3):
+            email_service.send_email(subject=f"s{i}", recipients=["a@example.com"], html_body="<p>hi</p>")
+
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 1
+
+
+def test_dispatcher_sends_one_digest_per_follower(test_app, clean_database, smtp_server):
+    with test_app.app_context():
+        follower = User(email="digest@example.com")
+        follower.set_password("pwd12345")
+        db.session.add(follower)
+        db.session.flush()
+        author = Author(id=follower.id + 100, name="Prolific Author")
+        db.session.add(author)
+        db.session.commit()
+        FollowService().follow_author(follower, author)
+        FollowService().follow_community(follower, "bulk")
+
+        dataset_ids = []
+        for i in range(4):
+            md = DSMetaData(
+                title=f"Bulk {i}", description="d", publication_type=PublicationType.OTHER, tags="community:bulk"
+            )
+            md.authors.append(Author(name="Prolific Author") if i else author)
+            db.session.add(md)
+            db.session.flush()
+            dataset = TabularDataset(user_id=follower.id, ds_meta_data_id=md.id)
+            db.session.add(dataset)
+            db.session.commit()
+            dataset_ids.append(dataset.id)
+
+        dispatcher = NotificationDispatcher(workers=2, queue_size=2, digest_window=60)
+        try:
+            assert all(dispatcher.submit(dataset_id) for dataset_id in dataset_ids)
+            assert dispatcher.drain() == 1
+        finally:
+            dispatcher.shutdown()
+
+    assert len(smtp_server.messages) == 1
+    message = smtp_server.messages[0]
+    assert message["recipients"] == ["digest@example.com"]
+    assert "4 new datasets" in message["body"]
+    assert all(f"Bulk {i}" in message["body"] for i in range(4))
@@ -88,3 +88,44 @@ def test_community_notification_flow(monkeypatch, test_app, clean_database):
         assert len(sent_emails) >= 1
         assert follower.email in sent_emails[0]["recipients"]
         assert community_id in sent_emails[0]["subject"]
+
+
+def test_follower_of_author_and_community_is_notified_once(monkeypatch, test_app, clean_database):
+    sent_emails: list[dict] = []
+
+    def fake_send_email(subject, recipients, html_body):
+        sent_emails.append({"subject": subject, "recipients": recipients, "html_body": html_body})
+
+    monkeypatch.setattr("core.services.email_service.send_email", fake_send_email)
+
+    with test_app.app_context():
+        both = _create_user("both@example.com")
+        community_only = _create_user("community-only@example.com")
+        uploader = _create_user("both-uploader@example.com")
+        author = Author(id=uploader.id + 200, name="Shared Author")
+        db.session.add(author)
+        db.session.commit()
+
+        follow_service = FollowService()
+        follow_service.follow_author(both, author)
+        follow_service.follow_community(both, "shared")
+        follow_service.follow_community(community_only, "shared")
+
+        batches = list(follow_service.iter_follower_emails(author=author, community="shared", batch_size=1))
+        assert batches == [[("both@example.com", True)], [("community-only@example.com", False)]]
+
+        ds_md = DSMetaData(
+            title="Dataset Both", description="Desc", publication_type=PublicationType.OTHER, tags="community:shared"
+        )
+        ds_md.authors.append(author)
+        db.session.add(ds_md)
+        db.session.flush()
+        dataset = TabularDataset(user_id=uploader.id, ds_meta_data_id=ds_md.id)
+        db.session.add(dataset)
+        db.session.commit()
+
+        notification_service.notify_new_dataset_sync(dataset)
+
+    recipients = [r for email in sent_emails for r in email["recipients"]]
+    assert sorted(recipients) == ["both@example.com", "community-only@example.com"]
+    assert "Shared Author" in sent_emails[0]["subject"]
@@ -0,0 +1,83 @@
+import hashlib
+import io
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from app.modules.auth.models import User
+from app.modules.conftest import login, logout
+from app.modules.dataset.services.services import calculate_checksum_and_size, get_upload_digest
+from core.services.hashing import DigestIndex, digest_file, save_stream
+
+UVL_CONTENT = b"features\n    Root\n        optional\n            A\n            B\n"
+
+
+def test_save_stream_hashes_while_writing(tmp_path):
+    payload = b"x" * 200_000
+    dest = tmp_path / "big.csv"
+
+    digest = save_stream(io.BytesIO(payload), str(dest), chunk_size=4096)
+
+    assert dest.read_bytes() == payload
+    assert digest.md5 == hashlib.md5(payload).hexdigest()
+    assert digest.sha256 == hashlib.sha256(payload).hexdigest()
+    assert digest.size == len(payload)
+    assert digest_file(str(dest)) == digest
+
+
+def test_calculate_checksum_and_size_is_backwards_compatible(tmp_path):
+    path = tmp_path / "model.uvl"
+    path.write_bytes(UVL_CONTENT)
+
+    checksum, size = calculate_checksum_and_size(str(path))
+
+    assert checksum == hashlib.md5(UVL_CONTENT).hexdigest()
+    assert size == len(UVL_CONTENT)
+
+
+def test_get_upload_digest_prefers_recorded_digest(tmp_path):
+    path = tmp_path / "model.uvl"
+    path.write_bytes(UVL_CONTENT)
+    recorded = digest_file(str(path))
+    DigestIndex(str(tmp_path)).put("model.uvl", recorded)
+
+    # Changing the file proves the index is used instead of re-reading it
+    path.write_bytes(b"changed")
+
+    assert get_upload_digest(str(tmp_path), "model.uvl") == recorded
+    DigestIndex(str(tmp_path)).discard("model.uvl")
+    assert get_upload_digest(str(tmp_path), "model.uvl").size == len(b"changed")
+
+
+def test_digest_index_keeps_parallel_puts(tmp_path):
+    index = DigestIndex(str(tmp_path))
+    digest = digest_file(__file__)
+    names = [f"model_{i}.uvl" for i in range(32)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda name: index.put(name, digest), names))
+
+    assert all(index.get(name) == digest for name in names)
+
+
+def test_upload_endpoint_records_digest(test_client):
+    user = User.query.filter_by(email="test@example.com").first()
+    login(test_client, "test@example.com", "test1234")
+    try:
+        response = test_client.post(
+            "/dataset/file/upload",
+            data={"file": (io.BytesIO(UVL_CONTENT), "digest_test.uvl")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 200
+        filename = response.get_json()["filename"]
+
+        digest = DigestIndex(user.temp_folder()).get(filename)
+        assert digest is not None
+        assert digest.sha256 == hashlib.sha256(UVL_CONTENT).hexdigest()
+        assert digest.size == len(UVL_CONTENT)
+
+        test_client.post("/dataset/file/delete", json={"file": filename})
+        assert DigestIndex(user.temp_folder()).get(filename) is None
+    finally:
+        shutil.rmtree(user.temp_folder(), ignore_errors=True)
+        logout(test_client)
@@ -2,11 +2,12 @@ import re
 from datetime import datetime
 
 import unidecode
-from sqlalchemy import any_, or_
+from sqlalchemy import and_, any_, or_
 
-from app.modules.dataset.models import Author, DataSet, DSMetaData, PublicationType
-from app.modules.featuremodel.models import FeatureModel, FMMetaData
+from app.modules.dataset.models import Author, DataSet, DSMetaData, DSMetrics, PublicationType
+from app.modules.featuremodel.models import FeatureModel, FMMetaData, FMMetrics
 from app.modules.tabular.models import TabularColumn, TabularDataset, TabularMetaData
+from app.modules.uvl.renderers import FEATURE_BUCKETS
 from core.repositories.BaseRepository import BaseRepository
 
 
@@ -31,7 +32,7 @@ class ExploreRepository(BaseRepository):
 
         results = []
         if dataset_type in ("any", "uvl"):
-            results.extend(self._filter_uvl(words, publication_type, tags))
+            results.extend(self._filter_uvl(words, publication_type, tags, facets))
         if dataset_type in ("any", "tabular"):
             results.extend(self._filter_tabular(words, publication_type, tags, facets))
 
@@ -88,7 +89,8 @@ class ExploreRepository(BaseRepository):
             filters.append(TabularMetaData.columns.any(TabularColumn.dtype.ilike(f"%{word}%")))
         return filters
 
-    def _filter_uvl(self, words, publication_type, tags):
+    def _filter_uvl(self, words, publication_type, tags, facets=None):
+        facets = facets or {}
         filters = self._build_common_filters(words) + self._build_uvl_filters(words)
         datasets = (
             self.model.query.join(DataSet.ds_meta_data)
@@ -102,8 +104,31 @@ class ExploreRepository(BaseRepository):
         datasets = self._apply_publication_type_filter(datasets, publication_type)
         if tags:
             datasets = datasets.filter(DSMetaData.tags.ilike(any_(f"%{tag}%" for tag in tags)))
+        datasets = self._apply_uvl_facets(datasets, facets)
         return datasets.distinct().all()
 
+    def _apply_uvl_facets(self, datasets, facets):
+        """Filtra con las métricas precalculadas por el análisis (FMMetrics/DSMetrics)."""
+        satisfiable = facets.get("satisfiable")
+        if satisfiable:
+            wants_yes = "yes" in satisfiable and "no" not in satisfiable
+            wants_no = "no" in satisfiable and "yes" not in satisfiable
+            if wants_yes or wants_no:
+                datasets = datasets.outerjoin(FMMetaData.fm_metrics).filter(FMMetrics.satisfiable.is_(wants_yes))
+
+        buckets = [FEATURE_BUCKETS[b] for b in facets.get("features") or [] if b in FEATURE_BUCKETS]
+        if buckets:
+            ranges = []
+            for low, high in buckets:
+                conditions = []
+                if low is not None:
+                    conditions.append(DSMetrics.number_of_features >= low)
+                if high is not None:
+                    conditions.append(DSMetrics.number_of_features < high)
+                ranges.append(and_(*conditions))
+            datasets = datasets.join(DSMetaData.ds_metrics).filter(or_(*ranges))
+        return datasets
+
     def _filter_tabular(self, words, publication_type, tags, facets):
         filters = self._build_common_filters(words) + self._build_tabular_filters(words)
         datasets = (
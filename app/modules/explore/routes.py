@@ -8,9 +8,11 @@ from app.modules.explore import explore_bp
 from app.modules.explore.forms import ExploreForm
 from app.modules.explore.services import ExploreService
 from app.modules.tabular.models import TabularDataset
+from core.security import rate_limit
 
 
 @explore_bp.route("/explore", methods=["GET", "POST"])
+@rate_limit("explore", limit="EXPLORE_RATE_LIMIT", window="EXPLORE_RATE_WINDOW")
 def index():
     if request.method == "GET":
         query = request.args.get("q", "").strip() or request.args.get("query", "").strip()
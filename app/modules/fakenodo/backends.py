@@ -0,0 +1,224 @@
+"""
+Almacenes alternativos para Fakenodo cuando se usa como sustituto de Zenodo en pruebas de carga.
+
+``FAKENODO_BACKEND`` elige el almacén: ``db`` (por defecto, la base de datos de la app),
+``memory`` (diccionario en proceso, sin E/S) o ``sqlite`` (fichero SQLite propio en modo WAL,
+``FAKENODO_SQLITE_PATH``). Los tres exponen la misma interfaz que ``FakenodoRepository``.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from core.configuration.configuration import uploads_folder_name
+from core.services.hashing import FileDigest
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("db", "memory", "sqlite")
+
+
+@dataclass
+class FakenodoRecord:
+    """Deposition fuera de la base de datos principal, con los mismos atributos que el modelo ``Fakenodo``."""
+
+    id: int
+    meta_data: dict = field(default_factory=dict)
+    status: str = "draft"
+    doi: Optional[str] = None
+
+    @property
+    def files(self) -> list:
+        return (self.meta_data or {}).get("files", [])
+
+
+def _file_info(file_name: str, file_path: Optional[str], file_type: str, digest: Optional[FileDigest]) -> dict:
+    file_info = {"file_name": file_name, "file_path": file_path, "file_type": file_type}
+    if digest is not None:
+        file_info.update({"sha256": digest.sha256, "md5": digest.md5, "size": digest.size})
+    return file_info
+
+
+def _with_file(meta_data: dict, file_info: dict) -> dict:
+    meta_data = dict(meta_data or {})
+    files = [f for f in meta_data.get("files", []) if f.get("file_name") != file_info["file_name"]]
+    meta_data["files"] = files + [file_info]
+    return meta_data
+
+
+class InMemoryFakenodoRepository:
+    """Depositions en un diccionario protegido por un lock. No escribe ficheros: solo guarda digests."""
+
+    stores_content = False
+
+    def __init__(self):
+        self._records: Dict[int, FakenodoRecord] = {}
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def create_new_deposition(self, meta_data: dict = None, doi: str = None) -> FakenodoRecord:
+        with self._lock:
+            record = FakenodoRecord(id=self._next_id, meta_data=dict(meta_data or {}), doi=doi)
+            self._records[record.id] = record
+            self._next_id += 1
+        return record
+
+    def add_csv_file(self, deposition_id: int, file_name: str, file_path: str, digest: FileDigest = None) -> dict:
+        return self.add_file(deposition_id, file_name, file_path, file_type="text/csv", digest=digest)
+
+    def add_file(
+        self,
+        deposition_id: int,
+        file_name: str,
+        file_path: Optional[str],
+        file_type: str = "application/octet-stream",
+        digest: FileDigest = None,
+    ) -> dict:
+        with self._lock:
+            record = self._get(deposition_id)
+            record.meta_data = _with_file(record.meta_data, _file_info(file_name, file_path, file_type, digest))
+            return record.meta_data
+
+    def _get(self, deposition_id: int) -> FakenodoRecord:
+        record = self._records.get(deposition_id)
+        if record is None:
+            raise Exception(f"Deposition with ID {deposition_id} not found.")
+        return record
+
+    def get_deposition(self, deposition_id: int) -> FakenodoRecord:
+        with self._lock:
+            return self._get(deposition_id)
+
+    def list_depositions(self) -> List[FakenodoRecord]:
+        with self._lock:
+            return sorted(self._records.values(), key=lambda r: r.id, reverse=True)
+
+    def save(self, deposition: FakenodoRecord) -> FakenodoRecord:
+        return deposition
+
+    def mark_published(self, deposition: FakenodoRecord, doi: str) -> FakenodoRecord:
+        with self._lock:
+            deposition.doi = doi
+            deposition.status = "published"
+        return deposition
+
+    def delete_deposition(self, deposition_id: int) -> bool:
+        with self._lock:
+            return self._records.pop(deposition_id, None) is not None
+
+
+class SQLiteFakenodoRepository:
+    """
+    Depositions en un fichero SQLite independiente en modo WAL: los lectores no bloquean al escritor
+    y las escrituras no compiten con la base de datos principal. Cada hilo usa su propia conexión.
+    """
+
+    stores_content = True
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = (
+            path
+            or os.getenv("FAKENODO_SQLITE_PATH")
+            or os.path.join(uploads_folder_name(), "fakenodo", "fakenodo.sqlite3")
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fakenodo ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, meta_data TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'draft', doi TEXT UNIQUE)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _record(row) -> FakenodoRecord:
+        return FakenodoRecord(id=row[0], meta_data=json.loads(row[1]), status=row[2], doi=row[3])
+
+    def create_new_deposition(self, meta_data: dict = None, doi: str = None) -> FakenodoRecord:
+        cursor = self._connection().execute(
+            "INSERT INTO fakenodo (meta_data, doi) VALUES (?, ?)", (json.dumps(meta_data or {}), doi)
+        )
+        return FakenodoRecord(id=cursor.lastrowid, meta_data=dict(meta_data or {}), doi=doi)
+
+    def add_csv_file(self, deposition_id: int, file_name: str, file_path: str, digest: FileDigest = None) -> dict:
+        return self.add_file(deposition_id, file_name, file_path, file_type="text/csv", digest=digest)
+
+    def add_file(
+        self,
+        deposition_id: int,
+        file_name: str,
+        file_path: Optional[str],
+        file_type: str = "application/octet-stream",
+        digest: FileDigest = None,
+    ) -> dict:
+        conn = self._connection()
+        # BEGIN IMMEDIATE toma el lock de escritura antes de leer: las subidas paralelas no se pisan
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT meta_data FROM fakenodo WHERE id = ?", (deposition_id,)).fetchone()
+            if row is None:
+                raise Exception(f"Deposition with ID {deposition_id} not found.")
+            meta_data = _with_file(json.loads(row[0]), _file_info(file_name, file_path, file_type, digest))
+            conn.execute("UPDATE fakenodo SET meta_data = ? WHERE id = ?", (json.dumps(meta_data), deposition_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return meta_data
+
+    def get_deposition(self, deposition_id: int) -> FakenodoRecord:
+        row = (
+            self._connection()
+            .execute("SELECT id, meta_data, status, doi FROM fakenodo WHERE id = ?", (deposition_id,))
+            .fetchone()
+        )
+        if row is None:
+            raise Exception(f"Deposition with ID {deposition_id} not found.")
+        return self._record(row)
+
+    def list_depositions(self) -> List[FakenodoRecord]:
+        rows = self._connection().execute("SELECT id, meta_data, status, doi FROM fakenodo ORDER BY id DESC")
+        return [self._record(row) for row in rows]
+
+    def save(self, deposition: FakenodoRecord) -> FakenodoRecord:
+        self._connection().execute(
+            "UPDATE fakenodo SET status = ?, doi = ? WHERE id = ?", (deposition.status, deposition.doi, deposition.id)
+        )
+        return deposition
+
+    def mark_published(self, deposition: FakenodoRecord, doi: str) -> FakenodoRecord:
+        deposition.doi = doi
+        deposition.status = "published"
+        return self.save(deposition)
+
+    def delete_deposition(self, deposition_id: int) -> bool:
+        cursor = self._connection().execute("DELETE FROM fakenodo WHERE id = ?", (deposition_id,))
+        return cursor.rowcount > 0
+
+
+def create_repository(backend: Optional[str] = None):
+    """Instancia el almacén indicado (o ``FAKENODO_BACKEND``)."""
+    backend = (backend or os.getenv("FAKENODO_BACKEND", "db")).lower()
+    if backend == "memory":
+        return InMemoryFakenodoRepository()
+    if backend == "sqlite":
+        return SQLiteFakenodoRepository()
+    if backend not in BACKENDS:
+        logger.warning("Unknown FAKENODO_BACKEND %r, using the application database", backend)
+
+    from app.modules.fakenodo.repositories import FakenodoRepository
+
+    return FakenodoRepository()
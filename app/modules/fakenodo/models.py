@@ -11,6 +11,11 @@ class Fakenodo(db.Model):
     status = db.Column(db.String(100), nullable=False, default="draft")
     doi = db.Column(db.String(250), unique=True, nullable=True)
 
+    @property
+    def files(self) -> list:
+        """Files attached to the deposition, stored inside ``meta_data["files"]``."""
+        return (self.meta_data or {}).get("files", [])
+
     def __repr__(self):
         return f"<Fakenodo {self.id}>"
 
@@ -1,14 +1,21 @@
 import logging
+import threading
 
 from app import db
 from app.modules.fakenodo.models import Fakenodo
+from core.services.hashing import FileDigest
 
 logger = logging.getLogger(__name__)
 
+# Las subidas concurrentes a una misma deposition reescriben meta_data["files"]: se serializan
+_files_lock = threading.Lock()
+
 
 class FakenodoRepository:
     """Repository for interacting with the Fakenodo depositions in the database."""
 
+    stores_content = True
+
     def create_new_deposition(self, meta_data: dict = None, doi: str = None) -> Fakenodo:
         """
         Create a new deposition entry in the database.
@@ -31,7 +38,7 @@ class FakenodoRepository:
         logger.info(f"FakenodoRepository: Created new deposition with ID {deposition.id}")
         return deposition
 
-    def add_csv_file(self, deposition_id: int, file_name: str, file_path: str) -> dict:
+    def add_csv_file(self, deposition_id: int, file_name: str, file_path: str, digest: FileDigest = None) -> dict:
         """
         Attach a CSV file to an existing deposition record.
 
@@ -39,32 +46,67 @@ class FakenodoRepository:
             deposition_id (int): The deposition ID.
             file_name (str): The CSV filename.
             file_path (str): The simulated local path.
+            digest (FileDigest): Optional checksums computed while the file was written.
 
         Returns:
             dict: Updated meta_data with file information.
         """
-        deposition = Fakenodo.query.get(deposition_id)
-        if not deposition:
-            raise Exception(f"Deposition with ID {deposition_id} not found.")
+        return self.add_file(deposition_id, file_name, file_path, file_type="text/csv", digest=digest)
+
+    def add_file(
+        self,
+        deposition_id: int,
+        file_name: str,
+        file_path: str,
+        file_type: str = "application/octet-stream",
+        digest: FileDigest = None,
+    ) -> dict:
+        """
+        Attach a file to an existing deposition record (inside ``meta_data["files"]``).
+        A file uploaded again with the same name replaces the previous entry.
 
-        # Add CSV info inside meta_data["files"]
-        meta_data = deposition.meta_data or {}
-        files = meta_data.get("files", [])
-        files.append(
-            {
+        Returns:
+            dict: Updated meta_data with file information.
+        """
+        with _files_lock:
+            deposition = Fakenodo.query.get(deposition_id)
+            if not deposition:
+                raise Exception(f"Deposition with ID {deposition_id} not found.")
+            db.session.refresh(deposition)
+
+            meta_data = dict(deposition.meta_data or {})
+            files = [f for f in meta_data.get("files", []) if f.get("file_name") != file_name]
+            file_info = {
                 "file_name": file_name,
                 "file_path": file_path,
-                "file_type": "text/csv",
+                "file_type": file_type,
             }
-        )
-        meta_data["files"] = files
-        deposition.meta_data = meta_data
+            if digest is not None:
+                file_info.update({"sha256": digest.sha256, "md5": digest.md5, "size": digest.size})
+            files.append(file_info)
+            meta_data["files"] = files
+            deposition.meta_data = meta_data
 
-        db.session.commit()
+            db.session.commit()
 
-        logger.info(f"FakenodoRepository: Added CSV file '{file_name}' to deposition ID {deposition_id}")
+        logger.info(f"FakenodoRepository: Added file '{file_name}' to deposition ID {deposition_id}")
         return meta_data
 
+    def list_depositions(self) -> list:
+        """Return every deposition, newest first."""
+        return Fakenodo.query.order_by(Fakenodo.id.desc()).all()
+
+    def save(self, deposition: Fakenodo) -> Fakenodo:
+        db.session.commit()
+        return deposition
+
+    def mark_published(self, deposition: Fakenodo, doi: str) -> Fakenodo:
+        """Assign the DOI and flag the deposition as published."""
+        deposition.doi = doi
+        deposition.status = "published"
+        db.session.commit()
+        return deposition
+
     def get_deposition(self, deposition_id: int) -> Fakenodo:
         """
         Retrieve a deposition entry by its ID.
@@ -1,22 +1,64 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, url_for
 from flask_login import login_required
 
 from app.modules.dataset.repositories import DataSetRepository
-from app.modules.fakenodo.services import FakenodoService
+from app.modules.fakenodo.services import FakenodoService, FaultInjector
 
 bp = Blueprint("fakenodo", __name__, url_prefix="/fakenodo")
 
 fakenodo_service = FakenodoService()
 dataset_repo = DataSetRepository()
+fault_injector = FaultInjector.from_env()
+
+
+@bp.before_request
+def inject_faults():
+    if not fault_injector.enabled:
+        return None
+    fault_injector.delay()
+    if fault_injector.should_fail():
+        response = jsonify({"status": fault_injector.error_status, "message": "Injected Fakenodo failure"})
+        response.headers["Retry-After"] = "1"
+        return response, fault_injector.error_status
+    return None
+
+
+def _with_links(deposition: dict) -> dict:
+    dep_id = deposition["id"]
+    deposition["links"] = {
+        "self": url_for("fakenodo.get_deposition", dep_id=dep_id, _external=True),
+        "bucket": url_for("fakenodo.bucket", dep_id=dep_id, _external=True),
+        "publish": url_for("fakenodo.publish_action", dep_id=dep_id, _external=True),
+    }
+    return deposition
+
+
+def _not_found(dep_id: int):
+    return jsonify({"status": 404, "message": f"Deposition {dep_id} not found"}), 404
+
+
+@bp.route("/depositions", methods=["GET"])
+def list_depositions():
+    page = request.args.get("page", 1, type=int)
+    size = request.args.get("size", type=int)
+    depositions = fakenodo_service.get_all_depositions()
+    if size:
+        start = (max(page, 1) - 1) * size
+        depositions = depositions[start : start + size]
+    return jsonify([_with_links(d) for d in depositions]), 200
 
 
 @bp.route("/depositions", methods=["POST"])
 # @login_required
 def create_deposition():
-    data = request.get_json() or {}
+    data = request.get_json(silent=True) or {}
     ds_id = data.get("dataset_id")
     publication_doi = data.get("publication_doi")
 
+    # Misma petición que la API de Zenodo: {"metadata": {...}}
+    if ds_id is None and "metadata" in data:
+        return jsonify(_with_links(fakenodo_service.create_zenodo_deposition(data["metadata"]))), 201
+
     if ds_id is None:
         return jsonify({"error": "dataset_id is required"}), 400
 
@@ -28,6 +70,46 @@ def create_deposition():
     return jsonify(resp), 201
 
 
+@bp.route("/depositions/<int:dep_id>", methods=["GET"])
+def get_deposition(dep_id: int):
+    deposition = fakenodo_service.get_deposition_or_none(dep_id)
+    if deposition is None:
+        return _not_found(dep_id)
+    return jsonify(_with_links(fakenodo_service.serialize_deposition(deposition))), 200
+
+
+@bp.route("/depositions/<int:dep_id>/files", methods=["POST"])
+def upload_multipart(dep_id: int):
+    file = request.files.get("file")
+    if file is None:
+        return jsonify({"status": 400, "message": "file is required"}), 400
+    return _store(dep_id, request.form.get("name") or file.filename, file)
+
+
+@bp.route("/files/<int:dep_id>", methods=["PUT"], defaults={"filename": None}, endpoint="bucket")
+@bp.route("/files/<int:dep_id>/<path:filename>", methods=["PUT"], endpoint="bucket")
+def bucket_upload(dep_id: int, filename: str):
+    # Bucket API: el cuerpo de la petición es el fichero, se escribe a disco por bloques
+    return _store(dep_id, filename, request.stream)
+
+
+def _store(dep_id: int, filename: str, stream):
+    if fakenodo_service.get_deposition_or_none(dep_id) is None:
+        return _not_found(dep_id)
+    try:
+        resp = fakenodo_service.store_file(dep_id, filename, stream)
+    except ValueError as exc:
+        return jsonify({"status": 400, "message": str(exc)}), 400
+    return jsonify(resp), 201
+
+
+@bp.route("/depositions/<int:dep_id>/actions/publish", methods=["POST"])
+def publish_action(dep_id: int):
+    if fakenodo_service.get_deposition_or_none(dep_id) is None:
+        return _not_found(dep_id)
+    return jsonify(_with_links(fakenodo_service.publish_zenodo_deposition(dep_id))), 202
+
+
 @bp.route("/depositions/<int:dep_id>/upload", methods=["POST"])
 # @login_required
 def upload_file(dep_id: int):
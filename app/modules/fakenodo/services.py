@@ -1,37 +1,114 @@
 import csv
-import hashlib
+import io
 import logging
 import os
+import random
+import time
 import uuid
+from typing import Optional, Tuple
 
 from dotenv import load_dotenv
 from flask_login import current_user
+from werkzeug.utils import secure_filename
 
 import core.configuration.configuration as config
 from app.modules.dataset.models import DataSet
-from app.modules.fakenodo.repositories import FakenodoRepository
+from app.modules.fakenodo.backends import create_repository
+from app.modules.fakenodo.models import Fakenodo
 from app.modules.featuremodel.models import FeatureModel
 from core.services.BaseService import BaseService
+from core.services.hashing import DEFAULT_CHUNK_SIZE, StreamingHasher, digest_stream, save_stream
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 
+class _HashingReader(io.RawIOBase):
+    """Lector binario que va pasando por el hasher cada bloque que entrega."""
+
+    def __init__(self, raw, hasher: StreamingHasher) -> None:
+        self.raw = raw
+        self.hasher = hasher
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self.raw.readinto(buffer)
+        if n:
+            self.hasher.update(bytes(buffer[:n]))
+        return n
+
+
+def scan_csv(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int, str, int]:
+    """
+    Una sola lectura por bloques del CSV: cuenta los registros con ``csv.reader`` (los campos entre
+    comillas pueden contener comas y saltos de línea), toma las columnas de la cabecera y calcula el
+    SHA-256. Devuelve (filas, columnas, sha256, tamaño).
+    """
+    hasher = StreamingHasher()
+    rows, columns = 0, 0
+    with open(file_path, "rb", buffering=0) as raw:
+        reader = io.BufferedReader(_HashingReader(raw, hasher), buffer_size=chunk_size)
+        text = io.TextIOWrapper(reader, encoding="utf-8", errors="replace", newline="")
+        for record in csv.reader(text):
+            if rows == 0:
+                columns = len(record)
+            rows += 1
+    digest = hasher.digest()
+    return rows, columns, digest.sha256, digest.size
+
+
+class FaultInjector:
+    """
+    Latencia artificial e inyección de errores para las pruebas de carga contra Fakenodo.
+    ``FAKENODO_LATENCY_MS`` admite un valor fijo ("50") o un rango ("20-80");
+    ``FAKENODO_ERROR_RATE`` es la probabilidad (0-1) de responder ``FAKENODO_ERROR_STATUS`` (503).
+    """
+
+    def __init__(self, latency_ms: Optional[str] = None, error_rate: float = 0.0, error_status: int = 503):
+        low, _, high = (latency_ms or "0").partition("-")
+        self.latency = (float(low) / 1000, float(high or low) / 1000)
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def from_env(cls) -> "FaultInjector":
+        return cls(
+            latency_ms=os.getenv("FAKENODO_LATENCY_MS"),
+            error_rate=float(os.getenv("FAKENODO_ERROR_RATE", 0)),
+            error_status=int(os.getenv("FAKENODO_ERROR_STATUS", 503)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.latency[1] > 0 or self.error_rate > 0
+
+    def delay(self) -> None:
+        low, high = self.latency
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
 class FakenodoService(BaseService):
     """
     Local service that emulates Zenodo for CSV datasets.
     Manages creation, upload, publication, retrieval, and deletion of depositions.
     """
 
-    def __init__(self):
-        self.repository = FakenodoRepository()
+    def __init__(self, backend: Optional[str] = None):
+        # backend: "db" (por defecto), "memory" o "sqlite"; ver app.modules.fakenodo.backends
+        self.repository = create_repository(backend)
 
     # -------------------------------------------------------------
     # Retrieve all depositions
     # -------------------------------------------------------------
-    def get_all_depositions(self) -> dict:
-        """Return all simulated depositions."""
-        return self.repository.storage
+    def get_all_depositions(self) -> list:
+        """Return all simulated depositions, newest first."""
+        return [self.serialize_deposition(d) for d in self.repository.list_depositions()]
 
     # -------------------------------------------------------------
     # Create a new deposition
@@ -106,17 +183,18 @@ class FakenodoService(BaseService):
         # Check for file existence
         if not os.path.exists(file_path):
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write("id,name,value\n1,example,123\n2,another,456\n3,final,789\n")
+            content = "id,name,value\n1,example,123\n2,another,456\n3,final,789\n".encode("utf-8")
+            digest = save_stream(io.BytesIO(content), file_path)
 
-            self.repository.add_csv_file(deposition_id, file_name, file_path)
+            self.repository.add_csv_file(deposition_id, file_name, file_path, digest=digest)
             logger.info(f"FakenodoService: CSV uploaded '{file_name}'")
 
             return {
                 "message": f"The CSV '{file_name}' was uploaded successfully.",
                 "file_metadata": {
                     "file_name": file_name,
-                    "file_size": os.path.getsize(file_path),
+                    "file_size": digest.size,
+                    "checksum": digest.sha256,
                     "file_type": "text/csv",
                     "file_url": f"/uploads/user_{user_id}/dataset_{dataset.id}/{file_name}",
                 },
@@ -148,18 +226,13 @@ class FakenodoService(BaseService):
 
         csv_summaries = []
         for file_info in files:
-            file_path = file_info["file_path"]
+            file_path = file_info.get("file_path")
             file_name = file_info["file_name"]
 
-            with open(file_path, newline="", encoding="utf-8") as csvfile:
-                reader = csv.reader(csvfile)
-                rows = list(reader)
-                num_rows = len(rows)
-                num_cols = len(rows[0]) if num_rows > 0 else 0
-
-            # Inline checksum calculation
-            with open(file_path, "rb") as file:
-                checksum = hashlib.sha256(file.read()).hexdigest()
+            num_rows, num_cols = 0, 0
+            checksum, size_bytes = file_info.get("sha256"), file_info.get("size")
+            if file_path:
+                num_rows, num_cols, checksum, size_bytes = scan_csv(file_path)
 
             csv_summaries.append(
                 {
@@ -167,12 +240,11 @@ class FakenodoService(BaseService):
                     "rows": num_rows,
                     "columns": num_cols,
                     "checksum": checksum,
-                    "size_bytes": os.path.getsize(file_path),
+                    "size_bytes": size_bytes,
                 }
             )
 
-        deposition.doi = f"10.5281/fakenodo.{deposition_id}.v{len(files)}"
-        deposition.status = "published"
+        self.repository.mark_published(deposition, f"10.5281/fakenodo.{deposition_id}.v{len(files)}")
         logger.info(f"FakenodoService: Published deposition {deposition.doi}")
 
         return {
@@ -200,6 +272,7 @@ class FakenodoService(BaseService):
         if not deposition.doi:
             # Inline DOI generation
             deposition.doi = f"10.5281/fakenodo.{deposition_id}"
+            self.repository.save(deposition)
         return deposition.doi
 
     # -------------------------------------------------------------
@@ -223,3 +296,69 @@ class FakenodoService(BaseService):
             return {"message": f"Deposition {deposition_id} deleted successfully."}
 
         raise Exception(f"Deposition {deposition_id} not found.")
+
+    # -------------------------------------------------------------
+    # Zenodo-compatible API (used by DepositionClient)
+    # -------------------------------------------------------------
+    def files_folder(self, deposition_id: int) -> str:
+        return os.path.join(config.uploads_folder_name(), "fakenodo", str(deposition_id))
+
+    def get_deposition_or_none(self, deposition_id: int):
+        try:
+            return self.repository.get_deposition(deposition_id)
+        except Exception:
+            return None
+
+    def serialize_deposition(self, deposition: Fakenodo) -> dict:
+        """Representación con la forma de la API de Zenodo (``id``, ``conceptrecid``, ``files``...)."""
+        meta_data = dict(deposition.meta_data or {})
+        files = meta_data.pop("files", [])
+        return {
+            "id": deposition.id,
+            "conceptrecid": str(deposition.id),
+            "doi": deposition.doi if deposition.status == "published" else None,
+            "state": "done" if deposition.status == "published" else "unsubmitted",
+            "submitted": deposition.status == "published",
+            "metadata": meta_data,
+            "files": [{"filename": f["file_name"], "filesize": f.get("size"), "checksum": f.get("md5")} for f in files],
+        }
+
+    def create_zenodo_deposition(self, metadata: dict) -> dict:
+        """Create a draft deposition from Zenodo metadata (no DOI until it is published)."""
+        metadata = {key: value for key, value in (metadata or {}).items() if key != "files"}
+        deposition = self.repository.create_new_deposition(meta_data=metadata)
+        logger.info(f"FakenodoService: Created deposition {deposition.id}")
+        return self.serialize_deposition(deposition)
+
+    def store_file(self, deposition_id: int, file_name: str, stream) -> dict:
+        """Guarda ``stream`` en el almacenamiento de la deposition leyéndolo por bloques."""
+        deposition = self.repository.get_deposition(deposition_id)
+        if deposition.status == "published":
+            raise ValueError(f"Deposition {deposition_id} is already published.")
+        file_name = secure_filename(file_name or "")
+        if not file_name:
+            raise ValueError("A file name is required.")
+
+        if getattr(self.repository, "stores_content", True):
+            folder = self.files_folder(deposition_id)
+            os.makedirs(folder, exist_ok=True)
+            file_path = os.path.join(folder, file_name)
+            digest = save_stream(stream, file_path)
+        else:
+            # Modo memoria: se calcula el digest leyendo el cuerpo por bloques, sin tocar disco
+            file_path = None
+            digest = digest_stream(getattr(stream, "stream", stream))
+        self.repository.add_file(deposition_id, file_name, file_path, digest=digest)
+        return {
+            "id": digest.sha256,
+            "filename": file_name,
+            "filesize": digest.size,
+            "checksum": digest.md5,
+        }
+
+    def publish_zenodo_deposition(self, deposition_id: int) -> dict:
+        deposition = self.repository.get_deposition(deposition_id)
+        if deposition.status != "published":
+            self.repository.mark_published(deposition, deposition.doi or f"10.5281/fakenodo.{deposition_id}")
+            logger.info(f"FakenodoService: Published deposition {deposition.doi}")
+        return self.serialize_deposition(deposition)
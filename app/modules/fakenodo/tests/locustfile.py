@@ -53,6 +53,30 @@ class FakenodoTaskSet(TaskSet):
             f"/fakenodo/depositions/{self.deposition_id}/publish", name="/fakenodo/depositions/[id]/publish"
         )
 
+    @task(3)
+    def zenodo_roundtrip(self):
+        """Same calls as DepositionClient: create, bucket upload, publish."""
+        with self.client.post(
+            "/fakenodo/depositions", json={"metadata": {"title": "locust"}}, catch_response=True
+        ) as resp:
+            if resp.status_code != 201:
+                resp.failure(f"Unexpected status code creating deposition: {resp.status_code}")
+                return
+            dep_id = resp.json()["id"]
+
+        self.client.put(
+            f"/fakenodo/files/{dep_id}/model.uvl",
+            data=b"features\n    Root\n",
+            name="/fakenodo/files/[id]/[name]",
+        )
+        self.client.post(
+            f"/fakenodo/depositions/{dep_id}/actions/publish", name="/fakenodo/depositions/[id]/actions/publish"
+        )
+
+    @task(1)
+    def list_depositions(self):
+        self.client.get("/fakenodo/depositions?page=1&size=20", name="/fakenodo/depositions")
+
     @task(1)
     def delete_dep(self):
         self._ensure_deposition_exists()
@@ -0,0 +1,86 @@
+import io
+import threading
+
+import pytest
+
+from app.modules.fakenodo import routes as fakenodo_routes
+from app.modules.fakenodo.backends import InMemoryFakenodoRepository, SQLiteFakenodoRepository
+from app.modules.fakenodo.models import Fakenodo
+from app.modules.fakenodo.services import FakenodoService, FaultInjector, scan_csv
+from core.services.hashing import digest_file
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryFakenodoRepository()
+    return SQLiteFakenodoRepository(path=str(tmp_path / "fakenodo.sqlite3"))
+
+
+def test_store_roundtrip_and_concurrent_files(store):
+    dep = store.create_new_deposition(meta_data={"title": "Load"})
+
+    threads = [threading.Thread(target=store.add_file, args=(dep.id, f"m{i}.uvl", None)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stored = store.get_deposition(dep.id)
+    assert stored.meta_data["title"] == "Load"
+    assert sorted(f["file_name"] for f in stored.files) == sorted(f"m{i}.uvl" for i in range(16))
+
+    store.mark_published(stored, "10.5281/fakenodo.1")
+    assert store.get_deposition(dep.id).status == "published"
+    assert [d.id for d in store.list_depositions()] == [dep.id]
+    assert store.delete_deposition(dep.id) is True
+    with pytest.raises(Exception):
+        store.get_deposition(dep.id)
+
+
+def test_scan_csv_counts_rows_and_hashes_in_one_pass(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text('id,name,"value, quoted"\n1,Alice,123\n2,Bob,456')
+
+    rows, columns, sha256, size = scan_csv(str(path), chunk_size=4)
+
+    assert (rows, columns) == (3, 3)
+    assert (sha256, size) == (digest_file(str(path)).sha256, digest_file(str(path)).size)
+
+
+def test_scan_csv_handles_quoted_newlines_in_header_and_rows(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes('"multi\nline",name,value\n1,"Alice\nSmith",123\n2,Bob,"4,5"\n'.encode())
+
+    rows, columns, sha256, _size = scan_csv(str(path), chunk_size=3)
+
+    assert (rows, columns) == (3, 3)
+    assert sha256 == digest_file(str(path)).sha256
+
+
+def test_db_deposition_exposes_files_from_meta_data():
+    dep = Fakenodo(meta_data={"files": [{"file_name": "a.csv"}]})
+    assert dep.files == [{"file_name": "a.csv"}]
+    assert Fakenodo(meta_data={}).files == []
+
+
+def test_memory_backend_listing_and_fault_injection(test_client, monkeypatch):
+    monkeypatch.setattr(fakenodo_routes, "fakenodo_service", FakenodoService(backend="memory"))
+
+    for title in ("first", "second", "third"):
+        response = test_client.post("/fakenodo/depositions", json={"metadata": {"title": title}})
+        assert response.status_code == 201
+    dep_id = response.get_json()["id"]
+
+    response = test_client.put(f"/fakenodo/files/{dep_id}/model.uvl", data=io.BytesIO(b"features\n    Root\n"))
+    assert response.status_code == 201
+    assert response.get_json()["filesize"] == 18
+
+    listing = test_client.get("/fakenodo/depositions?page=1&size=2").get_json()
+    assert [d["metadata"]["title"] for d in listing] == ["third", "second"]
+    assert listing[0]["files"][0]["filename"] == "model.uvl"
+
+    monkeypatch.setattr(fakenodo_routes, "fault_injector", FaultInjector(error_rate=1.0, error_status=503))
+    response = test_client.get("/fakenodo/depositions")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,130 @@
+import logging
+import math
+import multiprocessing
+import os
+import time
+from typing import Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIME_BUDGET = 30.0
+# Arrancar el hijo (forkserver/spawn importa la app) no cuenta para el presupuesto del análisis
+STARTUP_TIMEOUT = 60.0
+# DECIMAL(65, 0) es el mayor entero exacto que admite MariaDB
+MAX_EXACT_CONFIGURATIONS = 10**65 - 1
+
+
+def _analysis_stages(uvl_path: str) -> Iterator[dict]:
+    """
+    Calcula las métricas de un UVL por etapas, de la más barata a la más cara, devolviendo
+    el resultado acumulado tras cada una para poder quedarse con lo obtenido si se agota el tiempo.
+    """
+    from flamapy.metamodels.bdd_metamodel.operations import BDDConfigurationsNumber
+    from flamapy.metamodels.bdd_metamodel.transformations import FmToBDD
+    from flamapy.metamodels.fm_metamodel.operations import FMMaxDepthTree
+    from flamapy.metamodels.fm_metamodel.transformations import UVLReader
+    from flamapy.metamodels.pysat_metamodel.operations import (
+        PySATCoreFeatures,
+        PySATDeadFeatures,
+        PySATSatisfiable,
+    )
+    from flamapy.metamodels.pysat_metamodel.transformations import FmToPysat
+
+    fm = UVLReader(uvl_path).transform()
+    metrics = {
+        "number_of_features": len(fm.get_features()),
+        "number_of_constraints": len(fm.get_constraints()),
+        "max_depth": FMMaxDepthTree().execute(fm).get_result(),
+    }
+    yield dict(metrics)
+
+    sat = FmToPysat(fm).transform()
+    metrics["satisfiable"] = bool(PySATSatisfiable().execute(sat).get_result())
+    yield dict(metrics)
+
+    metrics["core_features"] = sorted(str(f) for f in PySATCoreFeatures().execute(sat).get_result())
+    metrics["dead_features"] = sorted(str(f) for f in PySATDeadFeatures().execute(sat).get_result())
+    yield dict(metrics)
+
+    configurations = int(BDDConfigurationsNumber().execute(FmToBDD(fm).transform()).get_result())
+    metrics["configurations_log10"] = math.log10(configurations) if configurations > 0 else None
+    metrics["number_of_configurations"] = configurations if configurations <= MAX_EXACT_CONFIGURATIONS else None
+    yield dict(metrics)
+
+
+def analyze_model(uvl_path: str) -> dict:
+    """Análisis completo, sin límite de tiempo (mismo proceso)."""
+    metrics = {}
+    for metrics in _analysis_stages(uvl_path):
+        pass
+    return metrics
+
+
+def _analysis_child(uvl_path: str, conn, stages) -> None:
+    try:
+        conn.send(("started", None))
+        for partial in stages(uvl_path):
+            conn.send(("partial", partial))
+        conn.send(("done", None))
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def _child_started(conn) -> bool:
+    try:
+        return conn.poll(STARTUP_TIMEOUT) and conn.recv()[0] == "started"
+    except EOFError:
+        return False
+
+
+def analyze_with_budget(uvl_path: str, time_budget: float = DEFAULT_TIME_BUDGET) -> Tuple[dict, str, str]:
+    """
+    Ejecuta el análisis en un proceso hijo que se termina si supera ``time_budget`` segundos
+    (la compilación a BDD puede explotar en modelos grandes). Devuelve (métricas, estado, error)
+    con estado ``ok``, ``timeout`` o ``error``; en los dos últimos se conservan las métricas parciales.
+    """
+    # Sin fork: el proceso web tiene hilos vivos y el hijo podría heredar un lock tomado
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_analysis_child, args=(uvl_path, child_conn, _analysis_stages), daemon=True)
+    process.start()
+    child_conn.close()
+
+    metrics, status, error = {}, "timeout", None
+    try:
+        if not _child_started(parent_conn):
+            status, error = "error", "analysis process did not start"
+        deadline = time.monotonic() + time_budget
+        while status == "timeout":
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not parent_conn.poll(remaining):
+                break
+            try:
+                kind, payload = parent_conn.recv()
+            except EOFError:
+                status, error = "error", "analysis process exited unexpectedly"
+                break
+            if kind == "partial":
+                metrics = payload
+            elif kind == "done":
+                status = "ok"
+                break
+            else:
+                status, error = "error", payload
+                break
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=5)
+
+    if status == "timeout":
+        error = f"analysis exceeded {time_budget:g}s"
+    return metrics, status, error
+
+
+def time_budget_from_env() -> float:
+    return float(os.getenv("FM_ANALYSIS_TIME_BUDGET", DEFAULT_TIME_BUDGET))
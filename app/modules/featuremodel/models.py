@@ -5,6 +5,9 @@ from app.modules.dataset.models import Author, PublicationType
 
 
 class FeatureModel(db.Model):
+    # Sólo en SQLite: InnoDB ya indexa las claves foráneas
+    __table_args__ = (db.Index("ix_feature_model_data_set_id", "data_set_id").ddl_if(dialect="sqlite"),)
+
     id = db.Column(db.Integer, primary_key=True)
     data_set_id = db.Column(db.Integer, db.ForeignKey("data_set.id"), nullable=False)
     fm_meta_data_id = db.Column(db.Integer, db.ForeignKey("fm_meta_data.id"))
@@ -39,9 +42,43 @@ class FMMetaData(db.Model):
 
 
 class FMMetrics(db.Model):
+    """
+    Métricas de análisis de un modelo UVL. Se calculan una sola vez por contenido (``checksum``)
+    y se comparten entre todos los FMMetaData que apuntan al mismo fichero.
+    """
+
     id = db.Column(db.Integer, primary_key=True)
     solver = db.Column(db.Text)
     not_solver = db.Column(db.Text)
+    checksum = db.Column(db.String(120), unique=True, index=True)
+    number_of_features = db.Column(db.Integer, index=True)
+    number_of_constraints = db.Column(db.Integer)
+    max_depth = db.Column(db.Integer)
+    satisfiable = db.Column(db.Boolean, index=True)
+    core_features = db.Column(db.JSON)
+    dead_features = db.Column(db.JSON)
+    # Valor exacto si cabe en DECIMAL(65); log10 siempre, para ordenar/filtrar modelos enormes
+    number_of_configurations = db.Column(db.Numeric(65, 0))
+    configurations_log10 = db.Column(db.Float, index=True)
+    analysis_status = db.Column(db.String(16), nullable=False, default="pending", server_default="pending")
+    analysis_error = db.Column(db.Text)
+    analysis_seconds = db.Column(db.Float)
+    analyzed_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "number_of_features": self.number_of_features,
+            "number_of_constraints": self.number_of_constraints,
+            "max_depth": self.max_depth,
+            "satisfiable": self.satisfiable,
+            "core_features": self.core_features or [],
+            "dead_features": self.dead_features or [],
+            "number_of_configurations": (
+                int(self.number_of_configurations) if self.number_of_configurations is not None else None
+            ),
+            "configurations_log10": self.configurations_log10,
+            "analysis_status": self.analysis_status,
+        }
 
     def __repr__(self):
-        return f"FMMetrics<solver={self.solver}, not_solver={self.not_solver}>"
+        return f"FMMetrics<features={self.number_of_features}, status={self.analysis_status}>"
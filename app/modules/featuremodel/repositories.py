@@ -1,6 +1,6 @@
 from sqlalchemy import func
 
-from app.modules.featuremodel.models import FeatureModel, FMMetaData
+from app.modules.featuremodel.models import FeatureModel, FMMetaData, FMMetrics
 from core.repositories.BaseRepository import BaseRepository
 
 
@@ -16,3 +16,11 @@ class FeatureModelRepository(BaseRepository):
 class FMMetaDataRepository(BaseRepository):
     def __init__(self):
         super().__init__(FMMetaData)
+
+
+class FMMetricsRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(FMMetrics)
+
+    def get_by_checksum(self, checksum: str):
+        return self.model.query.filter_by(checksum=checksum).first()
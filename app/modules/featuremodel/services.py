@@ -1,7 +1,47 @@
-from app.modules.featuremodel.repositories import FeatureModelRepository, FMMetaDataRepository
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.modules.dataset.models import DSMetrics
+from app.modules.featuremodel.analysis import analyze_with_budget, time_budget_from_env
+from app.modules.featuremodel.models import FMMetrics
+from app.modules.featuremodel.repositories import FeatureModelRepository, FMMetaDataRepository, FMMetricsRepository
 from app.modules.hubfile.services import HubfileService
 from core.services.BaseService import BaseService
 
+logger = logging.getLogger(__name__)
+
+METRIC_FIELDS = (
+    "number_of_features",
+    "number_of_constraints",
+    "max_depth",
+    "satisfiable",
+    "core_features",
+    "dead_features",
+    "number_of_configurations",
+    "configurations_log10",
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _analysis_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.getenv("FM_ANALYSIS_WORKERS", 2))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fm-analysis")
+        return _executor
+
 
 class FeatureModelService(BaseService):
     def __init__(self):
@@ -25,3 +65,93 @@ class FeatureModelService(BaseService):
     class FMMetaDataService(BaseService):
         def __init__(self):
             super().__init__(FMMetaDataRepository())
+
+
+class FMAnalysisService(BaseService):
+    """
+    Análisis de modelos UVL con flamapy (SAT para satisfacibilidad y features core/dead, BDD para
+    el número de configuraciones). Se ejecuta una vez por checksum y los resultados quedan en
+    FMMetrics/DSMetrics, de modo que las vistas solo leen valores ya calculados.
+    """
+
+    def __init__(self):
+        super().__init__(FMMetricsRepository())
+
+    def analyze_hubfile(self, hubfile, time_budget: Optional[float] = None, force: bool = False):
+        if FeatureModelService.should_skip_feature_extraction(hubfile.name):
+            return None
+
+        metrics = self.repository.get_by_checksum(hubfile.checksum)
+        if metrics is None or force or metrics.analysis_status == "pending":
+            started = time.monotonic()
+            values, status, error = analyze_with_budget(
+                hubfile.get_path(), time_budget if time_budget is not None else time_budget_from_env()
+            )
+            if metrics is None:
+                metrics = FMMetrics(checksum=hubfile.checksum)
+                db.session.add(metrics)
+            for field in METRIC_FIELDS:
+                setattr(metrics, field, values.get(field))
+            metrics.analysis_status = status
+            metrics.analysis_error = error
+            metrics.analysis_seconds = round(time.monotonic() - started, 3)
+            metrics.analyzed_at = datetime.now(timezone.utc)
+            if status != "ok":
+                logger.warning("Analysis of %s finished with status=%s: %s", hubfile.name, status, error)
+
+        fm_meta_data = hubfile.feature_model.fm_meta_data
+        if fm_meta_data is not None:
+            fm_meta_data.fm_metrics = metrics
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otro worker analizó el mismo contenido a la vez: se reutiliza su resultado
+            db.session.rollback()
+            metrics = self.repository.get_by_checksum(hubfile.checksum)
+            if fm_meta_data is not None:
+                fm_meta_data.fm_metrics = metrics
+            db.session.commit()
+        return metrics
+
+    def analyze_dataset(self, dataset, time_budget: Optional[float] = None, force: bool = False) -> None:
+        for feature_model in getattr(dataset, "feature_models", []):
+            for hubfile in feature_model.files:
+                self.analyze_hubfile(hubfile, time_budget=time_budget, force=force)
+        self.update_dataset_metrics(dataset)
+
+    def update_dataset_metrics(self, dataset) -> DSMetrics:
+        feature_models = getattr(dataset, "feature_models", [])
+        features = [
+            fm.fm_meta_data.fm_metrics.number_of_features
+            for fm in feature_models
+            if fm.fm_meta_data and fm.fm_meta_data.fm_metrics
+            if fm.fm_meta_data.fm_metrics.number_of_features is not None
+        ]
+        ds_meta_data = dataset.ds_meta_data
+        if ds_meta_data.ds_metrics is None:
+            ds_meta_data.ds_metrics = DSMetrics()
+        ds_meta_data.ds_metrics.number_of_models = len(feature_models)
+        ds_meta_data.ds_metrics.number_of_features = sum(features) if features else None
+        db.session.commit()
+        return ds_meta_data.ds_metrics
+
+    def schedule_dataset(self, dataset) -> Optional[Future]:
+        """Encola el análisis del dataset en el pool de workers (FM_ANALYSIS_WORKERS)."""
+        dataset_id = getattr(dataset, "id", None)
+        if not dataset_id:
+            return None
+
+        app = current_app._get_current_object()
+
+        def _worker(dataset_id=dataset_id, app=app):
+            from app.modules.dataset.models import DataSet
+
+            try:
+                with app.app_context():
+                    ds = DataSet.query.get(dataset_id)
+                    if ds is not None:
+                        self.analyze_dataset(ds)
+            except Exception:
+                logger.exception("Feature model analysis failed for dataset_id=%s", dataset_id)
+
+        return _analysis_executor().submit(_worker)
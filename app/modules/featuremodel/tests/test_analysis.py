@@ -0,0 +1,103 @@
+import os
+import shutil
+import time
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import Author, DataSet, DSMetaData, PublicationType
+from app.modules.explore.repositories import ExploreRepository
+from app.modules.featuremodel import analysis
+from app.modules.featuremodel.models import FeatureModel, FMMetaData, FMMetrics
+from app.modules.featuremodel.services import FMAnalysisService
+from app.modules.hubfile.locator import hubfile_locator
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.storage import dataset_file_path
+from core.services.hashing import digest_file
+
+UVL_EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "..", "dataset", "uvl_examples", "file1.uvl")
+
+
+def test_analyze_with_budget_computes_all_metrics():
+    metrics, status, error = analysis.analyze_with_budget(UVL_EXAMPLE, time_budget=30)
+
+    assert status == "ok" and error is None
+    assert metrics["number_of_features"] == 10
+    assert metrics["number_of_constraints"] == 2
+    assert metrics["max_depth"] == 2
+    assert metrics["satisfiable"] is True
+    assert metrics["core_features"] == ["Chat", "Connection", "Messages"]
+    assert metrics["dead_features"] == []
+    assert metrics["number_of_configurations"] == 24
+
+
+def _slow_stages(_path):
+    # A nivel de módulo: el hijo (forkserver/spawn) la recibe por pickle
+    yield {"number_of_features": 3}
+    time.sleep(30)
+    yield {"number_of_features": 3, "satisfiable": True}
+
+
+def test_analysis_keeps_partial_metrics_on_timeout(monkeypatch):
+    monkeypatch.setattr(analysis, "_analysis_stages", _slow_stages)
+
+    metrics, status, error = analysis.analyze_with_budget(UVL_EXAMPLE, time_budget=0.5)
+
+    assert status == "timeout"
+    assert metrics == {"number_of_features": 3}
+    assert "0.5s" in error
+
+
+def _create_dataset(copies):
+    user = User(email="analysis@example.com")
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(
+        title="Analysis", description="d", publication_type=PublicationType.OTHER, dataset_doi="10.1234/analysis"
+    )
+    md.authors.append(Author(name="Analyst"))
+    db.session.add(md)
+    db.session.flush()
+    ds = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(ds)
+    db.session.flush()
+    for i in range(copies):
+        name = f"model{i}.uvl"
+        fm_md = FMMetaData(uvl_filename=name, title=name, description="d", publication_type=PublicationType.OTHER)
+        fm = FeatureModel(data_set_id=ds.id, fm_meta_data=fm_md)
+        db.session.add(fm)
+        db.session.flush()
+        dest = dataset_file_path(user.id, ds.id, name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copy(UVL_EXAMPLE, dest)
+        digest = digest_file(dest)
+        db.session.add(Hubfile(name=name, checksum=digest.md5, size=digest.size, feature_model_id=fm.id))
+    db.session.commit()
+    return ds, os.path.dirname(dest)
+
+
+def test_dataset_analysis_persists_typed_metrics_once_per_checksum(test_app, clean_database):
+    hubfile_locator.clear()
+    with test_app.app_context():
+        ds, folder = _create_dataset(copies=2)
+        try:
+            FMAnalysisService().analyze_dataset(ds)
+
+            assert FMMetrics.query.count() == 1
+            metrics = FMMetrics.query.one()
+            assert metrics.analysis_status == "ok"
+            assert metrics.number_of_features == 10
+            assert int(metrics.number_of_configurations) == 24
+
+            ds_metrics = ds.ds_meta_data.ds_metrics
+            assert ds_metrics.number_of_models == 2
+            assert ds_metrics.number_of_features == 20
+            assert ds.get_metrics() == {"number_of_models": 2, "number_of_features": 20}
+
+            repository = ExploreRepository()
+            assert [d.id for d in repository.filter(dataset_type="uvl", facets={"satisfiable": ["yes"]})] == [ds.id]
+            assert repository.filter(dataset_type="uvl", facets={"satisfiable": ["no"]}) == []
+            assert repository.filter(dataset_type="uvl", facets={"features": ["<50"]})[0].id == ds.id
+            assert repository.filter(dataset_type="uvl", facets={"features": [">500"]}) == []
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+            hubfile_locator.clear()
@@ -0,0 +1,179 @@
+import importlib.metadata
+import logging
+import os
+import pickle
+import threading
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+from flamapy.metamodels.fm_metamodel.transformations import GlencoeWriter, SPLOTWriter, UVLReader
+from flamapy.metamodels.pysat_metamodel.transformations import DimacsWriter, FmToPysat
+
+from core.caching import LRUCache
+from core.configuration.configuration import uploads_folder_name
+
+logger = logging.getLogger(__name__)
+
+FM_CACHE_FORMAT = 1
+# Locks por franjas: número fijo, la clave (checksum o ruta) elige la franja por hash
+LOCK_STRIPES = 64
+
+
+def _flamapy_version() -> str:
+    try:
+        return importlib.metadata.version("flamapy-fm")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# Cambia si cambia el formato del pickle o la versión de flamapy: invalida todo lo anterior
+FM_CACHE_VERSION = f"v{FM_CACHE_FORMAT}-flamapy-{_flamapy_version()}"
+
+
+def _write_glencoe(fm, path: str) -> None:
+    GlencoeWriter(path, fm).transform()
+
+
+def _write_splot(fm, path: str) -> None:
+    SPLOTWriter(path, fm).transform()
+
+
+def _write_cnf(fm, path: str) -> None:
+    DimacsWriter(path, FmToPysat(fm).transform()).transform()
+
+
+# formato -> (extensión, escritor)
+TRANSFORMATIONS: Dict[str, Tuple[str, Callable]] = {
+    "glencoe": ("json", _write_glencoe),
+    "splot": ("splx", _write_splot),
+    "cnf": ("cnf", _write_cnf),
+}
+
+
+def default_cache_root() -> str:
+    return os.getenv("FLAMAPY_CACHE_DIR") or os.path.join(
+        os.getenv("WORKING_DIR") or "", uploads_folder_name(), "cache", "flamapy"
+    )
+
+
+class FeatureModelCache:
+    """
+    Caché de modelos UVL ya parseados, indexada por ``Hubfile.checksum``.
+
+    El metamodelo se guarda en disco como pickle etiquetado con ``FM_CACHE_VERSION`` y en una LRU
+    en memoria; los ficheros generados por cada transformación también se guardan en disco para
+    servir exportaciones repetidas como ficheros estáticos.
+    """
+
+    def __init__(self, root: Optional[str] = None, maxsize: Optional[int] = None):
+        self.root = os.path.abspath(root or default_cache_root())
+        self.models = LRUCache(maxsize or int(os.getenv("FLAMAPY_CACHE_SIZE", 128)))
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        # Nunca se anidan: dos claves distintas pueden compartir franja
+        return self._locks[hash(key) % LOCK_STRIPES]
+
+    def model_path(self, checksum: str) -> str:
+        return os.path.join(self.root, FM_CACHE_VERSION, "models", f"{checksum}.pickle")
+
+    def artifact_path(self, checksum: str, fmt: str) -> str:
+        extension, _writer = TRANSFORMATIONS[fmt]
+        return os.path.join(self.root, FM_CACHE_VERSION, "artifacts", checksum, f"{fmt}.{extension}")
+
+    def _load_pickle(self, path: str):
+        try:
+            with open(path, "rb") as fh:
+                payload = pickle.load(fh)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Discarding unreadable feature model cache entry %s", path)
+            return None
+        if not isinstance(payload, dict) or payload.get("version") != FM_CACHE_VERSION:
+            return None
+        return payload.get("model")
+
+    @staticmethod
+    def _write_atomically(path: str, writer: Callable, fm) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            writer(fm, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _store_pickle(self, path: str, fm) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as fh:
+            pickle.dump({"version": FM_CACHE_VERSION, "model": fm}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _model_for(self, checksum: str, uvl_path: str):
+        fm = self.models.get(checksum)
+        if fm is not None:
+            return fm
+
+        with self._lock_for(checksum):
+            fm = self.models.get(checksum)
+            if fm is None:
+                fm = self._load_pickle(self.model_path(checksum))
+            if fm is None:
+                fm = UVLReader(uvl_path).transform()
+                try:
+                    self._store_pickle(self.model_path(checksum), fm)
+                except (OSError, pickle.PicklingError):
+                    logger.exception("Could not persist parsed feature model %s", checksum)
+            self.models.put(checksum, fm)
+        return fm
+
+    def get_model(self, hubfile):
+        """Devuelve el metamodelo del Hubfile, parseando el UVL solo si no está en caché."""
+        if not hubfile.checksum:
+            return UVLReader(hubfile.get_path()).transform()
+        return self._model_for(hubfile.checksum, hubfile.get_path())
+
+    def ensure_artifacts(self, checksum: str, uvl_path: str, formats) -> Dict[str, str]:
+        """
+        Genera los formatos que falten para un modelo. El UVL se parsea como mucho una vez
+        y el metamodelo se comparte entre todos los formatos.
+        """
+        paths = {}
+        for fmt in formats:
+            if fmt not in TRANSFORMATIONS:
+                raise ValueError(f"Unsupported transformation '{fmt}'")
+            path = self.artifact_path(checksum, fmt)
+            paths[fmt] = path
+            if os.path.isfile(path):
+                continue
+            _extension, writer = TRANSFORMATIONS[fmt]
+            # El modelo se obtiene antes de tomar el lock del fichero: los locks no se anidan
+            fm = self._model_for(checksum, uvl_path)
+            with self._lock_for(path):
+                if not os.path.isfile(path):
+                    self._write_atomically(path, writer, fm)
+        return paths
+
+    def get_artifact(self, hubfile, fmt: str) -> str:
+        """Devuelve la ruta del fichero exportado en ``fmt``, generándolo solo la primera vez."""
+        if not hubfile.checksum:
+            if fmt not in TRANSFORMATIONS:
+                raise ValueError(f"Unsupported transformation '{fmt}'")
+            path = self.artifact_path(f"nochecksum-{hubfile.id}", fmt)
+            self._write_atomically(path, TRANSFORMATIONS[fmt][1], self.get_model(hubfile))
+            return path
+        return self.ensure_artifacts(hubfile.checksum, hubfile.get_path(), [fmt])[fmt]
+
+    def clear_memory(self) -> None:
+        self.models.clear()
+
+
+def build_artifacts(root: str, checksum: str, uvl_path: str, formats) -> Dict[str, str]:
+    """Punto de entrada para los procesos del pool de exportación."""
+    return FeatureModelCache(root=root, maxsize=1).ensure_artifacts(checksum, uvl_path, formats)
+
+
+feature_model_cache = FeatureModelCache()
@@ -0,0 +1,90 @@
+import logging
+import os
+import zipfile
+from concurrent.futures import as_completed
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.modules.flamapy.cache import TRANSFORMATIONS, FeatureModelCache, build_artifacts
+from app.modules.flamapy.pool import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+
+class _ZipStream:
+    """Destino no posicionable para ``ZipFile``: acumula lo escrito hasta que se drena."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def convert_files(
+    cache: FeatureModelCache, files: Iterable[Tuple[str, str, str]], formats: List[str]
+) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    """
+    Convierte ``files`` (nombre, checksum, ruta UVL) a ``formats``. Los ficheros que aún no tienen
+    todos sus artefactos en caché se reparten en el pool de procesos; cada uno se parsea una vez.
+    Devuelve (nombre, {formato: ruta}, error) a medida que terminan.
+    """
+    pending = []
+    for name, checksum, uvl_path in files:
+        paths = {fmt: cache.artifact_path(checksum, fmt) for fmt in formats}
+        if all(os.path.isfile(p) for p in paths.values()):
+            yield name, paths, None
+        else:
+            pending.append((name, checksum, uvl_path))
+
+    if not pending:
+        return
+    if len(pending) == 1:
+        name, checksum, uvl_path = pending[0]
+        try:
+            yield name, cache.ensure_artifacts(checksum, uvl_path, formats), None
+        except Exception as exc:
+            yield name, None, str(exc)
+        return
+
+    pool = get_process_pool()
+    futures = {
+        pool.submit(build_artifacts, cache.root, checksum, uvl_path, formats): name
+        for name, checksum, uvl_path in pending
+    }
+    for future in as_completed(futures):
+        name = futures[future]
+        try:
+            yield name, future.result(), None
+        except Exception as exc:
+            logger.warning("flamapy export of %s failed: %s", name, exc)
+            yield name, None, str(exc)
+
+
+def stream_zip(results: Iterable[Tuple[str, Optional[dict], Optional[str]]]) -> Iterator[bytes]:
+    """Escribe un ZIP en streaming: cada modelo se envía en cuanto su conversión termina."""
+    sink = _ZipStream()
+    errors = []
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, paths, error in results:
+            if error is not None:
+                errors.append(f"{name}: {error}")
+                continue
+            stem = os.path.splitext(name)[0]
+            for fmt, path in paths.items():
+                extension = TRANSFORMATIONS[fmt][0]
+                zf.write(path, arcname=f"{fmt}/{stem}.{extension}")
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        if errors:
+            zf.writestr("errors.txt", "\n".join(errors) + "\n")
+    yield sink.drain()
@@ -0,0 +1,36 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _max_workers() -> int:
+    return int(os.getenv("FLAMAPY_WORKERS") or os.getenv("FLAMAPY_EXPORT_WORKERS") or min(4, os.cpu_count() or 1))
+
+
+def _mp_context():
+    # La app tiene hilos vivos (listener de logs, notificaciones, muestreadores): hacer fork de un
+    # proceso con hilos puede dejar al hijo bloqueado en un lock heredado
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Pool de procesos compartido por las tareas de flamapy (exportación y validación); se crea al primer uso."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_max_workers(), mp_context=_mp_context())
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
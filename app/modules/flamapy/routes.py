@@ -1,18 +1,15 @@
 import logging
-import os
-import tempfile
 
-from antlr4 import CommonTokenStream, FileStream
-from antlr4.error.ErrorListener import ErrorListener
-from flamapy.metamodels.fm_metamodel.transformations import GlencoeWriter, SPLOTWriter, UVLReader
-from flamapy.metamodels.pysat_metamodel.transformations import DimacsWriter, FmToPysat
-from flask import jsonify, send_file
-from uvl.UVLCustomLexer import UVLCustomLexer
-from uvl.UVLPythonParser import UVLPythonParser
+from flask import Response, jsonify, request, send_file
 
+from app.modules.dataset.models import BaseDataset
 from app.modules.flamapy import flamapy_bp
+from app.modules.flamapy.cache import feature_model_cache
+from app.modules.flamapy.export import convert_files, stream_zip
 from app.modules.flamapy.services import FlamapyService
+from app.modules.flamapy.validation import uvl_validation_service
 from app.modules.hubfile.services import HubfileService
+from core.security import rate_limit
 
 logger = logging.getLogger(__name__)
 
@@ -37,48 +34,14 @@ def _csv_skip_response(file_name: str | None):
 
 @flamapy_bp.route("/flamapy/check_uvl/<int:file_id>", methods=["GET"])
 def check_uvl(file_id):
-    class CustomErrorListener(ErrorListener):
-        def __init__(self):
-            self.errors = []
-
-        def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
-            if "\\t" in msg:
-                warning_message = (
-                    f"The UVL has the following warning that prevents reading it: " f"Line {line}:{column} - {msg}"
-                )
-                print(warning_message)
-                self.errors.append(warning_message)
-            else:
-                error_message = (
-                    f"The UVL has the following error that prevents reading it: " f"Line {line}:{column} - {msg}"
-                )
-                self.errors.append(error_message)
-
     try:
         hubfile = hubfile_service.get_by_id(file_id)
         if flamapy_service.should_skip_file(getattr(hubfile, "name", "")):
             return _csv_skip_response(hubfile.name)
-        input_stream = FileStream(hubfile.get_path())
-        lexer = UVLCustomLexer(input_stream)
-
-        error_listener = CustomErrorListener()
-
-        lexer.removeErrorListeners()
-        lexer.addErrorListener(error_listener)
-
-        stream = CommonTokenStream(lexer)
-        parser = UVLPythonParser(stream)
-
-        parser.removeErrorListeners()
-        parser.addErrorListener(error_listener)
 
-        # tree = parser.featureModel()
-
-        if error_listener.errors:
-            return jsonify({"errors": error_listener.errors}), 400
-
-        # Optional: Print the parse tree
-        # print(tree.toStringTree(recog=parser))
+        verdict = uvl_validation_service.validate_hubfile(hubfile)
+        if not verdict["valid"]:
+            return jsonify({"errors": verdict["errors"]}), 400
 
         return jsonify({"message": "Valid Model"}), 200
 
@@ -91,61 +54,50 @@ def valid(file_id):
     return jsonify({"success": True, "file_id": file_id})
 
 
+def _export(file_id: int, fmt: str, download_name: str):
+    hubfile = hubfile_service.get_or_404(file_id)
+    if flamapy_service.should_skip_file(getattr(hubfile, "name", "")):
+        return _csv_skip_response(hubfile.name)
+    # El modelo parseado y el fichero generado se reutilizan mientras no cambie el checksum
+    path = feature_model_cache.get_artifact(hubfile, fmt)
+    return send_file(path, as_attachment=True, download_name=download_name.format(name=hubfile.name))
+
+
 @flamapy_bp.route("/flamapy/to_glencoe/<int:file_id>", methods=["GET"])
+@rate_limit("download", limit="DOWNLOAD_RATE_LIMIT", window="DOWNLOAD_RATE_WINDOW")
 def to_glencoe(file_id):
-    temp_file = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
-    try:
-        hubfile = hubfile_service.get_or_404(file_id)
-        if flamapy_service.should_skip_file(getattr(hubfile, "name", "")):
-            return _csv_skip_response(hubfile.name)
-        fm = UVLReader(hubfile.get_path()).transform()
-        GlencoeWriter(temp_file.name, fm).transform()
-
-        # Return the file in the response
-        return send_file(
-            temp_file.name,
-            as_attachment=True,
-            download_name=f"{hubfile.name}_glencoe.txt",
-        )
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file.name)
+    return _export(file_id, "glencoe", "{name}_glencoe.txt")
 
 
 @flamapy_bp.route("/flamapy/to_splot/<int:file_id>", methods=["GET"])
+@rate_limit("download", limit="DOWNLOAD_RATE_LIMIT", window="DOWNLOAD_RATE_WINDOW")
 def to_splot(file_id):
-    temp_file = tempfile.NamedTemporaryFile(suffix=".splx", delete=False)
-    try:
-        hubfile = hubfile_service.get_by_id(file_id)
-        if flamapy_service.should_skip_file(getattr(hubfile, "name", "")):
-            return _csv_skip_response(hubfile.name)
-        fm = UVLReader(hubfile.get_path()).transform()
-        SPLOTWriter(temp_file.name, fm).transform()
-
-        # Return the file in the response
-        return send_file(
-            temp_file.name,
-            as_attachment=True,
-            download_name=f"{hubfile.name}_splot.txt",
-        )
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file.name)
+    return _export(file_id, "splot", "{name}_splot.txt")
 
 
 @flamapy_bp.route("/flamapy/to_cnf/<int:file_id>", methods=["GET"])
+@rate_limit("download", limit="DOWNLOAD_RATE_LIMIT", window="DOWNLOAD_RATE_WINDOW")
 def to_cnf(file_id):
-    temp_file = tempfile.NamedTemporaryFile(suffix=".cnf", delete=False)
+    return _export(file_id, "cnf", "{name}_cnf.txt")
+
+
+@flamapy_bp.route("/flamapy/export/<int:dataset_id>", methods=["GET"])
+@rate_limit("download", limit="DOWNLOAD_RATE_LIMIT", window="DOWNLOAD_RATE_WINDOW")
+def export_dataset(dataset_id):
+    """Convierte todos los UVL del dataset a los formatos pedidos y los devuelve en un ZIP."""
+    dataset = BaseDataset.query.get_or_404(dataset_id)
     try:
-        hubfile = hubfile_service.get_by_id(file_id)
-        if flamapy_service.should_skip_file(getattr(hubfile, "name", "")):
-            return _csv_skip_response(hubfile.name)
-        fm = UVLReader(hubfile.get_path()).transform()
-        sat = FmToPysat(fm).transform()
-        DimacsWriter(temp_file.name, sat).transform()
-
-        # Return the file in the response
-        return send_file(temp_file.name, as_attachment=True, download_name=f"{hubfile.name}_cnf.txt")
-    finally:
-        # Clean up the temporary file
-        os.remove(temp_file.name)
+        formats = flamapy_service.parse_formats(request.args.get("formats"))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    targets = flamapy_service.export_targets(dataset)
+    if not targets:
+        return jsonify({"message": "The dataset has no UVL models to convert."}), 400
+
+    body = stream_zip(convert_files(feature_model_cache, targets, formats))
+    return Response(
+        body,
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=dataset_{dataset_id}_flamapy.zip"},
+    )
@@ -1,3 +1,4 @@
+from app.modules.flamapy.cache import TRANSFORMATIONS
 from app.modules.flamapy.repositories import FlamapyRepository
 from core.services.BaseService import BaseService
 
@@ -10,3 +11,24 @@ class FlamapyService(BaseService):
     def should_skip_file(file_name: str | None) -> bool:
         """Return True when the provided file should bypass Flamapy (e.g., CSV tabular data)."""
         return bool(file_name and file_name.lower().endswith(".csv"))
+
+    @staticmethod
+    def parse_formats(raw: str | None) -> list[str]:
+        """Formatos pedidos ('glencoe,splot,cnf'); sin valor se exportan todos."""
+        if not raw:
+            return list(TRANSFORMATIONS)
+        formats = list(dict.fromkeys(f.strip().lower() for f in raw.split(",") if f.strip()))
+        unknown = [f for f in formats if f not in TRANSFORMATIONS]
+        if unknown:
+            raise ValueError(f"Unsupported formats: {', '.join(unknown)}")
+        return formats
+
+    def export_targets(self, dataset) -> list[tuple[str, str, str]]:
+        """(nombre, checksum, ruta) de los UVL del dataset, resolviendo todas las rutas en una consulta."""
+        from app.modules.hubfile.locator import hubfile_locator
+
+        hubfiles = [
+            hf for fm in getattr(dataset, "feature_models", []) for hf in fm.files if not self.should_skip_file(hf.name)
+        ]
+        paths = hubfile_locator.resolve_many(hubfiles)
+        return [(hf.name, hf.checksum, paths[hf.id]) for hf in hubfiles if hf.id in paths]
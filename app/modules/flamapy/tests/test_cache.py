@@ -0,0 +1,76 @@
+import os
+import pickle
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.flamapy import cache as fm_cache
+from app.modules.flamapy.cache import FM_CACHE_VERSION, FeatureModelCache
+
+UVL_EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "..", "dataset", "uvl_examples", "file1.uvl")
+
+
+@pytest.fixture
+def hubfile(tmp_path):
+    path = tmp_path / "file1.uvl"
+    shutil.copy(UVL_EXAMPLE, path)
+    return SimpleNamespace(id=1, name="file1.uvl", checksum="c0ffee", get_path=lambda: str(path))
+
+
+def _forbid_parsing(monkeypatch):
+    class _Reader:
+        def __init__(self, *_args):
+            raise AssertionError("UVL should have been served from the cache")
+
+    monkeypatch.setattr(fm_cache, "UVLReader", _Reader)
+
+
+def test_model_is_parsed_once_and_persisted(tmp_path, hubfile, monkeypatch):
+    cache = FeatureModelCache(root=str(tmp_path / "cache"), maxsize=4)
+    fm = cache.get_model(hubfile)
+    assert os.path.isfile(cache.model_path("c0ffee"))
+
+    _forbid_parsing(monkeypatch)
+    assert cache.get_model(hubfile) is fm
+
+    # A fresh process only has the on-disk pickle
+    cache.clear_memory()
+    reloaded = cache.get_model(hubfile)
+    assert reloaded.root.name == fm.root.name
+
+
+def test_stale_version_tag_forces_reparse(tmp_path, hubfile):
+    cache = FeatureModelCache(root=str(tmp_path / "cache"), maxsize=4)
+    path = cache.model_path("c0ffee")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as fh:
+        pickle.dump({"version": "v0-old", "model": "stale"}, fh)
+
+    fm = cache.get_model(hubfile)
+    assert fm != "stale"
+    with open(path, "rb") as fh:
+        assert pickle.load(fh)["version"] == FM_CACHE_VERSION
+
+
+@pytest.mark.parametrize("fmt", ["glencoe", "splot", "cnf"])
+def test_artifacts_are_generated_once(tmp_path, hubfile, monkeypatch, fmt):
+    cache = FeatureModelCache(root=str(tmp_path / "cache"), maxsize=4)
+    path = cache.get_artifact(hubfile, fmt)
+    assert os.path.getsize(path) > 0
+
+    cache.clear_memory()
+    _forbid_parsing(monkeypatch)
+    assert cache.get_artifact(hubfile, fmt) == path
+
+
+def test_locks_are_striped_and_no_checksum_artifact_is_atomic(tmp_path, hubfile):
+    cache = FeatureModelCache(root=str(tmp_path / "cache"), maxsize=4)
+    for i in range(1000):
+        cache._lock_for(f"checksum-{i}")
+    assert len(cache._locks) == fm_cache.LOCK_STRIPES
+
+    hubfile.checksum = None
+    path = cache.get_artifact(hubfile, "glencoe")
+    assert os.path.getsize(path) > 0
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
@@ -0,0 +1,74 @@
+import io
+import os
+import shutil
+import zipfile
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from app.modules.featuremodel.models import FeatureModel
+from app.modules.flamapy import routes as flamapy_routes
+from app.modules.flamapy.cache import FeatureModelCache
+from app.modules.flamapy.export import stream_zip
+from app.modules.flamapy.pool import shutdown_process_pool
+from app.modules.hubfile.locator import hubfile_locator
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.storage import dataset_file_path
+from core.services.hashing import digest_file
+
+UVL_EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "..", "dataset", "uvl_examples")
+
+
+def _create_uvl_dataset(names):
+    user = User(email="export@example.com")
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(title="Export", description="d", publication_type=PublicationType.OTHER)
+    db.session.add(md)
+    db.session.flush()
+    ds = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(ds)
+    db.session.flush()
+    for name in names:
+        fm = FeatureModel(data_set_id=ds.id)
+        db.session.add(fm)
+        db.session.flush()
+        dest = dataset_file_path(user.id, ds.id, name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copy(os.path.join(UVL_EXAMPLES, name), dest)
+        digest = digest_file(dest)
+        db.session.add(Hubfile(name=name, checksum=digest.md5, size=digest.size, feature_model_id=fm.id))
+    db.session.commit()
+    return ds.id, os.path.dirname(dest)
+
+
+def test_stream_zip_reports_failed_models(tmp_path):
+    artifact = tmp_path / "glencoe.json"
+    artifact.write_text("{}")
+    results = [("ok.uvl", {"glencoe": str(artifact)}, None), ("broken.uvl", None, "parse error")]
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(results))))
+
+    assert archive.namelist() == ["glencoe/ok.json", "errors.txt"]
+    assert b"broken.uvl: parse error" in archive.read("errors.txt")
+
+
+def test_export_dataset_returns_all_formats_in_one_zip(test_client, clean_database, tmp_path, monkeypatch):
+    monkeypatch.setattr(flamapy_routes, "feature_model_cache", FeatureModelCache(root=str(tmp_path)))
+    hubfile_locator.clear()
+    with test_client.application.app_context():
+        dataset_id, folder = _create_uvl_dataset(["file1.uvl", "file2.uvl"])
+
+    try:
+        response = test_client.get(f"/flamapy/export/{dataset_id}?formats=glencoe,cnf")
+        assert response.status_code == 200
+        assert response.mimetype == "application/zip"
+
+        names = sorted(zipfile.ZipFile(io.BytesIO(response.data)).namelist())
+        assert names == ["cnf/file1.cnf", "cnf/file2.cnf", "glencoe/file1.json", "glencoe/file2.json"]
+
+        assert test_client.get(f"/flamapy/export/{dataset_id}?formats=pdf").status_code == 400
+    finally:
+        shutdown_process_pool()
+        shutil.rmtree(folder, ignore_errors=True)
+        hubfile_locator.clear()
@@ -0,0 +1,81 @@
+import io
+import os
+import shutil
+
+from app.modules.auth.models import User
+from app.modules.conftest import login, logout
+from app.modules.flamapy import validation
+from app.modules.flamapy.pool import shutdown_process_pool
+from app.modules.flamapy.validation import UVLValidationService, validate_uvl
+from core.services.hashing import DigestIndex
+
+VALID_UVL = b"features\n    Root\n        optional\n            A\n            B\n"
+# Solo el parser detecta este error: el lexer acepta todos los tokens
+INVALID_UVL = b"features\n    Root\n        optional\n            A B\n"
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_validate_uvl_runs_the_parser(tmp_path):
+    assert validate_uvl(_write(tmp_path, "ok.uvl", VALID_UVL)) == {"valid": True, "errors": []}
+
+    verdict = validate_uvl(_write(tmp_path, "bad.uvl", INVALID_UVL))
+    assert verdict["valid"] is False
+    assert "Line 4" in verdict["errors"][0]
+
+
+def test_verdict_is_cached_by_checksum(tmp_path, monkeypatch):
+    service = UVLValidationService(maxsize=8)
+    path = _write(tmp_path, "ok.uvl", VALID_UVL)
+    assert service.validate_path(path, checksum="abc")["valid"]
+
+    monkeypatch.setattr(validation, "validate_uvl", lambda _path: {"valid": False, "errors": ["reparsed"]})
+    assert service.validate_path(path, checksum="abc")["valid"]
+    assert service.validate_path(path, checksum="other")["errors"] == ["reparsed"]
+
+
+def test_validate_many_uses_process_pool(tmp_path):
+    service = UVLValidationService(maxsize=8)
+    files = [
+        ("a.uvl", _write(tmp_path, "a.uvl", VALID_UVL), "sum-a"),
+        ("b.uvl", _write(tmp_path, "b.uvl", INVALID_UVL), "sum-b"),
+        ("c.uvl", _write(tmp_path, "c.uvl", VALID_UVL), None),
+    ]
+    try:
+        verdicts = service.validate_many(files)
+    finally:
+        shutdown_process_pool()
+
+    assert {key: v["valid"] for key, v in verdicts.items()} == {"a.uvl": True, "b.uvl": False, "c.uvl": True}
+    assert service.verdicts.get("sum-b")["valid"] is False
+
+
+def test_upload_rejects_invalid_models(test_client):
+    user = User.query.filter_by(email="test@example.com").first()
+    login(test_client, "test@example.com", "test1234")
+    try:
+        response = test_client.post(
+            "/dataset/file/upload",
+            data={"file": (io.BytesIO(INVALID_UVL), "broken.uvl")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 400
+        assert response.get_json()["errors"]
+        assert not os.path.exists(os.path.join(user.temp_folder(), "broken.uvl"))
+        assert DigestIndex(user.temp_folder()).get("broken.uvl") is None
+
+        response = test_client.post(
+            "/dataset/file/upload",
+            data={"file": [(io.BytesIO(VALID_UVL), "one.uvl"), (io.BytesIO(VALID_UVL), "two.uvl")]},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 200
+        assert response.get_json()["filenames"] == ["one.uvl", "two.uvl"]
+    finally:
+        shutdown_process_pool()
+        shutil.rmtree(user.temp_folder(), ignore_errors=True)
+        logout(test_client)
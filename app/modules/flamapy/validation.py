@@ -0,0 +1,101 @@
+import logging
+import os
+from concurrent.futures import as_completed
+from typing import Dict, Iterable, Optional, Tuple
+
+from antlr4 import CommonTokenStream, FileStream
+from antlr4.error.ErrorListener import ErrorListener
+from uvl.UVLCustomLexer import UVLCustomLexer
+from uvl.UVLPythonParser import UVLPythonParser
+
+from app.modules.flamapy.pool import get_process_pool
+from core.caching import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class _CollectingErrorListener(ErrorListener):
+    def __init__(self):
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        if "\\t" in msg:
+            self.errors.append(
+                f"The UVL has the following warning that prevents reading it: Line {line}:{column} - {msg}"
+            )
+        else:
+            self.errors.append(
+                f"The UVL has the following error that prevents reading it: Line {line}:{column} - {msg}"
+            )
+
+
+def validate_uvl(path: str) -> dict:
+    """Parsea el UVL completo (lexer + parser) y devuelve ``{"valid": bool, "errors": [...]}``."""
+    listener = _CollectingErrorListener()
+    try:
+        lexer = UVLCustomLexer(FileStream(path, encoding="utf-8"))
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(listener)
+
+        parser = UVLPythonParser(CommonTokenStream(lexer))
+        parser.removeErrorListeners()
+        parser.addErrorListener(listener)
+        parser.featureModel()
+    except Exception as exc:
+        listener.errors.append(f"The UVL could not be read: {exc}")
+    return {"valid": not listener.errors, "errors": listener.errors}
+
+
+class UVLValidationService:
+    """
+    Validación de ficheros UVL con parseo completo. El veredicto se guarda por checksum en una LRU,
+    y los lotes (subidas de varios ficheros) se validan en paralelo en el pool de procesos de flamapy.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.verdicts = LRUCache(maxsize or int(os.getenv("UVL_VALIDATION_CACHE_SIZE", 4096)))
+
+    def validate_path(self, path: str, checksum: Optional[str] = None) -> dict:
+        if checksum:
+            verdict = self.verdicts.get(checksum)
+            if verdict is not None:
+                return verdict
+        verdict = validate_uvl(path)
+        if checksum:
+            self.verdicts.put(checksum, verdict)
+        return verdict
+
+    def validate_hubfile(self, hubfile) -> dict:
+        return self.validate_path(hubfile.get_path(), hubfile.checksum)
+
+    def validate_many(self, files: Iterable[Tuple[str, str, Optional[str]]]) -> Dict[str, dict]:
+        """Valida ``files`` (clave, ruta, checksum); solo los que no están en caché van al pool."""
+        results, pending = {}, []
+        for key, path, checksum in files:
+            verdict = self.verdicts.get(checksum) if checksum else None
+            if verdict is not None:
+                results[key] = verdict
+            else:
+                pending.append((key, path, checksum))
+
+        if len(pending) == 1:
+            key, path, checksum = pending[0]
+            results[key] = self.validate_path(path, checksum)
+        elif pending:
+            pool = get_process_pool()
+            futures = {pool.submit(validate_uvl, path): (key, checksum) for key, path, checksum in pending}
+            for future in as_completed(futures):
+                key, checksum = futures[future]
+                try:
+                    verdict = future.result()
+                except Exception as exc:
+                    logger.exception("UVL validation of %s failed", key)
+                    results[key] = {"valid": False, "errors": [f"The UVL could not be validated: {exc}"]}
+                    continue
+                if checksum:
+                    self.verdicts.put(checksum, verdict)
+                results[key] = verdict
+        return results
+
+
+uvl_validation_service = UVLValidationService()
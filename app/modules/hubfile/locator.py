@@ -0,0 +1,83 @@
+import os
+from typing import Dict, Iterable, Optional, Union
+
+from app import db
+from app.modules.dataset.models import BaseDataset
+from app.modules.featuremodel.models import FeatureModel
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.storage import BlobStore, dataset_file_path
+from core.caching import LRUCache
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class HubfileLocator:
+    """
+    Resuelve rutas de almacenamiento de Hubfiles por lotes con una única consulta
+    (file ⋈ feature_model ⋈ data_set) y guarda el resultado en una LRU acotada.
+
+    La clave es ``(id, sha256)``: una re-subida cambia el sha256, así que ningún worker devuelve
+    la ruta del contenido anterior aunque no haya atendido la re-subida. Con objetos ``Hubfile`` el
+    sha256 actual ya está cargado; con ids se lee con una consulta por clave primaria.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, blob_store: Optional[BlobStore] = None):
+        maxsize = maxsize or int(os.getenv("HUBFILE_LOCATOR_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+        self.cache = LRUCache(maxsize)
+        self._blob_store = blob_store
+
+    @property
+    def blob_store(self) -> BlobStore:
+        # Se crea perezosamente para respetar WORKING_DIR/UPLOADS_DIR en el momento de uso
+        if self._blob_store is None:
+            self._blob_store = BlobStore()
+        return self._blob_store
+
+    def _path_for(self, sha256: Optional[str], user_id: int, dataset_id: int, name: str) -> str:
+        if sha256 and self.blob_store.exists(sha256):
+            return self.blob_store.path_for(sha256)
+        return dataset_file_path(user_id, dataset_id, name)
+
+    @staticmethod
+    def _current_sha256s(hubfiles: Iterable[Union[Hubfile, int]]) -> Dict[int, Optional[str]]:
+        current: Dict[int, Optional[str]] = {}
+        ids = []
+        for item in hubfiles:
+            if isinstance(item, Hubfile):
+                current[item.id] = item.sha256
+            else:
+                ids.append(item)
+        ids = [hid for hid in dict.fromkeys(ids) if hid not in current]
+        if ids:
+            current.update(db.session.query(Hubfile.id, Hubfile.sha256).filter(Hubfile.id.in_(ids)).all())
+        return current
+
+    def resolve_many(self, hubfiles: Iterable[Union[Hubfile, int]]) -> Dict[int, str]:
+        current = self._current_sha256s(hubfiles)
+        paths = {hid: path for (hid, _sha256), path in self.cache.get_many(current.items()).items()}
+        missing = [hid for hid in current if hid not in paths]
+        if missing:
+            rows = (
+                db.session.query(
+                    Hubfile.id, Hubfile.name, Hubfile.sha256, BaseDataset.user_id, FeatureModel.data_set_id
+                )
+                .join(FeatureModel, Hubfile.feature_model_id == FeatureModel.id)
+                .join(BaseDataset, FeatureModel.data_set_id == BaseDataset.id)
+                .filter(Hubfile.id.in_(missing))
+                .all()
+            )
+            for hid, name, sha256, user_id, dataset_id in rows:
+                path = self._path_for(sha256, user_id, dataset_id, name)
+                self.cache.put((hid, sha256), path)
+                paths[hid] = path
+        return paths
+
+    def resolve(self, hubfile: Union[Hubfile, int]) -> Optional[str]:
+        hubfile_id = hubfile if isinstance(hubfile, int) else hubfile.id
+        return self.resolve_many([hubfile]).get(hubfile_id)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+hubfile_locator = HubfileLocator()
@@ -9,9 +9,12 @@ from app.modules.dataset.models import DataSet
 
 class Hubfile(db.Model):
     __tablename__ = "file"
+    # Sólo en SQLite: InnoDB ya indexa las claves foráneas
+    __table_args__ = (db.Index("ix_file_feature_model_id", "feature_model_id").ddl_if(dialect="sqlite"),)
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     checksum = db.Column(db.String(120), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
     size = db.Column(db.Integer, nullable=False)
     feature_model_id = db.Column(db.Integer, db.ForeignKey("feature_model.id"), nullable=False)
 
@@ -30,16 +33,17 @@ class Hubfile(db.Model):
 
         return HubfileService().get_dataset_by_hubfile(self)
 
-    def get_path(self) -> DataSet:
-        from app.modules.hubfile.services import HubfileService
+    def get_path(self) -> str:
+        from app.modules.hubfile.locator import hubfile_locator
 
-        return HubfileService().get_path_by_hubfile(self)
+        return hubfile_locator.resolve(self)
 
     def to_dict(self):
         return {
             "id": self.id,
             "name": self.name,
             "checksum": self.checksum,
+            "sha256": self.sha256,
             "size_in_bytes": self.size,
             "size_in_human_format": self.get_formatted_size(),
             "url": f'{request.host_url.rstrip("/")}/file/download/{self.id}',
@@ -51,6 +55,7 @@ class Hubfile(db.Model):
 
 class HubfileViewRecord(db.Model):
     __tablename__ = "file_view_record"
+    __table_args__ = (db.Index("ix_file_view_record_file_id_view_cookie_user_id", "file_id", "view_cookie", "user_id"),)
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     file_id = db.Column(db.Integer, db.ForeignKey("file.id"), nullable=False)
@@ -63,6 +68,9 @@ class HubfileViewRecord(db.Model):
 
 class HubfileDownloadRecord(db.Model):
     __tablename__ = "file_download_record"
+    __table_args__ = (
+        db.Index("ix_file_download_record_file_id_download_cookie_user_id", "file_id", "download_cookie", "user_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     file_id = db.Column(db.Integer, db.ForeignKey("file.id"))
@@ -25,6 +25,13 @@ class HubfileRepository(BaseRepository):
     def get_dataset_by_hubfile(self, hubfile: Hubfile) -> DataSet:
         return db.session.query(DataSet).join(FeatureModel).join(Hubfile).filter(Hubfile.id == hubfile.id).first()
 
+    def count_by_sha256(self, sha256: str) -> int:
+        return self.model.query.filter(Hubfile.sha256 == sha256).count()
+
+    def referenced_sha256s(self) -> set:
+        rows = db.session.query(Hubfile.sha256).filter(Hubfile.sha256.isnot(None)).distinct()
+        return {sha for (sha,) in rows}
+
 
 class HubfileViewRecordRepository(BaseRepository):
     def __init__(self):
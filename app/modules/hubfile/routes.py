@@ -2,7 +2,7 @@ import os
 import uuid
 from datetime import datetime, timezone
 
-from flask import current_app, jsonify, make_response, request, send_from_directory
+from flask import abort, jsonify, make_response, request, send_file
 from flask_login import current_user, login_required
 
 from app import db
@@ -10,6 +10,10 @@ from app.modules.dataset.services.versioning_service import VersioningService
 from app.modules.hubfile import hubfile_bp
 from app.modules.hubfile.models import Hubfile, HubfileDownloadRecord, HubfileViewRecord
 from app.modules.hubfile.services import HubfileDownloadRecordService, HubfileService
+from app.modules.hubfile.storage import dataset_file_path
+from core.decorators import Validators, conditional, make_etag
+from core.security import rate_limit
+from core.services.hashing import save_stream
 
 
 @hubfile_bp.route("/file/reupload/<int:file_id>", methods=["POST"])
@@ -27,20 +31,28 @@ def reupload_csv(file_id):
     if not file or not file.filename.lower().endswith(".csv"):
         return jsonify({"message": "CSV requerido"}), 400
 
-    # Guardar físicamente
-    path = hsvc.get_path_by_hubfile(hf)
+    # La ruta del dataset puede ser un enlace a un blob compartido: nunca se sobrescribe en sitio.
+    # Se escribe a un temporal (calculando checksum y tamaño en la misma pasada) y se sustituye.
+    path = dataset_file_path(dataset.user_id, dataset.id, hf.name)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.upload"
     try:
-        file.save(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = save_stream(file, tmp_path)
+        os.replace(tmp_path, path)
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return jsonify({"message": f"Error guardando CSV: {e}"}), 500
 
-    # (Opcional) recalcular size/checksum según vuestro servicio
-    try:
-        file.seek(0, 2)  # Ir al final
-        hf.size = file.tell()
-    except Exception:
-        pass
+    previous_sha256 = hf.sha256
+    hf.size = digest.size
+    hf.checksum = digest.md5
+    hf.sha256 = digest.sha256
     db.session.commit()
+    hsvc.store_blob(hf, path)
+    if previous_sha256 != hf.sha256:
+        # El contenido anterior sólo se conserva si otro fichero o un snapshot de versión lo usa
+        hsvc.release_blob(previous_sha256)
 
     # Crear nueva versión con snapshot y métricas
     try:
@@ -56,14 +68,24 @@ def reupload_csv(file_id):
     return jsonify({"message": "CSV re-subido y versionado correctamente"}), 200
 
 
+def _file_validators(file_id):
+    # El contenido se identifica por su hash; una re-subida lo cambia
+    hubfile = db.session.get(Hubfile, file_id)
+    if hubfile is None:
+        return None
+    return Validators(make_etag("file", hubfile.id, hubfile.sha256 or hubfile.checksum))
+
+
 @hubfile_bp.route("/file/download/<int:file_id>", methods=["GET"])
+@rate_limit("download", limit="DOWNLOAD_RATE_LIMIT", window="DOWNLOAD_RATE_WINDOW")
+@conditional(_file_validators, private=True)
 def download_file(file_id):
-    file = HubfileService().get_or_404(file_id)
-    filename = file.name
-
-    directory_path = f"uploads/user_{file.feature_model.data_set.user_id}/dataset_{file.feature_model.data_set_id}/"
-    parent_directory_path = os.path.dirname(current_app.root_path)
-    file_path = os.path.join(parent_directory_path, directory_path)
+    # Un 304 no pasa por aquí: no registra descarga ni fija la cookie. El cliente ya tiene el fichero
+    # de una respuesta 200 anterior, que registró la descarga (una por usuario, fichero y cookie)
+    # y le dio la cookie, así que los contadores no cambian.
+    hsvc = HubfileService()
+    file = hsvc.get_or_404(file_id)
+    file_path = hsvc.get_path_by_hubfile(file)
 
     # Obtener cookie o crear una nueva
     user_cookie = request.cookies.get("file_download_cookie")
@@ -86,7 +108,9 @@ def download_file(file_id):
         )
 
     # Respuesta con cookie persistente
-    resp = make_response(send_from_directory(directory=file_path, path=filename, as_attachment=True))
+    if not file_path or not os.path.isfile(file_path):
+        abort(404)
+    resp = make_response(send_file(file_path, as_attachment=True, download_name=file.name))
     resp.set_cookie("file_download_cookie", user_cookie)
 
     return resp
@@ -94,15 +118,12 @@ def download_file(file_id):
 
 @hubfile_bp.route("/file/view/<int:file_id>", methods=["GET"])
 def view_file(file_id):
-    file = HubfileService().get_or_404(file_id)
-    filename = file.name
-
-    directory_path = f"uploads/user_{file.feature_model.data_set.user_id}/dataset_{file.feature_model.data_set_id}/"
-    parent_directory_path = os.path.dirname(current_app.root_path)
-    file_path = os.path.join(parent_directory_path, directory_path, filename)
+    hsvc = HubfileService()
+    file = hsvc.get_or_404(file_id)
+    file_path = hsvc.get_path_by_hubfile(file)
 
     try:
-        if os.path.exists(file_path):
+        if file_path and os.path.exists(file_path):
             with open(file_path, "r") as f:
                 content = f.read()
 
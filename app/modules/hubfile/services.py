@@ -1,13 +1,13 @@
-import os
-
 from app.modules.auth.models import User
-from app.modules.dataset.models import DataSet
+from app.modules.dataset.models import DataSet, DatasetVersion
+from app.modules.hubfile.locator import hubfile_locator
 from app.modules.hubfile.models import Hubfile
 from app.modules.hubfile.repositories import (
     HubfileDownloadRecordRepository,
     HubfileRepository,
     HubfileViewRecordRepository,
 )
+from app.modules.hubfile.storage import BlobStore
 from core.services.BaseService import BaseService
 
 
@@ -16,6 +16,8 @@ class HubfileService(BaseService):
         super().__init__(HubfileRepository())
         self.hubfile_view_record_repository = HubfileViewRecordRepository()
         self.hubfile_download_record_repository = HubfileDownloadRecordRepository()
+        self.blob_store = BlobStore()
+        self.locator = hubfile_locator
 
     def get_owner_user_by_hubfile(self, hubfile: Hubfile) -> User:
         return self.repository.get_owner_user_by_hubfile(hubfile)
@@ -25,25 +27,47 @@ class HubfileService(BaseService):
 
     def get_path_by_hubfile(self, hubfile: Hubfile) -> str:
         """
-        Devuelve la ruta absoluta de un Hubfile según la estructura:
+        Devuelve la ruta absoluta de un Hubfile. Si su contenido está en el almacén de blobs basta
+        con la columna sha256; si no, el localizador la calcula con una única consulta:
         uploads/user_<user_id>/dataset_<dataset_id>/<hubfile.name>
-
-        Si WORKING_DIR no está definido en el entorno, usa '' para evitar errores.
         """
+        if hubfile.sha256 and self.blob_store.exists(hubfile.sha256):
+            return self.blob_store.path_for(hubfile.sha256)
+        return self.locator.resolve(hubfile)
+
+    def get_paths_by_hubfile_ids(self, hubfile_ids) -> dict:
+        return self.locator.resolve_many(hubfile_ids)
+
+    def store_blob(self, hubfile: Hubfile, file_path: str) -> str:
+        """Mueve el contenido de ``file_path`` al almacén de blobs y deja ``file_path`` enlazado a él."""
+        if not hubfile.sha256:
+            return file_path
+        return self.blob_store.ingest(file_path, hubfile.sha256)
+
+    def count_blob_references(self, sha256: str) -> int:
+        return self.repository.count_by_sha256(sha256)
+
+    def release_blob(self, sha256: str) -> bool:
+        """Borra el blob si ningún Hubfile ni snapshot de versión lo referencia ya."""
+        if not sha256 or self.count_blob_references(sha256) > 0 or sha256 in self.snapshot_sha256s():
+            return False
+        return self.blob_store.remove(sha256)
 
-        hubfile_user = self.get_owner_user_by_hubfile(hubfile)
-        hubfile_dataset = self.get_dataset_by_hubfile(hubfile)
-        working_dir = os.getenv("WORKING_DIR") or ""  # ✅ evita TypeError cuando es None
+    def referenced_sha256s(self) -> set:
+        """Blobs en uso: los de algún Hubfile más los de los snapshots de versiones."""
+        return self.repository.referenced_sha256s() | self.snapshot_sha256s()
 
-        path = os.path.join(
-            working_dir,
-            "uploads",
-            f"user_{hubfile_user.id}",
-            f"dataset_{hubfile_dataset.id}",
-            hubfile.name,
-        )
+    def collect_garbage(self) -> list:
+        return self.blob_store.collect_garbage(self.referenced_sha256s())
 
-        return path
+    @staticmethod
+    def snapshot_sha256s() -> set:
+        shas = set()
+        for (snapshot,) in DatasetVersion.query.with_entities(DatasetVersion.snapshot):
+            for entry in (snapshot or {}).get("files", []):
+                if isinstance(entry, dict) and entry.get("sha256"):
+                    shas.add(entry["sha256"])
+        return shas
 
     def total_hubfile_views(self) -> int:
         return self.hubfile_view_record_repository.total_hubfile_views()
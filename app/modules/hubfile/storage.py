@@ -0,0 +1,125 @@
+import errno
+import os
+import shutil
+import uuid
+from typing import Iterable, Iterator, Optional
+
+from core.configuration.configuration import uploads_folder_name
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# ioctl(FICLONE) de Linux: copia copy-on-write en btrfs/xfs/overlayfs
+FICLONE = 0x40049409
+BLOBS_FOLDER_NAME = "blobs"
+
+
+def default_blob_root() -> str:
+    return os.path.join(os.getenv("WORKING_DIR") or "", uploads_folder_name(), BLOBS_FOLDER_NAME)
+
+
+def dataset_folder(user_id: int, dataset_id: int) -> str:
+    """Carpeta clásica de un dataset: uploads/user_<id>/dataset_<id>."""
+    return os.path.abspath(
+        os.path.join(os.getenv("WORKING_DIR") or "", uploads_folder_name(), f"user_{user_id}", f"dataset_{dataset_id}")
+    )
+
+
+def dataset_file_path(user_id: int, dataset_id: int, name: str) -> str:
+    """Ruta clásica de un fichero de dataset: uploads/user_<id>/dataset_<id>/<name>."""
+    return os.path.join(dataset_folder(user_id, dataset_id), name)
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Materialise ``src`` at ``dst``: hard link, then reflink, then a plain copy as last resort."""
+    try:
+        os.link(src, dst)
+        return
+    except OSError as exc:
+        if exc.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+            raise
+    if not _reflink(src, dst):
+        shutil.copyfile(src, dst)
+
+
+class BlobStore:
+    """
+    Almacén direccionado por contenido: cada fichero se guarda una sola vez en
+    ``uploads/blobs/<sha[:2]>/<sha[2:4]>/<sha256>`` y las rutas por dataset son enlaces a él.
+
+    Los blobs son de solo lectura; quien necesite cambiar un fichero debe escribir uno nuevo
+    e ingerirlo, nunca abrir la ruta materializada en modo escritura.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or default_blob_root())
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return bool(sha256) and os.path.isfile(self.path_for(sha256))
+
+    def ingest(self, file_path: str, sha256: str) -> str:
+        """
+        Guarda el contenido de ``file_path`` bajo su SHA-256 y sustituye ``file_path`` por un enlace
+        al blob, de modo que las copias duplicadas comparten almacenamiento.
+        """
+        blob_path = self.path_for(sha256)
+        if not os.path.isfile(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{uuid.uuid4().hex}.tmp"
+            link_or_copy(file_path, tmp_path)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, blob_path)
+
+        if not os.path.samefile(file_path, blob_path):
+            self.materialise(sha256, file_path)
+        return blob_path
+
+    def materialise(self, sha256: str, dest_path: str) -> str:
+        """Hace disponible el blob en ``dest_path`` (reemplazándolo de forma atómica si ya existe)."""
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+        link_or_copy(self.path_for(sha256), tmp_path)
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+    def remove(self, sha256: str) -> bool:
+        blob_path = self.path_for(sha256)
+        try:
+            os.remove(blob_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_digests(self) -> Iterator[str]:
+        if not os.path.isdir(self.root):
+            return
+        for dirpath, _dirnames, filenames in os.walk(self.root):
+            for name in filenames:
+                if len(name) == 64 and not name.endswith(".tmp"):
+                    yield name
+
+    def collect_garbage(self, referenced: Iterable[str]) -> list:
+        """Borra los blobs que no aparecen en ``referenced`` y devuelve sus digests."""
+        keep = set(referenced)
+        removed = [sha for sha in self.iter_digests() if sha not in keep]
+        for sha in removed:
+            self.remove(sha)
+        return removed
@@ -0,0 +1,132 @@
+import io
+import os
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from app.modules.featuremodel.models import FeatureModel
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.services import HubfileService
+from app.modules.hubfile.storage import BlobStore
+from core.services.hashing import digest_file
+
+CSV_CONTENT = b"player,club\nPedri,Barcelona\n"
+
+
+def _write(path, content=CSV_CONTENT):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(content)
+    return str(path)
+
+
+def test_ingest_deduplicates_identical_uploads(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    first = _write(str(tmp_path / "user_1" / "dataset_1" / "players.csv"))
+    second = _write(str(tmp_path / "user_2" / "dataset_7" / "copy.csv"))
+    sha = digest_file(first).sha256
+
+    blob = store.ingest(first, sha)
+    assert store.ingest(second, sha) == blob
+
+    assert blob == store.path_for(sha)
+    assert blob.endswith(os.path.join(sha[:2], sha[2:4], sha))
+    assert os.path.samefile(first, blob)
+    assert os.path.samefile(second, blob)
+    assert list(store.iter_digests()) == [sha]
+
+
+def test_materialise_and_garbage_collection(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    src = _write(str(tmp_path / "in.csv"))
+    sha = digest_file(src).sha256
+    store.ingest(src, sha)
+
+    dest = store.materialise(sha, str(tmp_path / "snapshot" / "v1.csv"))
+    with open(dest, "rb") as fh:
+        assert fh.read() == CSV_CONTENT
+
+    assert store.collect_garbage({sha}) == []
+    assert store.collect_garbage(set()) == [sha]
+    assert not store.exists(sha)
+
+
+def test_hubfile_path_resolves_from_sha256(test_app, clean_database, tmp_path):
+    with test_app.app_context():
+        user = User(email="blobs@example.com")
+        user.set_password("pwd12345")
+        db.session.add(user)
+        md = DSMetaData(title="Blobs", description="d", publication_type=PublicationType.OTHER)
+        db.session.add(md)
+        db.session.flush()
+        ds = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+        db.session.add(ds)
+        db.session.flush()
+        fm = FeatureModel(data_set_id=ds.id)
+        db.session.add(fm)
+        db.session.flush()
+
+        legacy = _write(str(tmp_path / "legacy" / "players.csv"))
+        digest = digest_file(legacy)
+        hf = Hubfile(name="players.csv", feature_model_id=fm.id, size=digest.size, checksum=digest.md5)
+        hf.sha256 = digest.sha256
+        db.session.add(hf)
+        db.session.commit()
+
+        service = HubfileService()
+        service.blob_store = BlobStore(str(tmp_path / "blobs"))
+        service.store_blob(hf, legacy)
+
+        assert service.get_path_by_hubfile(hf) == service.blob_store.path_for(digest.sha256)
+        assert service.count_blob_references(digest.sha256) == 1
+        assert service.release_blob(digest.sha256) is False
+
+        db.session.delete(hf)
+        db.session.commit()
+        assert service.release_blob(digest.sha256) is True
+        assert not service.blob_store.exists(digest.sha256)
+
+
+def test_reupload_releases_previous_blob(test_client, clean_database, tmp_path, monkeypatch):
+    monkeypatch.setenv("WORKING_DIR", str(tmp_path))
+    with test_client.application.app_context():
+        user = User(email="reupload@example.com")
+        user.set_password("pwd12345")
+        db.session.add(user)
+        md = DSMetaData(title="Reupload", description="d", publication_type=PublicationType.OTHER)
+        db.session.add(md)
+        db.session.flush()
+        ds = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+        db.session.add(ds)
+        db.session.flush()
+        fm = FeatureModel(data_set_id=ds.id)
+        db.session.add(fm)
+        db.session.flush()
+        hf = Hubfile(name="players.csv", feature_model_id=fm.id, size=0, checksum="")
+        db.session.add(hf)
+        db.session.commit()
+
+        service = HubfileService()
+        original = _write(service.get_path_by_hubfile(hf))
+        hf.sha256 = digest_file(original).sha256
+        db.session.commit()
+        service.store_blob(hf, original)
+        old_sha256, file_id = hf.sha256, hf.id
+        assert service.blob_store.exists(old_sha256)
+
+    test_client.post("/login", data={"email": "reupload@example.com", "password": "pwd12345"})
+    response = test_client.post(
+        f"/file/reupload/{file_id}",
+        data={"file": (io.BytesIO(b"player,club\nGavi,Barcelona\n"), "players.csv")},
+        content_type="multipart/form-data",
+    )
+    test_client.get("/logout")
+
+    with test_client.application.app_context():
+        hf = db.session.get(Hubfile, file_id)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert hf.sha256 != old_sha256
+        assert service.blob_store.exists(hf.sha256)
+        # Sin snapshot de versión que lo use, el blob anterior se borra en la re-subida
+        assert old_sha256 not in service.snapshot_sha256s()
+        assert not service.blob_store.exists(old_sha256)
@@ -0,0 +1,83 @@
+import os
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.conftest import count_queries
+from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from app.modules.featuremodel.models import FeatureModel
+from app.modules.hubfile.locator import HubfileLocator
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.storage import BlobStore
+from core.caching import LRUCache
+
+
+def _create_files(names):
+    user = User(email="locator@example.com")
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(title="Locator", description="d", publication_type=PublicationType.OTHER)
+    db.session.add(md)
+    db.session.flush()
+    ds = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(ds)
+    db.session.flush()
+    fm = FeatureModel(data_set_id=ds.id)
+    db.session.add(fm)
+    db.session.flush()
+    files = [Hubfile(name=name, feature_model_id=fm.id, size=1, checksum="x") for name in names]
+    db.session.add_all(files)
+    db.session.commit()
+    return user, ds, files
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+    assert len(cache) == 2
+
+
+def test_locator_resolves_batch_with_one_query_and_caches(test_app, clean_database, tmp_path):
+    with test_app.app_context():
+        user, ds, files = _create_files(["a.csv", "b.csv", "c.uvl"])
+        locator = HubfileLocator(maxsize=16, blob_store=BlobStore(str(tmp_path / "blobs")))
+        ids = [f.id for f in files]
+        expected = os.path.join(f"user_{user.id}", f"dataset_{ds.id}", "a.csv")
+
+        with count_queries() as statements:
+            paths = locator.resolve_many(files)
+            assert len(statements) == 1
+            # Con objetos Hubfile el sha256 ya está cargado: la caché responde sin consultas
+            assert locator.resolve(files[0]) == paths[ids[0]]
+            assert len(statements) == 1
+            # Con ids sólo se lee el sha256 actual (clave primaria), no la ruta completa
+            assert locator.resolve_many(ids) == paths
+            assert len(statements) == 2
+
+        assert paths[ids[0]].endswith(expected)
+        assert os.path.isabs(paths[ids[0]])
+
+
+def test_locator_picks_up_reuploaded_content(test_app, clean_database, tmp_path):
+    with test_app.app_context():
+        _user, _ds, files = _create_files(["players.csv"])
+        hf = files[0]
+        store = BlobStore(str(tmp_path / "blobs"))
+        locator = HubfileLocator(maxsize=16, blob_store=store)
+        legacy = locator.resolve(hf)
+
+        src = tmp_path / "players.csv"
+        src.write_bytes(b"a,b\n1,2\n")
+        hf.sha256 = "ab" * 32
+        db.session.commit()
+        store.ingest(str(src), hf.sha256)
+
+        # Sin invalidación explícita: otro worker ve el nuevo sha256 y resuelve el blob
+        assert legacy != store.path_for(hf.sha256)
+        assert locator.resolve(hf) == store.path_for(hf.sha256)
+        assert locator.resolve(hf.id) == store.path_for(hf.sha256)
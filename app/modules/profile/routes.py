@@ -1,3 +1,5 @@
+import logging
+
 from flask import jsonify, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
 
@@ -9,6 +11,8 @@ from app.modules.profile import profile_bp
 from app.modules.profile.forms import UserProfileForm
 from app.modules.profile.services import UserProfileService
 
+logger = logging.getLogger(__name__)
+
 follow_service = FollowService()
 
 
@@ -57,8 +61,6 @@ def my_profile():
 
     total_datasets_count = db.session.query(DataSet).filter(DataSet.user_id == current_user.id).count()
 
-    print(user_datasets_pagination.items)
-
     return render_template(
         "profile/summary.html",
         user_profile=current_user.profile,
@@ -89,9 +91,8 @@ def serialize_dataset(dataset):
             data["view_url"] = data.get("url") or url_for("dataset.get_unsynchronized_dataset", dataset_id=dataset.id)
 
             return data
-        except Exception as e:
-            print(f"Error al serializar UVLDataset {dataset.id}: {e}")
-            pass
+        except Exception:
+            logger.exception("Error al serializar UVLDataset %s", dataset.id)
 
     if dataset.type == "tabular":
 
@@ -1,3 +1,4 @@
+from app.modules.auth.principal import invalidate_principal
 from app.modules.profile.repositories import UserProfileRepository
 from core.services.BaseService import BaseService
 
@@ -9,6 +10,7 @@ class UserProfileService(BaseService):
     def update_profile(self, user_profile_id, form):
         if form.validate():
             updated_instance = self.update(user_profile_id, **form.data)
+            invalidate_principal(getattr(updated_instance, "user_id", None))
             return updated_instance, None
 
         return None, form.errors
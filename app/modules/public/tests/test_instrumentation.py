@@ -0,0 +1,72 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from core.managers.instrumentation_manager import RequestMetrics, _current, registry
+
+
+def test_requests_report_query_count_and_metrics(test_client, clean_database, caplog):
+    app = test_client.application
+    with app.app_context():
+        user = User(email="metrics@example.com")
+        user.set_password("pwd12345")
+        db.session.add(user)
+        md = DSMetaData(title="Metrics", description="d", publication_type=PublicationType.OTHER)
+        db.session.add(md)
+        db.session.flush()
+        db.session.add(DataSet(user_id=user.id, ds_meta_data_id=md.id))
+        db.session.commit()
+    registry.reset()
+
+    with caplog.at_level("INFO", logger="fifahub.instrumentation"):
+        response = test_client.get("/api/datasets-polymorphic")
+        response.get_data()
+
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "app;dur=" in timing
+    record = next(r for r in caplog.records if r.name == "fifahub.instrumentation")
+    assert record.instrumentation["endpoint"] == "dataset.list_polymorphic"
+    assert record.instrumentation["queries"] >= 1
+    assert record.instrumentation["slowest"].startswith("SELECT")
+
+    app.config["METRICS_TOKEN"] = "s3cret"
+    try:
+        metrics = test_client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    finally:
+        app.config["METRICS_TOKEN"] = None
+    assert metrics.mimetype == "text/plain"
+    body = metrics.get_data(as_text=True)
+    assert 'fifahub_http_requests_total{endpoint="dataset.list_polymorphic",method="GET",status="200"} 1' in body
+    assert 'fifahub_db_queries_per_request_count{endpoint="dataset.list_polymorphic"} 1' in body
+    # /metrics no se cuenta a sí mismo
+    assert 'endpoint="metrics"' not in body
+
+
+def test_metrics_token(test_client):
+    app = test_client.application
+    assert test_client.get("/metrics").status_code == 404
+    app.config["METRICS_TOKEN"] = "s3cret"
+    try:
+        assert test_client.get("/metrics").status_code == 401
+        assert test_client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    finally:
+        app.config["METRICS_TOKEN"] = None
+
+
+def test_failed_statements_leave_no_timing_state(test_app):
+    token = _current.set(RequestMetrics())
+    try:
+        with test_app.app_context(), db.engine.connect() as conn:
+            for _ in range(3):
+                try:
+                    conn.execute(text("SELECT * FROM no_such_table"))
+                except OperationalError:
+                    conn.rollback()
+            conn.execute(text("SELECT 1"))
+            assert not any(key.startswith("fifahub") for key in conn.info)
+        assert _current.get().query_count == 1
+    finally:
+        _current.reset(token)
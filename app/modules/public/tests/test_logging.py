@@ -0,0 +1,67 @@
+import json
+import logging
+
+import pytest
+from flask import Flask
+
+from core.managers.logging_manager import JsonFormatter, LoggingManager, SamplingFilter, flush_logs
+
+
+def _record(name="app.test", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def logging_app(tmp_path):
+    app = Flask("app")
+    app.config.update(LOG_FILE=str(tmp_path / "app.log"), LOG_SAMPLING={"app.noisy": 0.5})
+    LoggingManager(app).setup_logging()
+
+    @app.route("/ping")
+    def ping():
+        logging.getLogger("app.modules.ping").info("pong")
+        return "ok"
+
+    yield app, tmp_path / "app.log"
+
+    # Se deja el pipeline como lo configura TestingConfig (sin fichero)
+    LoggingManager(Flask("app")).setup_logging()
+
+
+def test_json_formatter_includes_extra_fields():
+    record = _record()
+    record.instrumentation = {"queries": 3}
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["message"] == "hello world"
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app.test"
+    assert payload["instrumentation"] == {"queries": 3}
+
+
+def test_sampling_filter_keeps_one_in_n_and_never_drops_warnings():
+    sampler = SamplingFilter({"app.modules.dataset.downloads": 0.25})
+
+    kept = [sampler.filter(_record("app.modules.dataset.downloads")) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert sampler.filter(_record("app.modules.dataset.downloads", level=logging.WARNING))
+    assert all(sampler.filter(_record("app.modules.dataset.routes")) for _ in range(3))
+
+
+def test_request_logs_are_json_with_request_id(logging_app):
+    app, log_file = logging_app
+    client = app.test_client()
+
+    response = client.get("/ping", headers={"X-Request-ID": "abc-123"})
+    generated = client.get("/ping").headers["X-Request-ID"]
+    for _ in range(4):
+        logging.getLogger("app.noisy").info("sampled")
+    flush_logs()
+
+    assert response.headers["X-Request-ID"] == "abc-123"
+    lines = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    pongs = [line for line in lines if line["message"] == "pong"]
+    assert [line["request_id"] for line in pongs] == ["abc-123", generated]
+    assert pongs[0]["path"] == "/ping"
+    assert pongs[0]["elapsed_ms"] >= 0
+    assert sum(line["message"] == "sampled" for line in lines) == 2
@@ -0,0 +1,63 @@
+import json
+import marshal
+import time
+
+from flask import Flask
+
+from core.managers.profiler_manager import ProfilerManager
+
+
+def _app(tmp_path, **config):
+    app = Flask(__name__)
+    app.config.update(PROFILER_TOKEN="t0ken", PROFILER_OUTPUT_DIR=str(tmp_path), PROFILER_SAMPLE_INTERVAL=0.001)
+    app.config.update(config)
+
+    @app.route("/slow")
+    def slow():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        return "done"
+
+    ProfilerManager(app).setup_profiler()
+    return app
+
+
+def test_request_profiling_requires_token_and_stores_or_returns_artifacts(tmp_path):
+    client = _app(tmp_path).test_client()
+
+    assert client.get("/slow").data == b"done"
+    assert client.get("/slow", headers={"X-Profile": "cprofile"}).status_code == 403
+    assert client.get("/slow?_profile=bogus", headers={"X-Profile-Token": "t0ken"}).status_code == 400
+
+    stored = client.get("/slow?_profile=cprofile", headers={"X-Profile-Token": "t0ken"})
+    assert stored.data == b"done"
+    artifact = tmp_path / stored.headers["X-Profile-Artifact"]
+    stats = marshal.loads(artifact.read_bytes())
+    assert any(name == "slow" for (_, _, name) in stats)
+
+    returned = client.get(
+        "/slow",
+        headers={"X-Profile": "sampler", "X-Profile-Token": "t0ken", "X-Profile-Output": "return"},
+    )
+    document = json.loads(returned.data)
+    assert returned.headers["X-Profiled-Status"] == "200"
+    assert document["profiles"][0]["type"] == "sampled"
+    frames = document["shared"]["frames"]
+    assert any(frames[i]["name"] == "slow" for sample in document["profiles"][0]["samples"] for i in sample)
+
+
+def test_background_sampler_aggregates_stacks_per_endpoint(tmp_path):
+    app = _app(tmp_path, PROFILER_BACKGROUND_ENABLED=True, PROFILER_BACKGROUND_INTERVAL=0.001)
+    client = app.test_client()
+    try:
+        client.get("/slow")
+        headers = {"X-Profile-Token": "t0ken"}
+        assert client.get("/_profiler/stacks").status_code == 403
+        assert client.get("/_profiler/stacks?format=json", headers=headers).get_json()["slow"] > 0
+        collapsed = client.get("/_profiler/stacks?endpoint=slow", headers=headers).get_data(as_text=True)
+        assert collapsed.startswith("slow;")
+        assert "slow (test_profiler.py:" in collapsed
+        assert client.delete("/_profiler/stacks", headers=headers).status_code == 204
+    finally:
+        app.extensions["profiler"].background.stop()
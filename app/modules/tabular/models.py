@@ -121,8 +121,9 @@ class TabularColumn(db.Model):
     stats = db.Column(db.JSON)
 
     # --- Conexión (ForeignKey) ---
-    # Conexión N-a-1 con TabularMetaData
+    # Conexión N-a-1 con TabularMetaData (índice propio sólo en SQLite: InnoDB ya indexa las claves foráneas)
     meta_id = db.Column(db.Integer, db.ForeignKey("tabular_meta_data.id"), nullable=False)
+    __table_args__ = (db.Index("ix_tabular_column_meta_id", "meta_id").ddl_if(dialect="sqlite"),)
 
 
 class TabularMetrics(db.Model):
@@ -1,6 +1,7 @@
 import os
 import shutil
 import uuid
+from typing import Tuple
 
 from flask import abort, current_app, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
@@ -9,7 +10,12 @@ from werkzeug.utils import secure_filename
 from app import db
 from app.modules.dataset.models import Author, DSMetaData, PublicationType
 from app.modules.dataset.services.notification_service import notification_service
+from app.modules.featuremodel.models import FeatureModel
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.services import HubfileService
+from app.modules.hubfile.storage import dataset_file_path
 from app.modules.recommendation.service import RecommendationService
+from core.services.hashing import FileDigest, save_stream
 
 from . import tabular_bp
 from .forms import TabularDatasetForm
@@ -31,21 +37,32 @@ def _uploads_dir() -> str:
     return base
 
 
-def _save_uploaded_file(file_storage) -> str:
+def _save_uploaded_file(file_storage) -> Tuple[str, str, FileDigest]:
+    """Guarda la subida en un temporal calculando md5/sha256 en la misma pasada."""
     original = secure_filename(file_storage.filename or "")
     base, ext = os.path.splitext(original)
     base = base or "upload"
     ext = ext or ".csv"
-    filename = f"{base}-{uuid.uuid4().hex}{ext}"
-    path = os.path.join(_uploads_dir(), filename)
-    file_storage.save(path)
-    if os.path.getsize(path) == 0:
-        try:
-            os.remove(path)
-        finally:
-            pass
+    path = os.path.join(_uploads_dir(), f"{base}-{uuid.uuid4().hex}{ext}")
+    digest = save_stream(file_storage, path)
+    if digest.size == 0:
+        os.remove(path)
         raise ValueError("El archivo está vacío.")
-    return path
+    return path, f"{base}{ext}", digest
+
+
+def _csv_hubfile(dataset: TabularDataset, name: str) -> Hubfile:
+    """Hubfile del CSV dentro del dataset; una re-subida con el mismo nombre reutiliza la fila."""
+    feature_model = FeatureModel.query.filter_by(data_set_id=dataset.id).first()
+    if feature_model is None:
+        feature_model = FeatureModel(data_set_id=dataset.id)
+        db.session.add(feature_model)
+        db.session.flush()
+    hubfile = Hubfile.query.filter_by(feature_model_id=feature_model.id, name=name).first()
+    if hubfile is None:
+        hubfile = Hubfile(name=name, feature_model_id=feature_model.id, size=0, checksum="")
+        db.session.add(hubfile)
+    return hubfile
 
 
 @tabular_bp.route("/upload", methods=["GET", "POST"])
@@ -74,7 +91,7 @@ def upload():
         return render_template("upload_tabular.html", form=form), 400
 
     try:
-        file_path = _save_uploaded_file(f)
+        file_path, file_name, digest = _save_uploaded_file(f)
     except ValueError as e:
         flash(str(e), "danger")
         return render_template("upload_tabular.html", form=form), 400
@@ -151,11 +168,19 @@ def upload():
                 existing_tags.append(community_tag)
             ds_md.tags = ",".join(existing_tags) if existing_tags else None
 
+    hubfile = _csv_hubfile(dataset, file_name)
+    previous_sha256 = hubfile.sha256
+    hubfile.size = digest.size
+    hubfile.checksum = digest.md5
+    hubfile.sha256 = digest.sha256
+    db.session.flush()
+
     ingestor = TabularIngestor(resolve_path=lambda hubfile_id: hubfile_id)
     try:
         ingestor.ingest(
             dataset_id=dataset.id,
             file_path=file_path,
+            hubfile_id=hubfile.id,
             delimiter=(form.delimiter.data if form.delimiter.data != "\\t" else "\t"),
             has_header=bool(form.has_header.data),
             sample_rows=int(form.sample_rows.data or 20),
@@ -164,12 +189,13 @@ def upload():
         current_app.logger.exception("Falló la ingesta tabular")
         flash(f"Error al procesar el CSV: {e}", "danger")
         db.session.rollback()
+        os.remove(file_path)
         return render_template("upload_tabular.html", form=form), 400
 
-    storage_dir = os.path.join(_uploads_dir(), f"user_{dataset.user_id}", f"dataset_{dataset.id}")
-    os.makedirs(storage_dir, exist_ok=True)
-    dest_path = os.path.join(storage_dir, os.path.basename(file_path))
+    # Misma ruta que los UVL (uploads/user_<id>/dataset_<id>/<nombre>); luego queda enlazada al blob
+    dest_path = dataset_file_path(dataset.user_id, dataset.id, file_name)
     try:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
         shutil.move(file_path, dest_path)
     except Exception as exc:
         current_app.logger.exception("No se pudo preparar el archivo para su descarga")
@@ -184,6 +210,11 @@ def upload():
             flash("Aviso: no se pudo registrar la nueva versión.", "warning")
 
     db.session.commit()
+    hubfile_service = HubfileService()
+    hubfile_service.store_blob(hubfile, dest_path)
+    if previous_sha256 and previous_sha256 != hubfile.sha256:
+        # El contenido anterior sólo se conserva si otro fichero o un snapshot de versión lo usa
+        hubfile_service.release_blob(previous_sha256)
 
     notification_service.trigger_new_dataset_notifications_async(dataset)
 
@@ -1,12 +1,20 @@
+import hashlib
 import io
+import os
 
+from app import db
+from app.modules.auth.models import User
 from app.modules.conftest import login, logout
+from app.modules.hubfile.models import Hubfile
+from app.modules.hubfile.services import HubfileService
+from app.modules.hubfile.storage import dataset_file_path
 from app.modules.tabular.forms import FIFA_REQUIRED_COLUMNS
+from app.modules.tabular.models import TabularDataset
 
 
-def _post_tabular_upload(test_client, csv_bytes, filename="dataset.csv"):
+def _post_tabular_upload(test_client, csv_bytes, filename="dataset.csv", name="FIFA sample upload"):
     data = {
-        "name": "FIFA sample upload",
+        "name": name,
         "delimiter": ",",
         "encoding": "utf-8",
         "has_header": "y",
@@ -61,3 +69,40 @@ def test_upload_accepts_valid_fifa_schema(test_client):
     assert detail_response.status_code == 200
 
     logout(test_client)
+
+
+def test_same_csv_uploaded_twice_shares_one_blob(test_client, clean_database, tmp_path, monkeypatch):
+    monkeypatch.setenv("WORKING_DIR", str(tmp_path))
+    with test_client.application.app_context():
+        user = User(email="blob@example.com")
+        user.set_password("pwd12345")
+        db.session.add(user)
+        db.session.commit()
+
+    header = ",".join(FIFA_REQUIRED_COLUMNS)
+    row = "10,Kylian Mbappe,24,France,91,95,PSG,160000000,900000,Right,4,5,ST,178,73"
+    csv_bytes = f"{header}\n{row}\n".encode("utf-8")
+
+    login(test_client, "blob@example.com", "pwd12345")
+    for name in ("FIFA first", "FIFA second"):
+        response = _post_tabular_upload(test_client, csv_bytes, filename="players.csv", name=name)
+        assert response.status_code == 302, response.get_data(as_text=True)
+    logout(test_client)
+
+    with test_client.application.app_context():
+        hubfiles = Hubfile.query.filter_by(name="players.csv").all()
+        assert len(hubfiles) == 2
+        assert {hf.sha256 for hf in hubfiles} == {hashlib.sha256(csv_bytes).hexdigest()}
+
+        service = HubfileService()
+        sha256 = hubfiles[0].sha256
+        assert list(service.blob_store.iter_digests()) == [sha256]
+        assert service.count_blob_references(sha256) == 2
+        # Cada dataset enlaza al mismo blob: el inodo tiene el blob más los dos enlaces
+        blob_path = service.blob_store.path_for(sha256)
+        assert os.stat(blob_path).st_nlink == 3
+        for hf in hubfiles:
+            assert service.get_path_by_hubfile(hf) == blob_path
+            dataset = db.session.get(TabularDataset, hf.feature_model.data_set_id)
+            assert os.path.samefile(dataset_file_path(dataset.user_id, dataset.id, hf.name), blob_path)
+            assert dataset.meta_data.hubfile_id == hf.id
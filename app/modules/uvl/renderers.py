@@ -6,3 +6,19 @@ from typing import Mapping, Tuple
 class UVLDetailRenderer:
     def render(self, dataset) -> Tuple[str, Mapping]:
         return ("modules/uvl/_detail_uvl.html", {"dataset": dataset})
+
+
+# Rangos sobre DSMetrics.number_of_features (suma de features de los modelos del dataset)
+FEATURE_BUCKETS = {
+    "<50": (None, 50),
+    "50-500": (50, 500),
+    ">500": (500, None),
+}
+
+
+class UVLFacetProvider:
+    def get_facets(self):
+        return {
+            "satisfiable": ["yes", "no"],
+            "features": list(FEATURE_BUCKETS),
+        }
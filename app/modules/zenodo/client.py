@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (5, 120)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ZenodoError(Exception):
+    """Respuesta inesperada de la API de depositions (Zenodo o Fakenodo)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, details=None):
+        super().__init__(f"{message} (status={status_code}): {details}" if status_code else message)
+        self.status_code = status_code
+        self.details = details
+
+
+def _details(response: requests.Response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text[:500]
+
+
+class DepositionClient:
+    """
+    Cliente de la API de depositions de Zenodo con una ``requests.Session`` compartida
+    (keep-alive, pool de conexiones y reintentos con backoff exponencial).
+
+    Los ficheros se suben en paralelo con un pool de hilos acotado y se envían en streaming:
+    con la bucket API (``PUT links.bucket/<nombre>``) el cuerpo es el propio fichero abierto,
+    sin cargarlo en memoria. Si la deposition no ofrece bucket se usa el endpoint multipart clásico.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        access_token: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_workers = max_workers or int(os.getenv("ZENODO_UPLOAD_WORKERS", 8))
+        self.params = {"access_token": access_token} if access_token else {}
+
+        self.session = requests.Session()
+        # POST no es idempotente en Zenodo (crearía depositions duplicadas o publicaría dos veces):
+        # no se reintenta aquí; de reintentar creaciones y publicaciones se ocupa el DepositionJob
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "PUT", "DELETE", "HEAD", "OPTIONS"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(self.max_workers, 4), max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+    def _request(self, method: str, url: str, expected: Tuple[int, ...], error: str, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        params = dict(self.params)
+        params.update(kwargs.pop("params", None) or {})
+        response = self.session.request(method, url, params=params, **kwargs)
+        if response.status_code not in expected:
+            raise ZenodoError(error, response.status_code, _details(response))
+        if response.status_code == 204 or not response.content:
+            return {}
+        return response.json()
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def list_depositions(self) -> list:
+        return self._request("GET", self.base_url, (200,), "Failed to get depositions")
+
+    def create_deposition(self, metadata: dict) -> dict:
+        return self._request(
+            "POST", self.base_url, (200, 201), "Failed to create deposition", json={"metadata": metadata}
+        )
+
+    def get_deposition(self, deposition_id) -> dict:
+        return self._request("GET", f"{self.base_url}/{deposition_id}", (200,), "Failed to get deposition")
+
+    def delete_deposition(self, deposition_id) -> None:
+        self._request("DELETE", f"{self.base_url}/{deposition_id}", (200, 201, 202, 204), "Failed to delete deposition")
+
+    def publish(self, deposition_id) -> dict:
+        return self._request(
+            "POST", f"{self.base_url}/{deposition_id}/actions/publish", (200, 202), "Failed to publish deposition"
+        )
+
+    def upload_file(self, deposition: dict, file_path: str, file_name: Optional[str] = None) -> dict:
+        """Sube un fichero en streaming a la deposition (bucket API si está disponible)."""
+        file_name = file_name or os.path.basename(file_path)
+        bucket_url = (deposition.get("links") or {}).get("bucket")
+        with open(file_path, "rb") as fh:
+            if bucket_url:
+                return self._request(
+                    "PUT",
+                    f"{bucket_url.rstrip('/')}/{file_name}",
+                    (200, 201),
+                    f"Failed to upload {file_name}",
+                    data=fh,
+                    headers={"Content-Type": "application/octet-stream"},
+                )
+            return self._request(
+                "POST",
+                f"{self.base_url}/{deposition['id']}/files",
+                (200, 201),
+                f"Failed to upload {file_name}",
+                data={"name": file_name},
+                files={"file": (file_name, fh)},
+            )
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="zenodo-upload")
+            return self._executor
+
+    def upload_files(
+        self,
+        deposition: dict,
+        files: Iterable[Tuple[str, str]],
+        on_uploaded: Optional[Callable[[str, dict], None]] = None,
+    ) -> List[dict]:
+        """
+        Sube ``files`` ((nombre, ruta)) en paralelo. El tiempo total es aproximadamente el de la
+        subida más lenta; si alguna falla se lanza el primer error tras esperar a las demás.
+        ``on_uploaded(nombre, respuesta)`` se llama en el hilo que invoca según termina cada subida.
+        """
+        files = list(files)
+        if len(files) <= 1:
+            results = []
+            for name, path in files:
+                results.append(self.upload_file(deposition, path, name))
+                if on_uploaded is not None:
+                    on_uploaded(name, results[-1])
+            return results
+
+        futures = {self._pool().submit(self.upload_file, deposition, path, name): name for name, path in files}
+        results, first_error = {}, None
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as exc:
+                first_error = first_error or exc
+                continue
+            if on_uploaded is not None:
+                on_uploaded(futures[future], results[futures[future]])
+        if first_error is not None:
+            raise first_error
+        return [results[name] for name, _path in files]
+
+
+_shared_clients: Dict[Tuple[str, Optional[str]], DepositionClient] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_client(base_url: str, access_token: Optional[str] = None) -> DepositionClient:
+    """Un cliente por proceso y destino: la Session y el pool de subidas se reutilizan y se cierran al salir."""
+    key = (base_url.rstrip("/"), access_token)
+    with _shared_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _shared_clients[key] = DepositionClient(base_url, access_token=access_token)
+        return client
+
+
+@atexit.register
+def close_shared_clients() -> None:
+    with _shared_lock:
+        clients = list(_shared_clients.values())
+        _shared_clients.clear()
+    for client in clients:
+        client.close()
@@ -1,5 +1,58 @@
+from datetime import datetime, timezone
+
 from app import db
 
 
 class Zenodo(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+
+
+class DepositionJob(db.Model):
+    """
+    Publicación de un dataset en Zenodo/Fakenodo procesada en segundo plano.
+    ``step`` indica el siguiente paso pendiente, de modo que un reintento continúa donde se quedó.
+    """
+
+    __tablename__ = "deposition_job"
+
+    STEPS = ("create", "upload", "publish", "doi", "done")
+    ACTIVE_STATUSES = ("pending", "running", "retrying")
+
+    id = db.Column(db.Integer, primary_key=True)
+    dataset_id = db.Column(db.Integer, db.ForeignKey("data_set.id"), nullable=False, index=True)
+    idempotency_key = db.Column(db.String(64), nullable=False, unique=True)
+    status = db.Column(db.String(20), nullable=False, default="pending", index=True)
+    step = db.Column(db.String(20), nullable=False, default="create")
+    deposition_id = db.Column(db.Integer, nullable=True)
+    uploaded_files = db.Column(db.JSON, nullable=False, default=list)
+    doi = db.Column(db.String(120), nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    @staticmethod
+    def key_for(dataset_id: int) -> str:
+        return f"dataset-{dataset_id}"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "dataset_id": self.dataset_id,
+            "status": self.status,
+            "step": self.step,
+            "deposition_id": self.deposition_id,
+            "doi": self.doi,
+            "attempts": self.attempts,
+            "error": self.last_error,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+        }
+
+    def __repr__(self):
+        return f"<DepositionJob {self.id} dataset={self.dataset_id} {self.status}/{self.step}>"
@@ -1,7 +1,62 @@
-from app.modules.zenodo.models import Zenodo
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, update
+
+from app import db
+from app.modules.zenodo.models import DepositionJob, Zenodo
 from core.repositories.BaseRepository import BaseRepository
 
 
 class ZenodoRepository(BaseRepository):
     def __init__(self):
         super().__init__(Zenodo)
+
+
+class DepositionJobRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(DepositionJob)
+
+    def get_by_key(self, idempotency_key: str):
+        return self.model.query.filter_by(idempotency_key=idempotency_key).first()
+
+    def get_by_dataset(self, dataset_id: int):
+        return self.model.query.filter_by(idempotency_key=DepositionJob.key_for(dataset_id)).first()
+
+    def _unfinished(self, lease_seconds: int):
+        # Un job "running" cuyo worker murió (sin actividad durante el lease) se puede reclamar de nuevo
+        stale = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        return or_(
+            self.model.status.in_(("pending", "retrying")),
+            and_(self.model.status == "running", self.model.updated_at < stale),
+        )
+
+    def _claimable(self, lease_seconds: int):
+        # Los jobs en reintento esperan a que venza su backoff
+        now = datetime.now(timezone.utc)
+        return and_(
+            self._unfinished(lease_seconds),
+            or_(self.model.next_attempt_at.is_(None), self.model.next_attempt_at <= now),
+        )
+
+    def claim(self, job_id: int, lease_seconds: int) -> bool:
+        """Marca el job como ``running`` con un UPDATE condicional: solo un worker lo obtiene."""
+        result = db.session.execute(
+            update(self.model)
+            .where(self.model.id == job_id, self._claimable(lease_seconds))
+            .values(
+                status="running",
+                attempts=self.model.attempts + 1,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def resumable_ids(self, lease_seconds: int) -> list:
+        return [row.id for row in db.session.query(self.model.id).filter(self._claimable(lease_seconds)).all()]
+
+    def unfinished(self, lease_seconds: int) -> list:
+        """(id, next_attempt_at) de los jobs por terminar, incluidos los que aún esperan su reintento."""
+        query = db.session.query(self.model.id, self.model.next_attempt_at).filter(self._unfinished(lease_seconds))
+        return [(row.id, row.next_attempt_at) for row in query.all()]
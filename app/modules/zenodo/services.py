@@ -2,30 +2,48 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-import requests
 from dotenv import load_dotenv
-from flask import Response, jsonify
+from flask import Response, current_app, jsonify
 from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
 
-from app.modules.fakenodo.services import FakenodoService
-from app.modules.zenodo.repositories import ZenodoRepository
+from app import db
+from app.modules.zenodo.client import ZenodoError, shared_client
+from app.modules.zenodo.models import DepositionJob
+from app.modules.zenodo.repositories import DepositionJobRepository, ZenodoRepository
+from core.caching import LRUCache
 from core.configuration.configuration import uploads_folder_name
 from core.services.BaseService import BaseService
 
-ZenodoService = FakenodoService
-
 logger = logging.getLogger(__name__)
 load_dotenv()
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _deposition_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.getenv("DEPOSITION_WORKERS", 2))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deposition")
+        return _executor
+
 
 class ZenodoService(BaseService):
     def __init__(self) -> None:
         super().__init__(ZenodoRepository())
         self.ZENODO_ACCESS_TOKEN = self.get_zenodo_access_token()
         self.ZENODO_API_URL = self.get_zenodo_url()
-        self.headers = {"Content-Type": "application/json"}
-        self.params = {"access_token": self.ZENODO_ACCESS_TOKEN}
+        self.client = shared_client(self.ZENODO_API_URL, self.ZENODO_ACCESS_TOKEN)
+        # deposition_id -> respuesta de creación (links.bucket) hasta que se publica
+        self._depositions = LRUCache(256)
 
     # ---------------------------------------------------------------------
     # CONFIG
@@ -53,8 +71,11 @@ class ZenodoService(BaseService):
     # ---------------------------------------------------------------------
     def test_connection(self) -> bool:
         """Testea la conexión básica con Zenodo/Fakenodo."""
-        response = requests.get(self.ZENODO_API_URL, params=self.params, headers=self.headers)
-        return response.status_code == 200
+        try:
+            self.client.list_depositions()
+        except (ZenodoError, OSError):
+            return False
+        return True
 
     def test_full_connection(self) -> Response:
         """Test completo: crear deposition, subir archivo de prueba y borrar."""
@@ -68,39 +89,36 @@ class ZenodoService(BaseService):
             f.write("This is a test file with some content.")
 
         # 1) Crear deposition
-        data = {
-            "metadata": {
-                "title": "Test Deposition",
-                "upload_type": "dataset",
-                "description": "This is a test deposition created via Zenodo API",
-                "creators": [{"name": "John Doe"}],
-            }
+        metadata = {
+            "title": "Test Deposition",
+            "upload_type": "dataset",
+            "description": "This is a test deposition created via Zenodo API",
+            "creators": [{"name": "John Doe"}],
         }
-        response = requests.post(self.ZENODO_API_URL, json=data, params=self.params, headers=self.headers)
-        if response.status_code != 201:
+        try:
+            deposition = self.client.create_deposition(metadata)
+        except ZenodoError as exc:
             if os.path.exists(file_path):
                 os.remove(file_path)
             return jsonify(
                 {
                     "success": False,
-                    "messages": f"Failed to create test deposition. " f"Code: {response.status_code}",
+                    "messages": f"Failed to create test deposition. " f"Code: {exc.status_code}",
                 }
             )
 
-        deposition_id = response.json()["id"]
-
         # 2) Subir archivo
-        files = {"file": open(file_path, "rb")}
-        publish_url = f"{self.ZENODO_API_URL}/{deposition_id}/files"
-        response = requests.post(publish_url, params=self.params, files=files)
-        files["file"].close()
-
-        if response.status_code != 201:
-            messages.append(f"Failed to upload test file. Code: {response.status_code}")
+        try:
+            self.client.upload_file(deposition, file_path)
+        except ZenodoError as exc:
+            messages.append(f"Failed to upload test file. Code: {exc.status_code}")
             success = False
 
         # 3) Borrar deposition
-        requests.delete(f"{self.ZENODO_API_URL}/{deposition_id}", params=self.params)
+        try:
+            self.client.delete_deposition(deposition["id"])
+        except ZenodoError:
+            logger.warning("Could not delete test deposition %s", deposition["id"])
 
         if os.path.exists(file_path):
             os.remove(file_path)
@@ -111,10 +129,7 @@ class ZenodoService(BaseService):
     # API PRINCIPAL
     # ---------------------------------------------------------------------
     def get_all_depositions(self) -> dict:
-        response = requests.get(self.ZENODO_API_URL, params=self.params, headers=self.headers)
-        if response.status_code != 200:
-            raise Exception("Failed to get depositions")
-        return response.json()
+        return self.client.list_depositions()
 
     def create_new_deposition(self, dataset: "DataSet") -> dict:
         """
@@ -148,11 +163,28 @@ class ZenodoService(BaseService):
             "license": "CC-BY-4.0",
         }
 
-        data = {"metadata": metadata}
-        response = requests.post(self.ZENODO_API_URL, params=self.params, json=data, headers=self.headers)
-        if response.status_code != 201:
-            raise Exception(f"Failed to create deposition. Details: {response.json()}")
-        return response.json()
+        deposition = self.client.create_deposition(metadata)
+        self._depositions.put(deposition["id"], deposition)
+        return deposition
+
+    def _feature_model_file(self, dataset: "DataSet", feature_model: "FeatureModel", user=None) -> tuple:
+        uvl_filename = feature_model.fm_meta_data.uvl_filename
+        user_id = current_user.id if user is None else user.id
+        file_path = os.path.join(
+            uploads_folder_name(),
+            f"user_{str(user_id)}",
+            f"dataset_{dataset.id}",
+            uvl_filename,
+        )
+        return uvl_filename, file_path
+
+    def _deposition(self, deposition_id: int) -> dict:
+        """Deposition con sus ``links`` (bucket); se reutiliza la de create_new_deposition si la hay."""
+        deposition = self._depositions.get(deposition_id)
+        if deposition is None:
+            deposition = self.client.get_deposition(deposition_id)
+            self._depositions.put(deposition_id, deposition)
+        return deposition
 
     def upload_file(
         self,
@@ -165,38 +197,197 @@ class ZenodoService(BaseService):
         Sube un archivo a una deposition existente.
         Evitamos importar modelos en import time para no crear ciclos.
         """
-        uvl_filename = feature_model.fm_meta_data.uvl_filename
-        data = {"name": uvl_filename}
-        user_id = current_user.id if user is None else user.id
-        file_path = os.path.join(
-            uploads_folder_name(),
-            f"user_{str(user_id)}",
-            f"dataset_{dataset.id}",
-            uvl_filename,
-        )
-        files = {"file": open(file_path, "rb")}
-
-        publish_url = f"{self.ZENODO_API_URL}/{deposition_id}/files"
-        response = requests.post(publish_url, params=self.params, data=data, files=files)
-        files["file"].close()
+        uvl_filename, file_path = self._feature_model_file(dataset, feature_model, user)
+        return self.client.upload_file(self._deposition(deposition_id), file_path, uvl_filename)
 
-        if response.status_code != 201:
-            raise Exception(f"Failed to upload files. Details: {response.json()}")
-        return response.json()
+    def upload_feature_models(
+        self, dataset: "DataSet", deposition_id: int, user=None, feature_models=None, on_uploaded=None
+    ) -> list:
+        """Sube los feature models del dataset (todos por defecto) en paralelo (pool acotado del cliente)."""
+        feature_models = dataset.feature_models if feature_models is None else feature_models
+        files = [self._feature_model_file(dataset, fm, user) for fm in feature_models]
+        return self.client.upload_files(self._deposition(deposition_id), files, on_uploaded=on_uploaded)
 
     def publish_deposition(self, deposition_id: int) -> dict:
-        publish_url = f"{self.ZENODO_API_URL}/{deposition_id}/actions/publish"
-        response = requests.post(publish_url, params=self.params, headers=self.headers)
-        if response.status_code != 202:
-            raise Exception("Failed to publish deposition")
-        return response.json()
+        deposition = self.client.publish(deposition_id)
+        self._depositions.pop(deposition_id, None)
+        return deposition
 
     def get_deposition(self, deposition_id: int) -> dict:
-        deposition_url = f"{self.ZENODO_API_URL}/{deposition_id}"
-        response = requests.get(deposition_url, params=self.params, headers=self.headers)
-        if response.status_code != 200:
-            raise Exception("Failed to get deposition")
-        return response.json()
+        return self.client.get_deposition(deposition_id)
 
     def get_doi(self, deposition_id: int) -> str:
         return self.get_deposition(deposition_id).get("doi")
+
+
+class DepositionJobService(BaseService):
+    """
+    Pipeline de publicación en Zenodo desacoplado de la petición de subida.
+
+    Cada dataset tiene un único job (clave de idempotencia ``dataset-<id>``) que avanza por
+    create → upload → publish → doi. Tras cada llamada remota se guarda el paso alcanzado, así que un
+    reintento o un worker que retoma un job caído continúa en el paso pendiente sin repetir los anteriores.
+    Los fallos se reintentan con backoff exponencial hasta ``DEPOSITION_JOB_MAX_ATTEMPTS``.
+    """
+
+    def __init__(self, zenodo_service: Optional[ZenodoService] = None) -> None:
+        super().__init__(DepositionJobRepository())
+        self._zenodo_service = zenodo_service
+        self.max_attempts = int(os.getenv("DEPOSITION_JOB_MAX_ATTEMPTS", 5))
+        self.retry_delay = float(os.getenv("DEPOSITION_JOB_RETRY_DELAY", 30))
+        self.lease_seconds = int(os.getenv("DEPOSITION_JOB_LEASE", 600))
+
+    @property
+    def zenodo_service(self) -> ZenodoService:
+        if self._zenodo_service is None:
+            self._zenodo_service = ZenodoService()
+        return self._zenodo_service
+
+    def get_for_dataset(self, dataset_id: int) -> Optional[DepositionJob]:
+        return self.repository.get_by_dataset(dataset_id)
+
+    def enqueue(self, dataset, schedule: bool = True) -> DepositionJob:
+        """Crea (o reutiliza) el job del dataset y lo programa. Llamarlo dos veces no duplica la publicación."""
+        key = DepositionJob.key_for(dataset.id)
+        job = self.repository.get_by_key(key)
+        if job is None:
+            try:
+                job = self.repository.create(dataset_id=dataset.id, idempotency_key=key, uploaded_files=[])
+            except IntegrityError:
+                db.session.rollback()
+                job = self.repository.get_by_key(key)
+        if schedule and job.status in DepositionJob.ACTIVE_STATUSES:
+            self.schedule(job.id)
+        return job
+
+    def schedule(self, job_id: int, delay: float = 0):
+        app = current_app._get_current_object()
+
+        def _worker(job_id=job_id, app=app):
+            try:
+                with app.app_context():
+                    self.process(job_id)
+            except Exception:
+                logger.exception("Deposition job %s crashed", job_id)
+
+        if delay > 0:
+            timer = threading.Timer(delay, lambda: _deposition_executor().submit(_worker))
+            timer.daemon = True
+            timer.start()
+            return timer
+        return _deposition_executor().submit(_worker)
+
+    def resumable_ids(self) -> list:
+        """Jobs que se pueden ejecutar ya: pendientes, con el backoff vencido o abandonados por un worker caído."""
+        return self.repository.resumable_ids(self.lease_seconds)
+
+    def resume_pending(self) -> list:
+        """
+        Reprograma en este proceso los jobs sin terminar; los que están en reintento esperan lo que
+        les quede de backoff. Se llama al arrancar para no perder los reintentos (los ``Timer`` no
+        sobreviven a un reinicio).
+        """
+        now = datetime.now(timezone.utc)
+        job_ids = []
+        for job_id, next_attempt_at in self.repository.unfinished(self.lease_seconds):
+            delay = 0
+            if next_attempt_at is not None:
+                if next_attempt_at.tzinfo is None:
+                    next_attempt_at = next_attempt_at.replace(tzinfo=timezone.utc)
+                delay = max((next_attempt_at - now).total_seconds(), 0)
+            self.schedule(job_id, delay=delay)
+            job_ids.append(job_id)
+        return job_ids
+
+    def process(self, job_id: int, reschedule: bool = True) -> Optional[DepositionJob]:
+        """Ejecuta los pasos pendientes del job si este worker consigue reclamarlo."""
+        if not self.repository.claim(job_id, self.lease_seconds):
+            return None
+        job = self.repository.get_by_id(job_id)
+        try:
+            self._run_steps(job)
+        except Exception as exc:
+            db.session.rollback()
+            job = self.repository.get_by_id(job_id)
+            self._record_failure(job, exc, reschedule=reschedule)
+        return job
+
+    def _run_steps(self, job: DepositionJob) -> None:
+        from app.modules.auth.models import User
+        from app.modules.dataset.models import DataSet, DSMetaData
+        from app.modules.dataset.services.doi_resolver import doi_resolver
+
+        dataset = DataSet.query.get(job.dataset_id)
+        if dataset is None:
+            raise ValueError(f"Dataset {job.dataset_id} no longer exists")
+        ds_meta_data = DSMetaData.query.get(dataset.ds_meta_data_id)
+        zenodo = self.zenodo_service
+
+        if job.step == "create":
+            if job.deposition_id is None:
+                deposition = zenodo.create_new_deposition(dataset)
+                # Lo primero tras el POST: si el job cae después, al retomarlo no se crea otra deposition
+                job.deposition_id = deposition["id"]
+                db.session.commit()
+            ds_meta_data.deposition_id = job.deposition_id
+            self._advance(job, "upload")
+
+        if job.step == "upload":
+            done = set(job.uploaded_files or [])
+            pending = [fm for fm in dataset.feature_models if fm.fm_meta_data.uvl_filename not in done]
+
+            def _uploaded(filename, _response):
+                # Cada fichero se guarda al terminar: un reintento solo sube los que faltan
+                done.add(filename)
+                job.uploaded_files = sorted(done)
+                db.session.commit()
+
+            if pending:
+                user = db.session.get(User, dataset.user_id)
+                zenodo.upload_feature_models(
+                    dataset, job.deposition_id, user=user, feature_models=pending, on_uploaded=_uploaded
+                )
+            self._advance(job, "publish")
+
+        if job.step == "publish":
+            # Si el publish anterior llegó a Zenodo pero el job cayó antes de guardarlo, no se repite
+            if not zenodo.get_deposition(job.deposition_id).get("submitted"):
+                zenodo.publish_deposition(job.deposition_id)
+            self._advance(job, "doi")
+
+        if job.step == "doi":
+            doi = zenodo.get_doi(job.deposition_id)
+            if not doi:
+                raise ZenodoError(f"Deposition {job.deposition_id} has no DOI yet")
+            job.doi = doi
+            ds_meta_data.dataset_doi = doi
+            job.status = "done"
+            job.last_error = None
+            job.next_attempt_at = None
+            self._advance(job, "done")
+            doi_resolver.register(doi, job.dataset_id)
+            logger.info("Dataset %s published with DOI %s", job.dataset_id, doi)
+
+    def _advance(self, job: DepositionJob, step: str) -> None:
+        job.step = step
+        db.session.commit()
+
+    def _record_failure(self, job: DepositionJob, exc: Exception, reschedule: bool = True) -> None:
+        job.last_error = str(exc)[:2000]
+        if job.attempts >= self.max_attempts:
+            job.status = "failed"
+            job.next_attempt_at = None
+            db.session.commit()
+            logger.error("Deposition job %s failed at step %s: %s", job.id, job.step, exc)
+            return
+
+        delay = self.retry_delay * 2 ** max(job.attempts - 1, 0)
+        job.status = "retrying"
+        job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        db.session.commit()
+        logger.warning("Deposition job %s failed at step %s, retrying in %.0fs: %s", job.id, job.step, delay, exc)
+        if reschedule:
+            self.schedule(job.id, delay=delay)
+
+
+deposition_job_service = DepositionJobService()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+from werkzeug.serving import make_server
+
+from app.modules.fakenodo.services import FakenodoService
+from app.modules.zenodo.client import DepositionClient, ZenodoError
+
+
+def _client(url):
+    return DepositionClient(url, max_workers=4, retries=0)
+
+
+@pytest.fixture
+def fakenodo_url(test_client):
+    """Fakenodo servido por HTTP real (servidor werkzeug con hilos) para probar el cliente de extremo a extremo."""
+    server = make_server("127.0.0.1", 0, test_client.application, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/fakenodo/depositions"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def test_upload_files_runs_concurrently(tmp_path, monkeypatch):
+    client = DepositionClient("http://fakenodo.invalid/depositions", max_workers=8)
+
+    def slow_upload(deposition, path, name):
+        time.sleep(0.2)
+        return {"filename": name}
+
+    monkeypatch.setattr(client, "upload_file", slow_upload)
+    start = time.perf_counter()
+    with client:
+        results = client.upload_files({"id": 1}, [(f"m{i}.uvl", f"/tmp/m{i}.uvl") for i in range(8)])
+
+    assert [r["filename"] for r in results] == [f"m{i}.uvl" for i in range(8)]
+    assert time.perf_counter() - start < 0.2 * 4
+
+
+def test_deposition_roundtrip_against_fakenodo(fakenodo_url, tmp_path):
+    files = []
+    for i in range(6):
+        path = tmp_path / f"model{i}.uvl"
+        path.write_text(f"features\n    Root{i}\n")
+        files.append((path.name, str(path)))
+
+    with _client(fakenodo_url) as client:
+        deposition = client.create_deposition({"title": "E2E", "upload_type": "dataset"})
+        assert deposition["conceptrecid"]
+        assert deposition["links"]["bucket"]
+        try:
+            uploaded = client.upload_files(deposition, files)
+            assert sorted(f["filename"] for f in uploaded) == sorted(name for name, _ in files)
+
+            # El endpoint multipart clásico sigue funcionando sin bucket
+            client.upload_file({"id": deposition["id"]}, str(tmp_path / "model0.uvl"), "extra.uvl")
+
+            published = client.publish(deposition["id"])
+            assert published["doi"] == f"10.5281/fakenodo.{deposition['id']}"
+
+            stored = client.get_deposition(deposition["id"])
+            assert stored["doi"] == published["doi"]
+            assert len(stored["files"]) == len(files) + 1
+
+            with pytest.raises(ZenodoError) as excinfo:
+                client.get_deposition(deposition["id"] + 1000)
+            assert excinfo.value.status_code == 404
+        finally:
+            shutil.rmtree(FakenodoService().files_folder(deposition["id"]), ignore_errors=True)
+
+    assert not os.path.exists(FakenodoService().files_folder(deposition["id"]))
+
+
+def test_zenodo_services_share_one_client_per_destination(monkeypatch):
+    from app.modules.zenodo.client import shared_client
+    from app.modules.zenodo.services import ZenodoService
+
+    monkeypatch.setenv("FAKENODO_URL", "http://fakenodo.invalid/depositions")
+
+    first, second = ZenodoService(), ZenodoService()
+
+    assert first.client is second.client
+    assert shared_client("http://fakenodo.invalid/depositions/", first.ZENODO_ACCESS_TOKEN) is first.client
+    assert shared_client("http://other.invalid/depositions") is not first.client
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from app.modules.auth.models import User
+from app.modules.conftest import login, logout
+from app.modules.dataset.models import DataSet, DSMetaData, PublicationType
+from app.modules.featuremodel.models import FeatureModel, FMMetaData
+from app.modules.zenodo.client import ZenodoError
+from app.modules.zenodo.models import DepositionJob
+from app.modules.zenodo.services import DepositionJobService
+
+
+class FakeZenodo:
+    """Sustituto de ZenodoService que cuenta las llamadas y puede fallar en publish."""
+
+    def __init__(self, fail_publish=0, fail_upload=()):
+        self.fail_publish = fail_publish
+        self.fail_upload = set(fail_upload)
+        self.created, self.uploaded, self.published = 0, [], 0
+
+    def create_new_deposition(self, dataset):
+        self.created += 1
+        return {"id": 77, "conceptrecid": "77"}
+
+    def upload_feature_models(self, dataset, deposition_id, user=None, feature_models=None, on_uploaded=None):
+        for fm in feature_models:
+            name = fm.fm_meta_data.uvl_filename
+            if name in self.fail_upload:
+                self.fail_upload.discard(name)
+                raise ZenodoError(f"Failed to upload {name}", 503)
+            self.uploaded.append(name)
+            if on_uploaded is not None:
+                on_uploaded(name, {"filename": name})
+        return []
+
+    def get_deposition(self, deposition_id):
+        return {"id": deposition_id, "submitted": self.published > 0}
+
+    def publish_deposition(self, deposition_id):
+        if self.fail_publish:
+            self.fail_publish -= 1
+            raise ZenodoError("Failed to publish deposition", 503)
+        self.published += 1
+        return {"id": deposition_id}
+
+    def get_doi(self, deposition_id):
+        return f"10.5281/fakenodo.{deposition_id}" if self.published else None
+
+
+def _create_dataset(models=2):
+    user = User(email="deposit@example.com")
+    user.set_password("pwd12345")
+    db.session.add(user)
+    md = DSMetaData(title="Deposit", description="d", publication_type=PublicationType.OTHER)
+    db.session.add(md)
+    db.session.flush()
+    ds = DataSet(user_id=user.id, ds_meta_data_id=md.id)
+    db.session.add(ds)
+    db.session.flush()
+    for i in range(models):
+        name = f"model{i}.uvl"
+        fm_md = FMMetaData(uvl_filename=name, title=name, description="d", publication_type=PublicationType.OTHER)
+        db.session.add(FeatureModel(data_set_id=ds.id, fm_meta_data=fm_md))
+    db.session.commit()
+    return ds
+
+
+def test_job_runs_every_step_and_stores_doi(test_client, clean_database):
+    fake = FakeZenodo()
+    service = DepositionJobService(zenodo_service=fake)
+    ds = _create_dataset()
+
+    job = service.enqueue(ds, schedule=False)
+    assert service.enqueue(ds, schedule=False).id == job.id
+
+    job = service.process(job.id)
+
+    assert (job.status, job.step, job.doi) == ("done", "done", "10.5281/fakenodo.77")
+    assert job.uploaded_files == ["model0.uvl", "model1.uvl"]
+    md = DSMetaData.query.get(ds.ds_meta_data_id)
+    assert (md.deposition_id, md.dataset_doi) == (77, "10.5281/fakenodo.77")
+    # Un job terminado no se vuelve a reclamar
+    assert service.process(job.id) is None
+
+
+def test_failed_publish_resumes_without_repeating_steps(test_client, clean_database):
+    fake = FakeZenodo(fail_publish=1)
+    service = DepositionJobService(zenodo_service=fake)
+    service.retry_delay = 0
+    job = service.enqueue(_create_dataset(), schedule=False)
+
+    job = service.process(job.id, reschedule=False)
+    assert (job.status, job.step, job.attempts) == ("retrying", "publish", 1)
+    assert "503" in job.last_error and job.next_attempt_at is not None
+
+    job = service.process(job.id, reschedule=False)
+    assert (job.status, job.attempts) == ("done", 2)
+    assert fake.created == 1
+    assert fake.uploaded == ["model0.uvl", "model1.uvl"]
+
+
+def test_failed_upload_keeps_finished_files_and_waits_for_backoff(test_client, clean_database):
+    fake = FakeZenodo(fail_upload={"model1.uvl"})
+    service = DepositionJobService(zenodo_service=fake)
+    job = service.enqueue(_create_dataset(models=3), schedule=False)
+
+    job = service.process(job.id, reschedule=False)
+    assert (job.status, job.step, job.deposition_id) == ("retrying", "upload", 77)
+    assert job.uploaded_files == ["model0.uvl"]
+
+    # El backoff aún no ha vencido: ni el CLI ni otro worker lo reclaman
+    assert service.resumable_ids() == []
+    assert service.process(job.id, reschedule=False) is None
+
+    job.next_attempt_at = None
+    db.session.commit()
+    job = service.process(job.id, reschedule=False)
+    assert job.status == "done"
+    assert fake.created == 1
+    assert fake.uploaded == ["model0.uvl", "model1.uvl", "model2.uvl"]
+
+
+def test_resume_pending_schedules_unfinished_jobs_after_their_backoff(test_client, clean_database, monkeypatch):
+    service = DepositionJobService(zenodo_service=FakeZenodo())
+    job = service.enqueue(_create_dataset(), schedule=False)
+    job_id = job.id
+    scheduled = []
+    monkeypatch.setattr(service, "schedule", lambda job_id, delay=0: scheduled.append((job_id, delay)))
+
+    assert service.resume_pending() == [job_id]
+    assert scheduled == [(job_id, 0)]
+
+    job.status = "retrying"
+    job.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=120)
+    db.session.commit()
+    scheduled.clear()
+    service.resume_pending()
+    assert scheduled[0][0] == job_id and 100 < scheduled[0][1] <= 120
+
+
+def test_job_fails_after_max_attempts(test_client, clean_database):
+    service = DepositionJobService(zenodo_service=FakeZenodo(fail_publish=5))
+    service.max_attempts = 2
+    service.retry_delay = 0
+    job = service.enqueue(_create_dataset(), schedule=False)
+
+    service.process(job.id, reschedule=False)
+    job = service.process(job.id, reschedule=False)
+
+    assert job.status == "failed"
+    assert service.process(job.id, reschedule=False) is None
+
+
+def test_deposition_status_endpoint(test_client, clean_database):
+    ds = _create_dataset()
+    DepositionJobService(zenodo_service=FakeZenodo()).enqueue(ds, schedule=False)
+    dataset_id = ds.id
+
+    login(test_client, "deposit@example.com", "pwd12345")
+    try:
+        response = test_client.get(f"/dataset/{dataset_id}/deposition")
+        assert response.status_code == 200
+        assert response.get_json()["status"] == "pending"
+        assert DepositionJob.query.count() == 1
+    finally:
+        logout(test_client)
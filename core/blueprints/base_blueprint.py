@@ -1,7 +1,10 @@
+import logging
 import os
 
 from flask import Blueprint, Response
 
+logger = logging.getLogger(__name__)
+
 
 class BaseBlueprint(Blueprint):
     def __init__(
@@ -35,7 +38,7 @@ class BaseBlueprint(Blueprint):
         if os.path.exists(script_path):
             self.add_url_rule(f"/{self.name}/scripts.js", "scripts", self.send_script)
         else:
-            print(f"(BaseBlueprint) -> {script_path} does not exist.")
+            logger.debug("(BaseBlueprint) -> %s does not exist.", script_path)
 
     def send_script(self):
         script_path = os.path.join(self.module_path, "assets", "scripts.js")
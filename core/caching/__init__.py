@@ -0,0 +1,8 @@
+"""
+Caching helpers shared across modules.
+"""
+
+from .fragments import FragmentCache
+from .lru import LRUCache
+
+__all__ = ["FragmentCache", "LRUCache"]
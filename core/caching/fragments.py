@@ -0,0 +1,42 @@
+from typing import Callable, Hashable, Optional
+
+from flask import current_app
+from markupsafe import Markup
+
+from .lru import LRUCache
+
+
+class FragmentCache:
+    """
+    Caché de fragmentos HTML ya renderizados. La clave debe incluir una revisión del objeto
+    (p. ej. ``("versioning", dataset.id, dataset.revision)``): al modificarse el objeto cambia la
+    clave y la entrada antigua deja de usarse hasta que el LRU la descarta.
+
+    Se configura con ``FRAGMENT_CACHE_ENABLED`` y ``FRAGMENT_CACHE_SIZE``.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self._maxsize = maxsize
+        self._cache: Optional[LRUCache] = None
+
+    def _store(self) -> LRUCache:
+        if self._cache is None:
+            self._cache = LRUCache(self._maxsize or current_app.config.get("FRAGMENT_CACHE_SIZE", 1024))
+        return self._cache
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> Markup:
+        if not current_app.config.get("FRAGMENT_CACHE_ENABLED", True):
+            return Markup(render())
+        store = self._store()
+        html = store.get(key)
+        if html is None:
+            html = Markup(render())
+            store.put(key, html)
+        return html
+
+    def clear(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache) if self._cache is not None else 0
@@ -0,0 +1,4 @@
+from .decorators import pass_or_abort
+from .http_cache import Validators, conditional, make_etag
+
+__all__ = ["Validators", "conditional", "make_etag", "pass_or_abort"]
@@ -0,0 +1,110 @@
+"""
+Cabeceras de caché HTTP y peticiones condicionales (``ETag``/``Last-Modified`` -> 304) para
+endpoints de solo lectura.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Iterable, NamedTuple, Optional, Union
+
+from flask import current_app, make_response, request
+
+
+class Validators(NamedTuple):
+    """Validadores de la representación que devolvería la vista."""
+
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+
+
+def make_etag(*parts) -> str:
+    """ETag estable a partir de valores baratos de obtener (id, revisión, contadores, fechas...)."""
+    return hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:32]
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    # Las fechas de la BD son naive en UTC; HTTP no tiene precisión de microsegundos
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def _max_age(max_age: Union[int, str, None]) -> int:
+    if isinstance(max_age, str):
+        return int(current_app.config.get(max_age, 0))
+    if max_age is not None:
+        return int(max_age)
+    per_blueprint = current_app.config.get("HTTP_CACHE_MAX_AGE") or {}
+    return int(per_blueprint.get(request.blueprint, current_app.config.get("HTTP_CACHE_DEFAULT_MAX_AGE", 0)))
+
+
+def _not_modified(validators: Validators) -> bool:
+    # RFC 9110: si llega If-None-Match, If-Modified-Since se ignora
+    if request.if_none_match:
+        return validators.etag is not None and request.if_none_match.contains_weak(validators.etag)
+    if request.if_modified_since and validators.last_modified is not None:
+        return _as_utc(validators.last_modified) <= request.if_modified_since
+    return False
+
+
+def _apply_headers(response, validators: Optional[Validators], max_age: int, private: bool, vary: Iterable[str] = ()):
+    for header in vary:
+        response.vary.add(header)
+    if validators is not None:
+        if validators.etag is not None:
+            response.set_etag(validators.etag)
+        if validators.last_modified is not None:
+            response.last_modified = _as_utc(validators.last_modified)
+    if private:
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if max_age == 0:
+        # Se puede guardar, pero hay que revalidar (con el ETag) antes de reutilizarla
+        response.cache_control.no_cache = True
+    return response
+
+
+def conditional(
+    validators: Optional[Callable[..., Optional[Validators]]] = None,
+    max_age: Union[int, str, None] = None,
+    private: bool = False,
+    vary: Iterable[str] = (),
+):
+    """
+    Decorador de rutas GET. ``validators(**view_kwargs)`` calcula ETag/Last-Modified sin hacer el
+    trabajo de la vista; si coinciden con ``If-None-Match``/``If-Modified-Since`` se responde 304 sin
+    llamarla. Si devuelve ``None`` (o no se indica) el ETag se calcula del cuerpo de la respuesta.
+
+    ``max_age`` puede ser un entero o una clave de ``app.config``; por defecto se toma de
+    ``HTTP_CACHE_MAX_AGE[<blueprint>]`` (o ``HTTP_CACHE_DEFAULT_MAX_AGE``). ``private`` es para
+    respuestas que dependen del usuario o fijan cookies. ``vary`` son las cabeceras de la petición
+    que cambian la representación (p. ej. ``Accept``); deben formar parte también de los validadores.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if not current_app.config.get("HTTP_CACHE_ENABLED", True) or request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            seconds = _max_age(max_age)
+            vary_headers = tuple(vary)
+            found = validators(**kwargs) if validators is not None else None
+            if found is not None and _not_modified(found):
+                return _apply_headers(make_response("", 304), found, seconds, private, vary_headers)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if found is None and not (response.is_streamed or response.direct_passthrough):
+                response.add_etag()
+                response = response.make_conditional(request)
+            return _apply_headers(response, found, seconds, private, vary_headers)
+
+        return wrapped
+
+    return decorator
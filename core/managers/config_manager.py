@@ -14,12 +14,26 @@ class ConfigManager:
         # Load configuration
         if config_name == "testing":
             self.app.config.from_object(TestingConfig)
+        elif config_name == "benchmark":
+            self.app.config.from_object(BenchmarkConfig)
         elif config_name == "production":
             self.app.config.from_object(ProductionConfig)
         else:
             self.app.config.from_object(DevelopmentConfig)
 
 
+def _int_map(value: str) -> dict:
+    """``"dataset=60,hubfile=300"`` -> ``{"dataset": 60, "hubfile": 300}``."""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): int(seconds) for key, seconds in pairs}
+
+
+def _float_map(value: str) -> dict:
+    """``"app.a=0.1,b=0.5"`` -> ``{"app.a": 0.1, "b": 0.5}``."""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {key.strip(): float(rate) for key, rate in pairs}
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_bytes())
     SQLALCHEMY_DATABASE_URI = (
@@ -43,8 +57,63 @@ class Config:
     MAIL_USE_SSL = os.getenv("MAIL_USE_SSL", "false").lower() == "true"
 
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+    MAIL_CONNECTION_IDLE_TIMEOUT = int(os.getenv("MAIL_CONNECTION_IDLE_TIMEOUT", "30"))
+    MAIL_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("MAIL_MAX_MESSAGES_PER_CONNECTION", "100"))
+    NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "2"))
+    NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "1000"))
+    NOTIFICATION_DIGEST_WINDOW = float(os.getenv("NOTIFICATION_DIGEST_WINDOW", "5"))
+    NOTIFICATION_RECIPIENT_BATCH = int(os.getenv("NOTIFICATION_RECIPIENT_BATCH", "500"))
+    DOI_RESOLVER_WARM_ON_STARTUP = os.getenv("DOI_RESOLVER_WARM_ON_STARTUP", "true").lower() == "true"
+    DEPOSITION_RESUME_ON_STARTUP = os.getenv("DEPOSITION_RESUME_ON_STARTUP", "true").lower() == "true"
+    PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "0"))
+    FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE_ENABLED", "true").lower() == "true"
+    FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "1024"))
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_DEFAULT_MAX_AGE = int(os.getenv("HTTP_CACHE_DEFAULT_MAX_AGE", "0"))
+    # max-age (segundos) por blueprint para las rutas decoradas con core.decorators.conditional
+    HTTP_CACHE_MAX_AGE = _int_map(os.getenv("HTTP_CACHE_MAX_AGE", "dataset=60,hubfile=300"))
     TWO_FACTOR_RATE_LIMIT = int(os.getenv("TWO_FACTOR_RATE_LIMIT", "10"))
     TWO_FACTOR_RATE_WINDOW = int(os.getenv("TWO_FACTOR_RATE_WINDOW", "60"))
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_ALGORITHM = os.getenv("RATE_LIMIT_ALGORITHM", "sliding_window")
+    RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", os.path.join("instance", "rate_limit.sqlite3"))
+    RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    # Proxies inversos delante de la app; con 0 se ignora X-Forwarded-For (lo puede enviar cualquier cliente)
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+    RATE_LIMIT_DEFAULT = int(os.getenv("RATE_LIMIT_DEFAULT", "60"))
+    RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "60"))
+    AUTH_RATE_LIMIT = int(os.getenv("AUTH_RATE_LIMIT", "20"))
+    AUTH_RATE_WINDOW = int(os.getenv("AUTH_RATE_WINDOW", "60"))
+    DOWNLOAD_RATE_LIMIT = int(os.getenv("DOWNLOAD_RATE_LIMIT", "120"))
+    DOWNLOAD_RATE_WINDOW = int(os.getenv("DOWNLOAD_RATE_WINDOW", "60"))
+    EXPLORE_RATE_LIMIT = int(os.getenv("EXPLORE_RATE_LIMIT", "120"))
+    EXPLORE_RATE_WINDOW = int(os.getenv("EXPLORE_RATE_WINDOW", "60"))
+    EXPORT_RATE_LIMIT = int(os.getenv("EXPORT_RATE_LIMIT", "10"))
+    EXPORT_RATE_WINDOW = int(os.getenv("EXPORT_RATE_WINDOW", "60"))
+    # Margen (s) que el watermark del export incremental retrocede para cubrir transacciones en curso
+    EXPORT_WATERMARK_OVERLAP = int(os.getenv("EXPORT_WATERMARK_OVERLAP", "300"))
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE = os.getenv("LOG_FILE", "app.log")
+    LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    # "json" (una línea JSON por traza) o "text"
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    # Fracción de trazas INFO/DEBUG que se conservan por logger (y sus hijos)
+    LOG_SAMPLING = _float_map(os.getenv("LOG_SAMPLING", "app.modules.dataset.downloads=0.1"))
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "true").lower() == "true"
+    SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    # Peticiones con al menos este número de consultas se registran como WARNING (0 = nunca)
+    INSTRUMENTATION_QUERY_WARN = int(os.getenv("INSTRUMENTATION_QUERY_WARN", "50"))
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # /metrics exige "Authorization: Bearer <token>"; sin token responde 404
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Perfilado bajo demanda (core.managers.profiler_manager); desactivado si no hay token
+    PROFILER_TOKEN = os.getenv("PROFILER_TOKEN")
+    PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR")
+    PROFILER_SAMPLE_INTERVAL = float(os.getenv("PROFILER_SAMPLE_INTERVAL", "0.005"))
+    PROFILER_BACKGROUND_ENABLED = os.getenv("PROFILER_BACKGROUND_ENABLED", "false").lower() == "true"
+    PROFILER_BACKGROUND_INTERVAL = float(os.getenv("PROFILER_BACKGROUND_INTERVAL", "0.01"))
     PREFERRED_URL_SCHEME = os.getenv("PREFERRED_URL_SCHEME", "https")
     SESSION_COOKIE_SECURE = os.getenv("SESSION_COOKIE_SECURE", "false").lower() == "true"
     REMEMBER_COOKIE_SECURE = os.getenv("REMEMBER_COOKIE_SECURE", "false").lower() == "true"
@@ -64,11 +133,32 @@ class TestingConfig(Config):
         "sqlite:///test_app.db",
     )
     WTF_CSRF_ENABLED = False
+    RATE_LIMIT_BACKEND = "memory"
+    # Los tests crean y procesan sus jobs de publicación explícitamente
+    DEPOSITION_RESUME_ON_STARTUP = False
+    # Sin fichero de log: las trazas de los tests no rotan app.log
+    LOG_FILE = os.getenv("TEST_LOG_FILE")
+    SESSION_COOKIE_SECURE = False
+    REMEMBER_COOKIE_SECURE = False
+
+
+class BenchmarkConfig(Config):
+    # rosemary bench: catálogo sintético en SQLite; el resto como en producción
+    SQLALCHEMY_DATABASE_URI = os.getenv("BENCH_DATABASE_URI", "sqlite:///bench.db")
+    WTF_CSRF_ENABLED = False
+    RATE_LIMIT_ENABLED = False
+    RATE_LIMIT_BACKEND = "memory"
+    # La BD se siembra después de create_app; el mapa de DOIs se carga en la primera resolución
+    DOI_RESOLVER_WARM_ON_STARTUP = False
+    DEPOSITION_RESUME_ON_STARTUP = False
+    LOG_FILE = None
     SESSION_COOKIE_SECURE = False
     REMEMBER_COOKIE_SECURE = False
 
 
 class ProductionConfig(Config):
     DEBUG = False
+    # En producción la app siempre va detrás de un proxy (nginx o el balanceador de Render)
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1"))
     SESSION_COOKIE_SECURE = True
     REMEMBER_COOKIE_SECURE = True
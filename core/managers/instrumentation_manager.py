@@ -0,0 +1,225 @@
+import hmac
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from flask import Response, abort, request, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("fifahub.instrumentation")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+# Longitud máxima de la sentencia más lenta en la línea de log
+STATEMENT_PREVIEW = 300
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    query_count: int = 0
+    sql_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record_query(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.sql_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("fifahub_request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Métricas de la petición en curso (``None`` fuera de una petición instrumentada)."""
+    return _current.get()
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Agregados por endpoint del proceso actual, en formato de texto de Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+            self.durations: Dict[str, _Histogram] = {}
+            self.queries: Dict[str, _Histogram] = {}
+            self.sql_seconds: Dict[str, float] = defaultdict(float)
+
+    def observe(self, endpoint: str, method: str, status: int, metrics: RequestMetrics, wall_time: float) -> None:
+        with self._lock:
+            self.requests[(endpoint, method, str(status))] += 1
+            self.durations.setdefault(endpoint, _Histogram(DURATION_BUCKETS)).observe(wall_time)
+            self.queries.setdefault(endpoint, _Histogram(QUERY_BUCKETS)).observe(metrics.query_count)
+            self.sql_seconds[endpoint] += metrics.sql_time
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+    def _histogram_lines(self, name: str, histograms: Dict[str, _Histogram]):
+        for endpoint, histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                yield f"{name}_bucket{self._labels(endpoint=endpoint, le=bound)} {count}"
+            yield f"{name}_bucket{self._labels(endpoint=endpoint, le='+Inf')} {histogram.total}"
+            yield f"{name}_sum{self._labels(endpoint=endpoint)} {histogram.sum}"
+            yield f"{name}_count{self._labels(endpoint=endpoint)} {histogram.total}"
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP fifahub_http_requests_total HTTP requests by endpoint, method and status.",
+                "# TYPE fifahub_http_requests_total counter",
+            ]
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                labels = self._labels(endpoint=endpoint, method=method, status=status)
+                lines.append(f"fifahub_http_requests_total{labels} {count}")
+            lines += [
+                "# HELP fifahub_http_request_duration_seconds Wall time per request.",
+                "# TYPE fifahub_http_request_duration_seconds histogram",
+                *self._histogram_lines("fifahub_http_request_duration_seconds", self.durations),
+                "# HELP fifahub_db_queries_per_request SQL statements executed per request.",
+                "# TYPE fifahub_db_queries_per_request histogram",
+                *self._histogram_lines("fifahub_db_queries_per_request", self.queries),
+                "# HELP fifahub_db_query_seconds_total Time spent executing SQL.",
+                "# TYPE fifahub_db_query_seconds_total counter",
+            ]
+            for endpoint, seconds in sorted(self.sql_seconds.items()):
+                lines.append(f"fifahub_db_query_seconds_total{self._labels(endpoint=endpoint)} {seconds}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # El inicio se guarda en el contexto de esta ejecución: si la sentencia falla se descarta con él
+    if context is not None and _current.get() is not None:
+        context._fifahub_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = getattr(context, "_fifahub_query_start", None)
+    if metrics is None or started is None:
+        return
+    metrics.record_query(statement, time.perf_counter() - started)
+
+
+_engine_hooks_installed = False
+_engine_hooks_lock = threading.Lock()
+
+
+def _install_engine_hooks() -> None:
+    # Se escucha la clase Engine: vale para cualquier engine creado antes o después de create_app
+    global _engine_hooks_installed
+    with _engine_hooks_lock:
+        if not _engine_hooks_installed:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            _engine_hooks_installed = True
+
+
+class InstrumentationManager:
+    """
+    Mide cada petición: número de consultas SQL, tiempo total en SQL, la sentencia más lenta y el
+    tiempo total. Lo expone como cabecera ``Server-Timing``, una línea de log (logger
+    ``fifahub.instrumentation``, con los valores en ``extra["instrumentation"]``) y ``/metrics``
+    en formato Prometheus (agregados del proceso). ``/metrics`` responde 404 mientras no haya
+    ``METRICS_TOKEN``: los nombres de endpoint y los tiempos no deben quedar públicos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def setup_instrumentation(self):
+        if not self.app.config.get("INSTRUMENTATION_ENABLED", True):
+            return
+        _install_engine_hooks()
+        request_started.connect(self._request_started, self.app, weak=False)
+        request_finished.connect(self._request_finished, self.app, weak=False)
+        self.app.teardown_request(self._teardown)
+        if self.app.config.get("METRICS_ENABLED", True):
+            self.app.add_url_rule("/metrics", "metrics", self._metrics_view, methods=["GET"])
+
+    @staticmethod
+    def _request_started(sender, **extra):
+        _current.set(RequestMetrics())
+
+    def _request_finished(self, sender, response, **extra):
+        metrics = _current.get()
+        if metrics is None or request.endpoint in (None, "static", "metrics") or request.endpoint.endswith(".static"):
+            return
+        wall_time = time.perf_counter() - metrics.started
+        status = response.status_code
+        registry.observe(request.endpoint, request.method, status, metrics, wall_time)
+
+        if self.app.config.get("SERVER_TIMING_ENABLED", True):
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.query_count} queries", '
+                f"app;dur={wall_time * 1000:.2f}",
+            )
+
+        values = {
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": status,
+            "duration_ms": round(wall_time * 1000, 2),
+            "queries": metrics.query_count,
+            "sql_ms": round(metrics.sql_time * 1000, 2),
+            "slowest_ms": round(metrics.slowest_time * 1000, 2),
+            "slowest": (metrics.slowest_statement or "")[:STATEMENT_PREVIEW],
+        }
+        threshold = self.app.config.get("INSTRUMENTATION_QUERY_WARN", 50)
+        level = logging.WARNING if threshold and metrics.query_count >= threshold else logging.INFO
+        logger.log(
+            level,
+            "%(method)s %(path)s -> %(status)s in %(duration_ms)sms (%(queries)s queries, %(sql_ms)sms SQL)",
+            values,
+            extra={"instrumentation": values},
+        )
+
+    @staticmethod
+    def _teardown(exc):
+        _current.set(None)
+
+    def _metrics_view(self):
+        token = self.app.config.get("METRICS_TOKEN")
+        if not token:
+            abort(404)
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied, token):
+            abort(401)
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
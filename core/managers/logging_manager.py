@@ -1,29 +1,199 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+from flask import has_request_context, request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+ENVIRON_REQUEST_ID = "fifahub.request_id"
+ENVIRON_REQUEST_START = "fifahub.request_start"
+
+# Atributos propios de LogRecord: el resto de campos (``extra=...``) se vuelcan en el JSON
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Añade ``request_id``, método, ruta y ms transcurridos de la petición en curso."""
+
+    def filter(self, record):
+        if has_request_context():
+            environ = request.environ
+            record.request_id = environ.get(ENVIRON_REQUEST_ID)
+            record.method = request.method
+            record.path = request.path
+            started = environ.get(ENVIRON_REQUEST_START)
+            if started is not None:
+                record.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Deja pasar una de cada ``1/rate`` trazas por debajo de WARNING de los loggers configurados (y sus
+    hijos). Avisos y errores nunca se descartan. La tasa se anota en ``record.sample_rate``.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rate(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None or rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        every = max(1, round(1 / rate))
+        with self._lock:
+            seen = self._counters.get(record.name, 0)
+            self._counters[record.name] = seen + 1
+        record.sample_rate = rate
+        return seen % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por traza; los campos de ``extra`` se incluyen tal cual."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Se resuelve el mensaje y la traza en el hilo de la petición; el resto lo formatea el listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_QueueHandler] = None
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
 
 
 class LoggingManager:
+    """
+    Las trazas se encolan (``QueueHandler``) en el hilo que las emite y un ``QueueListener`` las
+    escribe: fichero con rotación por tamaño (``LOG_FILE``) y consola en modo debug. Formato JSON
+    (``LOG_FORMAT``) con ``request_id`` y tiempos de la petición; muestreo por logger con
+    ``LOG_SAMPLING``.
+    """
+
     def __init__(self, app):
         self.app = app
 
-    def setup_logging(self):
-        # Configure log format
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-
-        # Configure the log file with file rotation
-        file_handler = RotatingFileHandler("app.log", maxBytes=10240, backupCount=10)
-        file_handler.setLevel(logging.ERROR)
-        file_handler.setFormatter(formatter)
+    def _handlers(self):
+        config = self.app.config
+        if config.get("LOG_FORMAT", "json") == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
-        # Add handler to app logger
-        self.app.logger.addHandler(file_handler)
+        handlers = []
+        if config.get("LOG_FILE"):
+            file_handler = RotatingFileHandler(
+                config["LOG_FILE"],
+                maxBytes=int(config.get("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+                backupCount=int(config.get("LOG_BACKUP_COUNT", 5)),
+                encoding="utf-8",
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
 
-        # Configure console log if necessary
         if self.app.debug:
             stream_handler = logging.StreamHandler()
-            stream_handler.setLevel(logging.INFO)
             stream_handler.setFormatter(formatter)
-            self.app.logger.addHandler(stream_handler)
+            handlers.append(stream_handler)
+        return handlers
+
+    def setup_logging(self):
+        global _listener, _queue_handler
+
+        # create_app puede llamarse varias veces (tests): se sustituye la cola anterior
+        root = logging.getLogger()
+        if _queue_handler is not None:
+            root.removeHandler(_queue_handler)
+        _stop_listener()
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter(self.app.config.get("LOG_SAMPLING") or {}))
+        _queue_handler.addFilter(RequestContextFilter())
+        root.addHandler(_queue_handler)
+
+        level = logging.getLevelName(str(self.app.config.get("LOG_LEVEL", "INFO")).upper())
+        # Sólo los loggers del proyecto: las librerías mantienen su nivel
+        for name in (self.app.logger.name, "app", "core", "fifahub", "rosemary"):
+            logging.getLogger(name).setLevel(level)
+
+        _listener = QueueListener(log_queue, *self._handlers(), respect_handler_level=True)
+        _listener.start()
+
+        self.app.before_request(self._start_request)
+        self.app.after_request(self._tag_response)
+
+    @staticmethod
+    def _start_request():
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        # Se acepta el id del proxy si es razonable; si no, se genera uno
+        request_id = incoming if 0 < len(incoming) <= 128 and incoming.isprintable() else uuid.uuid4().hex
+        request.environ[ENVIRON_REQUEST_ID] = request_id
+        request.environ[ENVIRON_REQUEST_START] = time.perf_counter()
+
+    @staticmethod
+    def _tag_response(response):
+        request_id = request.environ.get(ENVIRON_REQUEST_ID)
+        if request_id:
+            response.headers.setdefault(REQUEST_ID_HEADER, request_id)
+        return response
+
 
-        # Set the overall log level
-        self.app.logger.setLevel(logging.INFO)
+def flush_logs():
+    """Espera a que el listener escriba lo encolado (tests y comandos de consola)."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
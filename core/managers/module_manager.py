@@ -1,5 +1,6 @@
 # module_manager.py
 import importlib.util
+import logging
 import os
 
 from dotenv import load_dotenv
@@ -7,6 +8,8 @@ from flask import Blueprint
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class ModuleManager:
     def __init__(self, app):
@@ -47,7 +50,9 @@ class ModuleManager:
                             blueprint = getattr(routes_module, item)
                             self.app.register_blueprint(blueprint)
                 except ModuleNotFoundError as e:
-                    print(f"Error registering modules: Could not load the module " f"for Module '{module_name}': {e}")
+                    logger.error(
+                        "Error registering modules: Could not load the module for Module '%s': %s", module_name, e
+                    )
 
     def register_module(self, module_name):
         module_path = os.path.join(self.modules_dir, module_name)
@@ -60,11 +65,11 @@ class ModuleManager:
                         self.app.register_module(blueprint)
                 return
             except ModuleNotFoundError as e:
-                print(f"Could not load the module for Blueprint '{module_name}': {e}")
+                logger.error("Could not load the module for Blueprint '%s': %s", module_name, e)
 
     def unregister_blueprints(self):
         for name, blueprint in list(self.app.modules.items()):
-            print(f"Unregistering module: {name}")
+            logger.info("Unregistering module: %s", name)
             self.app.modules.pop(name)
 
     def reload_blueprints(self):
@@ -0,0 +1,297 @@
+import cProfile
+import hmac
+import json
+import logging
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, abort, jsonify, request
+
+logger = logging.getLogger("fifahub.profiler")
+
+MODES = ("cprofile", "sampler")
+MAX_STACK_DEPTH = 128
+# Pilas distintas guardadas por endpoint en el muestreador de fondo
+MAX_STACKS_PER_ENDPOINT = 5000
+ENVIRON_KEY = "fifahub.profile"
+
+Frame = Tuple[str, str, int]
+
+
+def _stack(frame) -> List[Frame]:
+    """Pila de la raíz a la hoja como (función, fichero, línea)."""
+    frames = []
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        frames.append((code.co_name, code.co_filename, frame.f_lineno))
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _collapsed(stack: List[Frame]) -> str:
+    # Formato "collapsed" de flamegraph.pl / speedscope: funciones separadas por ';'
+    return ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+
+
+def speedscope_document(name: str, samples: List[List[Frame]], interval: float) -> dict:
+    """Perfil muestreado en el formato de https://www.speedscope.app."""
+    frames: List[dict] = []
+    index: Dict[Frame, int] = {}
+    encoded = []
+    for stack in samples:
+        row = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            row.append(index[frame])
+        encoded.append(row)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "fifahub",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": interval * len(encoded),
+                "samples": encoded,
+                "weights": [interval] * len(encoded),
+            }
+        ],
+    }
+
+
+class StackSampler:
+    """Muestreador estadístico: un hilo que cada ``interval`` segundos copia la pila de ``thread_id``."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: List[List[Frame]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fifahub-request-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples.append(_stack(frame))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class BackgroundSampler:
+    """
+    Muestrea periódicamente los hilos que están atendiendo una petición y acumula sus pilas
+    (formato collapsed) por endpoint, para obtener un flame graph agregado a lo largo del tiempo.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[int, str] = {}
+        self._stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, thread_id: int, endpoint: str) -> None:
+        self._active[thread_id] = endpoint
+
+    def untrack(self, thread_id: int) -> None:
+        self._active.pop(thread_id, None)
+
+    def sample_once(self) -> None:
+        frames = sys._current_frames()
+        for thread_id, endpoint in list(self._active.items()):
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            key = _collapsed(_stack(frame))
+            with self._lock:
+                stacks = self._stacks[endpoint]
+                if key in stacks or len(stacks) < MAX_STACKS_PER_ENDPOINT:
+                    stacks[key] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception:
+                logger.exception("Background sampler iteration failed")
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fifahub-background-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self, endpoint: Optional[str] = None) -> str:
+        with self._lock:
+            endpoints = [endpoint] if endpoint else sorted(self._stacks)
+            lines = []
+            for name in endpoints:
+                for stack, count in self._stacks.get(name, Counter()).most_common():
+                    lines.append(f"{name};{stack} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def endpoints(self) -> Dict[str, int]:
+        with self._lock:
+            return {name: sum(stacks.values()) for name, stacks in sorted(self._stacks.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks.clear()
+
+
+class ProfilerManager:
+    """
+    Perfilado bajo demanda en producción. Sólo se activa si ``PROFILER_TOKEN`` está definido.
+
+    - Por petición: cabecera ``X-Profile: cprofile|sampler`` (o ``?_profile=...``) más
+      ``X-Profile-Token``. Con ``X-Profile-Output: return`` la respuesta es el artefacto (pstats o
+      JSON de speedscope); por defecto se guarda en ``PROFILER_OUTPUT_DIR`` y su nombre se devuelve
+      en ``X-Profile-Artifact``.
+    - En segundo plano (``PROFILER_BACKGROUND_ENABLED``): pilas agregadas por endpoint, servidas en
+      ``/_profiler/stacks`` en formato collapsed (``?format=json``: muestras por endpoint;
+      ``DELETE`` las borra).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.background: Optional[BackgroundSampler] = None
+        # cProfile no admite dos perfiles activos a la vez en el mismo proceso
+        self._cprofile_lock = threading.Lock()
+
+    def setup_profiler(self):
+        if not self.app.config.get("PROFILER_TOKEN"):
+            return
+        self.app.before_request(self._before_request)
+        self.app.after_request(self._after_request)
+        self.app.teardown_request(self._teardown)
+        self.app.add_url_rule("/_profiler/stacks", "profiler_stacks", self._stacks_view, methods=["GET", "DELETE"])
+        if self.app.config.get("PROFILER_BACKGROUND_ENABLED", False):
+            # El hilo se arranca con la primera petición (tras el fork de los workers)
+            self.background = BackgroundSampler(float(self.app.config.get("PROFILER_BACKGROUND_INTERVAL", 0.01)))
+        self.app.extensions["profiler"] = self
+
+    def _authorized(self) -> bool:
+        supplied = request.headers.get("X-Profile-Token", "")
+        return hmac.compare_digest(supplied, self.app.config["PROFILER_TOKEN"])
+
+    # ------------------------------------------------------------------
+    # Perfil de una petición
+    # ------------------------------------------------------------------
+    def _before_request(self):
+        if self.background is not None and request.endpoint:
+            self.background.start()
+            self.background.track(threading.get_ident(), request.endpoint)
+
+        mode = request.headers.get("X-Profile") or request.args.get("_profile")
+        if not mode:
+            return None
+        if not self._authorized():
+            abort(403)
+        if mode not in MODES:
+            return jsonify({"message": f"Unknown profiler mode, use one of: {', '.join(MODES)}"}), 400
+
+        state = {"mode": mode, "started": time.perf_counter()}
+        if mode == "cprofile":
+            if not self._cprofile_lock.acquire(blocking=False):
+                return jsonify({"message": "Another request is being profiled, try again"}), 409
+            state["profiler"] = cProfile.Profile()
+            state["profiler"].enable()
+        else:
+            interval = float(self.app.config.get("PROFILER_SAMPLE_INTERVAL", 0.005))
+            state["sampler"] = StackSampler(threading.get_ident(), interval)
+            state["sampler"].start()
+        request.environ[ENVIRON_KEY] = state
+        return None
+
+    def _stop(self) -> Optional[dict]:
+        state = request.environ.pop(ENVIRON_KEY, None)
+        if state is None:
+            return None
+        state["elapsed"] = time.perf_counter() - state["started"]
+        if "profiler" in state:
+            state["profiler"].disable()
+            self._cprofile_lock.release()
+        if "sampler" in state:
+            state["sampler"].stop()
+        return state
+
+    def _artifact(self, state: dict) -> Tuple[bytes, str, str]:
+        name = f"{request.method} {request.path}"
+        if state["mode"] == "cprofile":
+            stats = pstats.Stats(state["profiler"])
+            # Mismo contenido que Stats.dump_stats: se abre con pstats, snakeviz, etc.
+            return marshal.dumps(stats.stats), "application/octet-stream", "prof"
+        sampler = state["sampler"]
+        document = speedscope_document(name, sampler.samples, sampler.interval)
+        return json.dumps(document).encode("utf-8"), "application/json", "speedscope.json"
+
+    def _store(self, data: bytes, extension: str) -> str:
+        directory = self.app.config.get("PROFILER_OUTPUT_DIR") or os.path.join(self.app.instance_path, "profiles")
+        os.makedirs(directory, exist_ok=True)
+        endpoint = re.sub(r"[^A-Za-z0-9_.-]", "_", request.endpoint or "unknown")
+        filename = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{endpoint}.{extension}"
+        with open(os.path.join(directory, filename), "wb") as fh:
+            fh.write(data)
+        return filename
+
+    def _after_request(self, response):
+        state = self._stop()
+        if state is None:
+            return response
+        data, mimetype, extension = self._artifact(state)
+        logger.info("Profiled %s %s (%s, %.1fms)", request.method, request.path, state["mode"], state["elapsed"] * 1000)
+        if request.headers.get("X-Profile-Output") == "return":
+            artifact = Response(data, mimetype=mimetype)
+            artifact.headers["Content-Disposition"] = f"attachment; filename=profile.{extension}"
+            artifact.headers["X-Profiled-Status"] = str(response.status_code)
+            return artifact
+        response.headers["X-Profile-Artifact"] = self._store(data, extension)
+        return response
+
+    def _teardown(self, exc):
+        # Si la vista lanzó una excepción no se llega a after_request
+        self._stop()
+        if self.background is not None:
+            self.background.untrack(threading.get_ident())
+
+    # ------------------------------------------------------------------
+    # Pilas agregadas
+    # ------------------------------------------------------------------
+    def _stacks_view(self):
+        if not self._authorized():
+            abort(403)
+        if self.background is None:
+            return jsonify({"message": "Background sampler is disabled (PROFILER_BACKGROUND_ENABLED)"}), 404
+        if request.method == "DELETE":
+            self.background.reset()
+            return "", 204
+        if request.args.get("format") == "json":
+            return jsonify(self.background.endpoints())
+        return Response(self.background.collapsed(request.args.get("endpoint")), mimetype="text/plain")
@@ -2,6 +2,22 @@
 Security helpers for application-wide concerns.
 """
 
-from .rate_limiter import check_rate_limit, reset_rate_limits
+from .rate_limiter import (
+    RateLimiter,
+    check_rate_limit,
+    client_identifier,
+    init_rate_limiter,
+    limiter,
+    rate_limit,
+    reset_rate_limits,
+)
 
-__all__ = ["check_rate_limit", "reset_rate_limits"]
+__all__ = [
+    "RateLimiter",
+    "check_rate_limit",
+    "client_identifier",
+    "init_rate_limiter",
+    "limiter",
+    "rate_limit",
+    "reset_rate_limits",
+]
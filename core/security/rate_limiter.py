@@ -1,36 +1,338 @@
+"""
+Rate limiting con algoritmos intercambiables (ventana deslizante o token bucket) y almacenes
+enchufables: memoria del proceso (shards con lock propio y expiración), un fichero SQLite
+compartido entre workers o un servidor Redis.
+
+Configuración (``Config``): ``RATE_LIMIT_BACKEND`` (``memory``/``sqlite``/``redis``),
+``RATE_LIMIT_ALGORITHM`` (``sliding_window``/``token_bucket``), ``RATE_LIMIT_SQLITE_PATH``,
+``RATE_LIMIT_REDIS_URL`` y ``RATE_LIMIT_TRUSTED_PROXIES``. Este último vale 0 por defecto (se usa
+``remote_addr``); solo debe ser n > 0 si hay exactamente n proxies propios delante de la app
+(los docker-compose de producción y la imagen de Render lo fijan a 1, igual que ``ProductionConfig``).
+"""
+
+import logging
+import math
+import os
+import sqlite3
 import threading
 import time
-from typing import Tuple
+import zlib
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from flask import current_app, jsonify, make_response, request
+
+logger = logging.getLogger(__name__)
+
+State = Tuple[float, ...]
+
+
+# ---------------------------------------------------------------------------
+# Algoritmos: funciones puras sobre una tupla de estado, iguales para todos los almacenes
+# ---------------------------------------------------------------------------
+def sliding_window(state: Optional[State], now: float, limit: int, window: float):
+    """
+    Ventana deslizante aproximada con dos contadores (ventana actual y anterior ponderada):
+    memoria constante por clave y sin la ráfaga doble del límite de ventana fija.
+    Devuelve (nuevo_estado, limitado, retry_after, ttl).
+    """
+    start = math.floor(now / window) * window
+    current = previous = 0.0
+    if state:
+        state_start, state_current, state_previous = state
+        if state_start == start:
+            current, previous = state_current, state_previous
+        elif state_start == start - window:
+            previous = state_current
+
+    elapsed = (now - start) / window
+    estimate = previous * (1 - elapsed) + current
+    if estimate + 1 > limit:
+        if current >= limit or previous <= 0:
+            retry_at = start + window
+        else:
+            # instante en que la parte ponderada de la ventana anterior deja sitio a una petición más
+            retry_at = start + window * (1 - (limit - 1 - current) / previous)
+        return (start, current, previous), True, max(1, math.ceil(retry_at - now)), 2 * window
+    return (start, current + 1, previous), False, max(1, math.ceil(start + window - now)), 2 * window
+
+
+def token_bucket(state: Optional[State], now: float, limit: int, window: float):
+    """Token bucket de capacidad ``limit`` que se rellena por completo en ``window`` segundos."""
+    rate = limit / window
+    tokens, last = state if state else (float(limit), now)
+    tokens = min(float(limit), tokens + max(0.0, now - last) * rate)
+    if tokens < 1:
+        return (tokens, now), True, max(1, math.ceil((1 - tokens) / rate)), window
+    return (tokens - 1, now), False, max(1, math.ceil((limit - tokens + 1) / rate)), window
+
+
+ALGORITHMS: Dict[str, Callable] = {"sliding_window": sliding_window, "token_bucket": token_bucket}
+
+
+def _encode(state: State) -> str:
+    return ",".join(repr(float(v)) for v in state)
+
+
+def _decode(raw) -> Optional[State]:
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode()
+    return tuple(float(v) for v in raw.split(","))
+
+
+# ---------------------------------------------------------------------------
+# Almacenes
+# ---------------------------------------------------------------------------
+class MemoryBackend:
+    """
+    Almacén en proceso repartido en ``shards`` diccionarios, cada uno con su lock: peticiones de
+    clientes distintos no compiten por el mismo lock. Las entradas caducan de forma perezosa al
+    leerlas y en un barrido periódico por shard; ``max_keys`` acota la memoria (se expulsan las más antiguas).
+    """
+
+    def __init__(self, shards: int = 16, max_keys: int = 100_000, sweep_interval: float = 30.0):
+        self._shards = [({}, threading.Lock()) for _ in range(max(1, shards))]
+        self._max_per_shard = max(1, max_keys // len(self._shards))
+        self._sweep_interval = sweep_interval
+        self._last_sweep = [0.0] * len(self._shards)
+
+    def _shard(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % len(self._shards)
+
+    def hit(self, key: str, limit: int, window: float, algorithm: Callable, now: float):
+        index = self._shard(key)
+        entries, lock = self._shards[index]
+        with lock:
+            if now - self._last_sweep[index] >= self._sweep_interval:
+                self._sweep(entries, now)
+                self._last_sweep[index] = now
+            entry = entries.pop(key, None)
+            state = entry[0] if entry and entry[1] > now else None
+            state, limited, retry_after, ttl = algorithm(state, now, limit, window)
+            entries[key] = (state, now + ttl)
+            while len(entries) > self._max_per_shard:
+                entries.pop(next(iter(entries)))
+        return limited, retry_after
+
+    @staticmethod
+    def _sweep(entries: dict, now: float) -> None:
+        for key in [k for k, (_, expires_at) in entries.items() if expires_at <= now]:
+            del entries[key]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries, _ in self._shards)
+
+    def clear(self) -> None:
+        for entries, lock in self._shards:
+            with lock:
+                entries.clear()
+
+
+class SQLiteBackend:
+    """Estado compartido entre procesos en un fichero SQLite (modo WAL, una conexión por hilo)."""
+
+    def __init__(self, path: str, sweep_interval: float = 60.0):
+        self.path = path
+        self._sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit "
+            "(key TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: float, algorithm: Callable, now: float):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now - self._last_sweep >= self._sweep_interval:
+                conn.execute("DELETE FROM rate_limit WHERE expires_at <= ?", (now,))
+                self._last_sweep = now
+            row = conn.execute("SELECT state, expires_at FROM rate_limit WHERE key = ?", (key,)).fetchone()
+            state = _decode(row[0]) if row and row[1] > now else None
+            state, limited, retry_after, ttl = algorithm(state, now, limit, window)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit (key, state, expires_at) VALUES (?, ?, ?)",
+                (key, _encode(state), now + ttl),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return limited, retry_after
 
-_lock = threading.Lock()
-_store: dict[str, dict[str, float | int]] = {}
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM rate_limit")
+
+
+class RedisBackend:
+    """
+    Estado en Redis: lectura-modificación-escritura optimista con WATCH/MULTI y caducidad con PX,
+    así que Redis expira solo las claves abandonadas. ``client`` es un ``redis.Redis`` (o un sustituto).
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:", max_retries: int = 10):
+        self.client = client
+        self.prefix = prefix
+        self.max_retries = max_retries
+
+    def hit(self, key: str, limit: int, window: float, algorithm: Callable, now: float):
+        from redis.exceptions import WatchError
+
+        redis_key = self.prefix + key
+        for _ in range(self.max_retries):
+            with self.client.pipeline() as pipe:
+                try:
+                    pipe.watch(redis_key)
+                    state = _decode(pipe.get(redis_key))
+                    state, limited, retry_after, ttl = algorithm(state, now, limit, window)
+                    pipe.multi()
+                    pipe.set(redis_key, _encode(state), px=max(1, int(ttl * 1000)))
+                    pipe.execute()
+                    return limited, retry_after
+                except WatchError:
+                    continue
+        logger.warning("Rate limit state for %s kept changing; letting the request through", key)
+        return False, 1
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+# ---------------------------------------------------------------------------
+# Limitador
+# ---------------------------------------------------------------------------
+class RateLimiter:
+    def __init__(self, backend=None, algorithm: str = "sliding_window"):
+        self.backend = backend or MemoryBackend()
+        self.algorithm = algorithm
+
+    def hit(
+        self, scope: str, identifier: str, limit: int, window_seconds: float, algorithm: Optional[str] = None
+    ) -> Tuple[bool, int]:
+        """Registra una petición y devuelve (limitado, retry_after_segundos)."""
+        if limit <= 0:
+            return False, 0
+        if window_seconds <= 0:
+            window_seconds = 60
+        key = f"{scope}:{identifier or 'unknown'}"
+        step = ALGORITHMS[algorithm or self.algorithm]
+        try:
+            return self.backend.hit(key, limit, float(window_seconds), step, time.time())
+        except Exception:
+            # Un almacén compartido caído no debe tumbar el login ni las descargas
+            logger.exception("Rate limit backend %s failed", type(self.backend).__name__)
+            return False, 0
+
+    def reset(self) -> None:
+        self.backend.clear()
+
+
+def create_backend(name: str, config: Optional[dict] = None):
+    config = config or {}
+    name = (name or "memory").lower()
+    if name == "sqlite":
+        return SQLiteBackend(config.get("RATE_LIMIT_SQLITE_PATH") or os.path.join("instance", "rate_limit.sqlite3"))
+    if name == "redis":
+        import redis
+
+        return RedisBackend(redis.Redis.from_url(config.get("RATE_LIMIT_REDIS_URL") or "redis://localhost:6379/0"))
+    if name != "memory":
+        logger.warning("Unknown RATE_LIMIT_BACKEND %r, using the in-process store", name)
+    return MemoryBackend(
+        shards=int(config.get("RATE_LIMIT_SHARDS", 16)), max_keys=int(config.get("RATE_LIMIT_MAX_KEYS", 100_000))
+    )
+
+
+limiter = RateLimiter()
+
+
+def init_rate_limiter(app) -> RateLimiter:
+    """Configura el limitador global a partir de la configuración de la app."""
+    limiter.backend = create_backend(app.config.get("RATE_LIMIT_BACKEND", "memory"), app.config)
+    limiter.algorithm = app.config.get("RATE_LIMIT_ALGORITHM", "sliding_window")
+    return limiter
 
 
 def check_rate_limit(scope: str, identifier: str, limit: int, window_seconds: int) -> Tuple[bool, int]:
     """
     Returns tuple (limited, retry_after_seconds).
     """
-    if limit <= 0:
-        return False, 0
-    if window_seconds <= 0:
-        window_seconds = 60
-    identifier = identifier or "unknown"
-    key = f"{scope}:{identifier}"
-    now = time.time()
-    with _lock:
-        record = _store.get(key)
-        if not record or record["expires_at"] <= now:
-            _store[key] = {"count": 1, "expires_at": now + window_seconds}
-            return False, window_seconds
-        if record["count"] >= limit:
-            retry_after = max(1, int(record["expires_at"] - now))
-            return True, retry_after
-        record["count"] += 1
-        retry_after = max(1, int(record["expires_at"] - now))
-        _store[key] = record
-    return False, retry_after
+    return limiter.hit(scope, identifier, limit, window_seconds)
 
 
 def reset_rate_limits():
-    with _lock:
-        _store.clear()
+    limiter.reset()
+
+
+def client_identifier() -> str:
+    """
+    IP del cliente. Por defecto ``remote_addr``: sin proxies de confianza X-Forwarded-For lo controla
+    el cliente y permitiría saltarse el límite. Con ``RATE_LIMIT_TRUSTED_PROXIES = n`` se toma la
+    entrada n-ésima por la derecha (la que añadió nuestro proxy), no la primera, que se puede falsear.
+    """
+    trusted = current_app.config.get("RATE_LIMIT_TRUSTED_PROXIES", 0)
+    forwarded = [part.strip() for part in request.headers.get("X-Forwarded-For", "").split(",") if part.strip()]
+    if trusted > 0 and forwarded:
+        return forwarded[-min(trusted, len(forwarded))]
+    return request.remote_addr or "unknown"
+
+
+def _config_value(value, default):
+    if isinstance(value, str):
+        return current_app.config.get(value, default)
+    if callable(value):
+        return value()
+    return value
+
+
+def rate_limit(
+    scope: Optional[str] = None,
+    limit: Union[int, str, Callable] = "RATE_LIMIT_DEFAULT",
+    window: Union[int, str, Callable] = "RATE_LIMIT_WINDOW",
+    methods: Optional[Tuple[str, ...]] = None,
+    key_func: Callable[[], str] = client_identifier,
+    algorithm: Optional[str] = None,
+):
+    """
+    Decorador de rutas. ``limit``/``window`` pueden ser enteros, claves de ``app.config`` o callables;
+    ``methods`` limita solo esos métodos HTTP. Al superar el límite responde 429 con ``Retry-After``.
+    """
+
+    def decorator(view):
+        name = scope or view.__name__
+
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if current_app.config.get("RATE_LIMIT_ENABLED", True) and (methods is None or request.method in methods):
+                max_requests = int(_config_value(limit, 60))
+                window_seconds = float(_config_value(window, 60))
+                limited, retry_after = limiter.hit(name, key_func(), max_requests, window_seconds, algorithm)
+                if limited:
+                    logger.warning("Rate limit exceeded for %s from %s", name, key_func())
+                    if request.is_json or request.accept_mimetypes.best == "application/json":
+                        response = jsonify({"message": "Too many requests. Please wait and try again."})
+                    else:
+                        response = make_response("Too many requests. Please wait and try again.")
+                    response.status_code = 429
+                    response.headers["Retry-After"] = str(retry_after)
+                    return response
+            return view(*args, **kwargs)
+
+        return wrapped
+
+    return decorator
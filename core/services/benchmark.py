@@ -0,0 +1,391 @@
+"""
+Benchmark en proceso de los endpoints más usados: siembra un catálogo sintético en SQLite, lanza
+peticiones con el cliente de pruebas de Flask y mide latencia (p50/p95) y consultas SQL por
+petición. Los resultados se comparan con una línea base guardada para detectar regresiones.
+
+Lo usa ``rosemary bench``.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from flask import request_finished
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench1234"
+COMMUNITIES = ("laliga", "premier", "seriea", "bundesliga", "ligue1", "mls")
+WORDS = ("players", "season", "transfers", "ratings", "clubs", "youth", "scouting", "wages", "goals", "market")
+# Una regresión de latencia tiene que superar también este margen absoluto (ruido del reloj)
+MIN_REGRESSION_MS = 1.0
+
+
+@dataclass(frozen=True)
+class CatalogSize:
+    datasets: int = 200
+    authors: int = 3
+    columns: int = 16
+    users: int = 20
+    follows: int = 5
+    # Fracción de datasets tabulares; el resto son UVL
+    tabular_ratio: float = 0.5
+    csv_rows: int = 200
+
+
+@dataclass
+class Catalog:
+    """Lo que necesitan los escenarios para construir sus peticiones."""
+
+    size: CatalogSize
+    dataset_ids: List[int]
+    tabular_ids: List[int]
+    dois: List[str]
+
+
+def seed_catalog(db, size: CatalogSize, seed: int = 0) -> Catalog:
+    """
+    Crea el catálogo con inserciones masivas (sin ORM): usuarios con perfil, datasets con
+    metadatos, autores y etiquetas de comunidad, esquema tabular y seguimientos de autores y
+    comunidades. Escribe además un fichero pequeño por dataset bajo ``WORKING_DIR``/``UPLOADS_DIR``.
+    La base de datos debe estar vacía.
+    """
+    from werkzeug.security import generate_password_hash
+
+    from app.modules.auth.models import User, UserFollowAuthor, UserFollowCommunity
+    from app.modules.dataset.models import Author, BaseDataset, DSMetaData, PublicationType
+    from app.modules.profile.models import UserProfile
+    from app.modules.tabular.models import TabularColumn, TabularMetaData
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password = generate_password_hash(BENCH_PASSWORD)
+    users = max(1, size.users)
+
+    db.session.execute(
+        User.__table__.insert(),
+        [
+            {
+                "id": i,
+                "email": BENCH_EMAIL if i == 1 else f"user{i}@bench.local",
+                "password": password,
+                "created_at": now,
+            }
+            for i in range(1, users + 1)
+        ],
+    )
+    db.session.execute(
+        UserProfile.__table__.insert(),
+        [{"id": i, "user_id": i, "name": f"User{i}", "surname": "Bench"} for i in range(1, users + 1)],
+    )
+
+    metadata, datasets, authors, tabular_metas, columns = [], [], [], [], []
+    dataset_ids, tabular_ids, dois = [], [], []
+    publication_types = list(PublicationType)
+    author_id = column_id = 0
+    for i in range(1, size.datasets + 1):
+        tabular = rng.random() < size.tabular_ratio
+        doi = f"10.1234/bench.{i}"
+        tags = rng.sample(WORDS, 3) + [f"community:{rng.choice(COMMUNITIES)}"]
+        metadata.append(
+            {
+                "id": i,
+                "title": f"{' '.join(rng.sample(WORDS, 2)).title()} {i}",
+                "description": " ".join(rng.choices(WORDS, k=12)),
+                "publication_type": rng.choice(publication_types).name,
+                "dataset_doi": doi,
+                "tags": ",".join(tags),
+            }
+        )
+        datasets.append(
+            {
+                "id": i,
+                "user_id": rng.randint(1, users),
+                "ds_meta_data_id": i,
+                "created_at": now - timedelta(minutes=size.datasets - i),
+                "type": "tabular" if tabular else "uvl",
+                "view_count": rng.randint(0, 500),
+                "download_count": rng.randint(0, 200),
+                "revision": 0,
+                "rows_count": size.csv_rows if tabular else None,
+            }
+        )
+        for _ in range(size.authors):
+            author_id += 1
+            authors.append(
+                {
+                    "id": author_id,
+                    "name": f"Author {rng.randint(1, max(1, size.datasets // 2))}",
+                    "affiliation": rng.choice(COMMUNITIES),
+                    "ds_meta_data_id": i,
+                }
+            )
+        if tabular:
+            tabular_metas.append(
+                {
+                    "id": i,
+                    "dataset_id": i,
+                    "delimiter": ",",
+                    "encoding": "utf-8",
+                    "has_header": True,
+                    "n_rows": size.csv_rows,
+                    "n_cols": size.columns,
+                }
+            )
+            for c in range(size.columns):
+                column_id += 1
+                columns.append(
+                    {
+                        "id": column_id,
+                        "meta_id": i,
+                        "name": f"col_{c}",
+                        "dtype": rng.choice(("int", "float", "string")),
+                        "null_count": rng.randint(0, 10),
+                        "unique_count": rng.randint(1, size.csv_rows),
+                    }
+                )
+            tabular_ids.append(i)
+        dataset_ids.append(i)
+        dois.append(doi)
+
+    for table, rows in (
+        (DSMetaData.__table__, metadata),
+        (BaseDataset.__table__, datasets),
+        (Author.__table__, authors),
+        (TabularMetaData.__table__, tabular_metas),
+        (TabularColumn.__table__, columns),
+    ):
+        if rows:
+            db.session.execute(table.insert(), rows)
+
+    follows_authors, follows_communities = [], []
+    for user_id in range(1, users + 1):
+        for followed in rng.sample(range(1, author_id + 1), min(size.follows, author_id)):
+            follows_authors.append({"user_id": user_id, "author_id": followed, "created_at": now})
+        for community in rng.sample(COMMUNITIES, min(size.follows, len(COMMUNITIES))):
+            follows_communities.append({"user_id": user_id, "community_id": community, "created_at": now})
+    if follows_authors:
+        db.session.execute(UserFollowAuthor.__table__.insert(), follows_authors)
+    if follows_communities:
+        db.session.execute(UserFollowCommunity.__table__.insert(), follows_communities)
+    db.session.commit()
+
+    _seed_files(datasets)
+    return Catalog(size=size, dataset_ids=dataset_ids, tabular_ids=tabular_ids, dois=dois)
+
+
+def _seed_files(datasets: List[dict]) -> None:
+    """Un fichero pequeño por dataset en su carpeta (la que empaqueta la descarga en zip)."""
+    from app.modules.hubfile.storage import dataset_file_path
+
+    csv_body = fifa_csv(10)
+    for dataset in datasets:
+        tabular = dataset["type"] == "tabular"
+        path = dataset_file_path(dataset["user_id"], dataset["id"], "data.csv" if tabular else "model.uvl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(csv_body if tabular else f"features\n    Bench{dataset['id']}\n".encode("utf-8"))
+
+
+def fifa_csv(rows: int) -> bytes:
+    """CSV con el esquema FIFA que exige la subida tabular."""
+    from app.modules.tabular.forms import FIFA_REQUIRED_COLUMNS
+
+    lines = [",".join(FIFA_REQUIRED_COLUMNS)]
+    for i in range(rows):
+        lines.append(
+            f"{i},Player {i},{18 + i % 20},Spain,{60 + i % 35},{65 + i % 30},Club {i % 20},"
+            f"{1000000 + i},{10000 + i},Right,{1 + i % 5},{1 + i % 5},ST,{170 + i % 25},{65 + i % 20},Player"
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+@dataclass
+class Scenario:
+    """``call(client, catalog, iteration)`` hace una petición y devuelve la respuesta."""
+
+    name: str
+    call: Callable
+    authenticated: bool = False
+    # Códigos aceptados; cualquier otro cuenta como error
+    expected: tuple = (200,)
+
+
+def _pick(values: List, iteration: int):
+    return values[iteration % len(values)]
+
+
+def _tabular_upload(client, catalog: Catalog, iteration: int):
+    data = {
+        "name": f"Bench upload {iteration}-{time.perf_counter_ns()}",
+        "delimiter": ",",
+        "encoding": "utf-8",
+        "has_header": "y",
+        "sample_rows": "20",
+        "csv_file": (io.BytesIO(fifa_csv(catalog.size.csv_rows)), "bench.csv"),
+    }
+    return client.post("/tabular/upload", data=data, content_type="multipart/form-data")
+
+
+def default_scenarios() -> List[Scenario]:
+    return [
+        Scenario("homepage", lambda client, catalog, i: client.get("/")),
+        Scenario("explore_page", lambda client, catalog, i: client.get(f"/explore?q={_pick(WORDS, i)}")),
+        Scenario(
+            "explore_search",
+            lambda client, catalog, i: client.post(
+                "/explore", json={"query": _pick(WORDS, i), "sorting": "newest", "publication_type": "any"}
+            ),
+        ),
+        Scenario("doi_page", lambda client, catalog, i: client.get(f"/doi/{_pick(catalog.dois, i)}/")),
+        Scenario(
+            "download", lambda client, catalog, i: client.get(f"/dataset/download/{_pick(catalog.dataset_ids, i)}")
+        ),
+        Scenario("trending", lambda client, catalog, i: client.get("/datasets/trending")),
+        Scenario(
+            "recommendations",
+            lambda client, catalog, i: client.get(f"/tabular/{_pick(catalog.tabular_ids or catalog.dataset_ids, i)}"),
+            authenticated=True,
+        ),
+        Scenario("tabular_ingest", _tabular_upload, authenticated=True, expected=(302,)),
+    ]
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """Percentil por rango más cercano (sin interpolar): siempre es una muestra real."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    queries: List[int] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def p50_ms(self) -> float:
+        return round(percentile(self.latencies_ms, 50), 3)
+
+    @property
+    def p95_ms(self) -> float:
+        return round(percentile(self.latencies_ms, 95), 3)
+
+    @property
+    def median_queries(self) -> int:
+        return int(percentile(self.queries, 50))
+
+    def summary(self) -> dict:
+        return {
+            "p50_ms": self.p50_ms,
+            "p95_ms": self.p95_ms,
+            "queries": self.median_queries,
+            "max_queries": max(self.queries, default=0),
+            "samples": len(self.latencies_ms),
+            "errors": self.errors,
+        }
+
+
+def _login(client) -> None:
+    response = client.post("/login", data={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f"Benchmark user could not log in (status {response.status_code})")
+
+
+def run_benchmarks(
+    app, catalog: Catalog, scenarios: List[Scenario], iterations: int = 50, warmup: int = 5
+) -> List[ScenarioResult]:
+    """
+    Ejecuta cada escenario ``warmup`` veces sin medir y ``iterations`` veces midiendo. Las consultas
+    se cuentan con la instrumentación de peticiones (``INSTRUMENTATION_ENABLED``).
+    """
+    from core.managers.instrumentation_manager import current_metrics
+
+    counted: List[int] = []
+
+    def _count(sender, response, **extra):
+        metrics = current_metrics()
+        counted.append(metrics.query_count if metrics is not None else 0)
+
+    anonymous = app.test_client()
+    authenticated = app.test_client()
+    _login(authenticated)
+
+    results = []
+    request_finished.connect(_count, app)
+    try:
+        for scenario in scenarios:
+            client = authenticated if scenario.authenticated else anonymous
+            result = ScenarioResult(scenario.name)
+            for i in range(warmup + iterations):
+                counted.clear()
+                started = time.perf_counter()
+                response = scenario.call(client, catalog, i)
+                response.get_data()
+                elapsed = (time.perf_counter() - started) * 1000
+                response.close()
+                if i < warmup:
+                    continue
+                if response.status_code not in scenario.expected:
+                    result.errors += 1
+                result.latencies_ms.append(elapsed)
+                result.queries.append(sum(counted))
+            results.append(result)
+    finally:
+        request_finished.disconnect(_count, app)
+    return results
+
+
+def report(results: List[ScenarioResult], size: CatalogSize, iterations: int) -> dict:
+    """Documento JSON de resultados; es también el formato de la línea base."""
+    return {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "catalog": asdict(size),
+        "iterations": iterations,
+        "scenarios": {result.name: result.summary() for result in results},
+    }
+
+
+@dataclass
+class Regression:
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.scenario}: {self.metric} {self.baseline} -> {self.current}"
+
+
+def compare(
+    current: dict, baseline: dict, tolerance: Optional[float] = 0.25, query_tolerance: int = 0
+) -> List[Regression]:
+    """
+    Regresiones de ``current`` frente a ``baseline`` (ambos con el formato de ``report``): p95 más
+    de ``tolerance`` (relativo) por encima y consultas por petición más de ``query_tolerance`` por
+    encima. Los escenarios sin línea base se ignoran; los que dan errores siempre son regresión.
+    Con ``tolerance=None`` no se compara la latencia (p. ej. en runners compartidos de CI).
+    """
+    regressions = []
+    for name, now in current["scenarios"].items():
+        before: Optional[Dict] = baseline.get("scenarios", {}).get(name)
+        if now["errors"]:
+            regressions.append(Regression(name, "errors", before["errors"] if before else 0, now["errors"]))
+        if before is None:
+            continue
+        if tolerance is not None:
+            limit = before["p95_ms"] * (1 + tolerance)
+            if now["p95_ms"] > limit and now["p95_ms"] - before["p95_ms"] >= MIN_REGRESSION_MS:
+                regressions.append(Regression(name, "p95_ms", before["p95_ms"], now["p95_ms"]))
+        if now["queries"] > before["queries"] + query_tolerance:
+            regressions.append(Regression(name, "queries", before["queries"], now["queries"]))
+    return regressions
@@ -1,6 +1,8 @@
 import logging
 import smtplib
 import ssl
+import threading
+import time
 from email.message import EmailMessage
 from html import unescape
 from typing import Iterable, List, Optional
@@ -10,9 +12,20 @@ from flask import current_app
 logger = logging.getLogger(__name__)
 
 
+# Errores tras los que merece la pena reconectar y reenviar: el servidor cerró una conexión reutilizada
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
 class EmailService:
+    """
+    Envío de correo por SMTP. Cada hilo mantiene abierta su conexión (STARTTLS y login una sola vez)
+    y la reutiliza entre mensajes; se renueva al cambiar la configuración, tras
+    ``MAIL_CONNECTION_IDLE_TIMEOUT`` segundos sin uso o ``MAIL_MAX_MESSAGES_PER_CONNECTION`` mensajes.
+    """
+
     def __init__(self) -> None:
         self.logger = logger
+        self._local = threading.local()
 
     def send_email(
         self,
@@ -43,29 +56,74 @@ class EmailService:
             self.logger.exception("Failed to send email to %s", recipients)
 
     def _deliver(self, msg: EmailMessage) -> None:
-        server = current_app.config.get("MAIL_SERVER")
-        port = current_app.config.get("MAIL_PORT")
-        username = current_app.config.get("MAIL_USERNAME")
-        password = current_app.config.get("MAIL_PASSWORD")
-        use_tls = current_app.config.get("MAIL_USE_TLS", True)
-        use_ssl = current_app.config.get("MAIL_USE_SSL", False)
-
-        if not server or not port:
+        settings = self._settings()
+        if not settings[0] or not settings[1]:
             self.logger.warning("Mail server configuration missing; skipping email delivery.")
             return
 
-        if use_ssl:
-            context = ssl.create_default_context()
-            with smtplib.SMTP_SSL(server, port, context=context) as smtp:
-                self._login_if_needed(smtp, username, password)
+        for attempt in (1, 2):
+            smtp = self._connection(settings)
+            try:
                 smtp.send_message(msg)
+            except _RECONNECT_ERRORS:
+                self.close()
+                if attempt == 2:
+                    raise
+                continue
+            self._local.sent += 1
+            self._local.last_used = time.monotonic()
+            if self._local.sent >= current_app.config.get("MAIL_MAX_MESSAGES_PER_CONNECTION", 100):
+                self.close()
             return
 
-        with smtplib.SMTP(server, port) as smtp:
+    @staticmethod
+    def _settings() -> tuple:
+        config = current_app.config
+        return (
+            config.get("MAIL_SERVER"),
+            config.get("MAIL_PORT"),
+            config.get("MAIL_USERNAME"),
+            config.get("MAIL_PASSWORD"),
+            config.get("MAIL_USE_TLS", True),
+            config.get("MAIL_USE_SSL", False),
+        )
+
+    def _connection(self, settings: tuple) -> smtplib.SMTP:
+        smtp = getattr(self._local, "smtp", None)
+        idle_timeout = current_app.config.get("MAIL_CONNECTION_IDLE_TIMEOUT", 30)
+        if smtp is not None and (
+            self._local.settings != settings or time.monotonic() - self._local.last_used > idle_timeout
+        ):
+            self.close()
+            smtp = None
+        if smtp is None:
+            smtp = self._open(*settings)
+            self._local.smtp = smtp
+            self._local.settings = settings
+            self._local.sent = 0
+            self._local.last_used = time.monotonic()
+        return smtp
+
+    def _open(self, server, port, username, password, use_tls, use_ssl) -> smtplib.SMTP:
+        if use_ssl:
+            smtp = smtplib.SMTP_SSL(server, port, context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(server, port)
             if use_tls:
                 smtp.starttls(context=ssl.create_default_context())
-            self._login_if_needed(smtp, username, password)
-            smtp.send_message(msg)
+        self._login_if_needed(smtp, username, password)
+        return smtp
+
+    def close(self) -> None:
+        """Cierra la conexión SMTP del hilo actual (si la hay)."""
+        smtp = getattr(self._local, "smtp", None)
+        self._local.smtp = None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
 
     @staticmethod
     def _login_if_needed(smtp: smtplib.SMTP, username: Optional[str], password: Optional[str]) -> None:
@@ -2,20 +2,26 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import hmac
 import os
 
 from cryptography.fernet import Fernet, InvalidToken
 
 _fernet_instance: Fernet | None = None
+_hmac_key: bytes | None = None
 
 
-def _build_key() -> bytes:
+def _key_source() -> str:
     key_source = os.getenv("TWO_FACTOR_ENCRYPTION_KEY") or os.getenv("SECRET_KEY")
     if not key_source:
         raise RuntimeError("TWO_FACTOR_ENCRYPTION_KEY or SECRET_KEY must be defined")
     if isinstance(key_source, bytes):
         key_source = key_source.decode()
-    digest = hashlib.sha256(key_source.encode()).digest()
+    return key_source
+
+
+def _build_key() -> bytes:
+    digest = hashlib.sha256(_key_source().encode()).digest()
     return base64.urlsafe_b64encode(digest)
 
 
@@ -34,4 +40,15 @@ def decrypt_text(token: str) -> str:
     return _fernet().decrypt(token.encode()).decode()
 
 
-__all__ = ["encrypt_text", "decrypt_text", "InvalidToken"]
+def keyed_hash(value: str) -> str:
+    """
+    HMAC-SHA256 (hex) de ``value`` con una clave derivada de la de cifrado pero distinta de ella.
+    Permite buscar secretos cortos por igualdad en la base de datos sin descifrarlos.
+    """
+    global _hmac_key
+    if _hmac_key is None:
+        _hmac_key = hmac.new(_key_source().encode(), b"fifahub-lookup-hash", hashlib.sha256).digest()
+    return hmac.new(_hmac_key, value.encode(), hashlib.sha256).hexdigest()
+
+
+__all__ = ["encrypt_text", "decrypt_text", "keyed_hash", "InvalidToken"]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Optional
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DIGEST_INDEX_DIRNAME = ".digests"
+
+
+@dataclass(frozen=True, slots=True)
+class FileDigest:
+    """MD5/SHA-256 digests and size of a file, computed in a single pass."""
+
+    md5: str
+    sha256: str
+    size: int
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileDigest":
+        return cls(md5=data["md5"], sha256=data["sha256"], size=int(data["size"]))
+
+
+class StreamingHasher:
+    """Accumulates MD5, SHA-256 and size over chunks fed with ``update``."""
+
+    def __init__(self) -> None:
+        self._md5 = hashlib.md5()
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+
+    def update(self, chunk: bytes) -> None:
+        self._md5.update(chunk)
+        self._sha256.update(chunk)
+        self._size += len(chunk)
+
+    def digest(self) -> FileDigest:
+        return FileDigest(md5=self._md5.hexdigest(), sha256=self._sha256.hexdigest(), size=self._size)
+
+
+def digest_stream(
+    stream: BinaryIO, sink: Optional[BinaryIO] = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> FileDigest:
+    """Read ``stream`` in fixed-size chunks, hashing each chunk and optionally copying it to ``sink``."""
+    hasher = StreamingHasher()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return hasher.digest()
+
+
+def digest_file(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> FileDigest:
+    """Hash a file already on disk without loading it into memory."""
+    with open(file_path, "rb") as fh:
+        return digest_stream(fh, chunk_size=chunk_size)
+
+
+def save_stream(stream: BinaryIO, dest_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> FileDigest:
+    """
+    Write ``stream`` to ``dest_path`` while hashing it, so the upload is read exactly once.
+    Accepts a werkzeug ``FileStorage`` or any binary file-like object.
+    """
+    source = getattr(stream, "stream", stream)
+    try:
+        source.seek(0)
+    except (AttributeError, OSError):
+        pass
+    with open(dest_path, "wb") as sink:
+        return digest_stream(source, sink=sink, chunk_size=chunk_size)
+
+
+class DigestIndex:
+    """
+    Digests computed while streaming temporary uploads, kept next to them so they can be attached
+    to the ``Hubfile`` rows created later. One sidecar file per upload
+    (``<folder>/.digests/<filename>.json``) written atomically: parallel uploads never rewrite a
+    shared file and a reader never sees a partial one.
+    """
+
+    def __init__(self, folder: str) -> None:
+        self.folder = os.path.join(folder, DIGEST_INDEX_DIRNAME)
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.folder, os.path.basename(filename) + ".json")
+
+    def put(self, filename: str, digest: FileDigest) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(digest.to_dict(), fh)
+            os.replace(tmp_path, self._path(filename))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def get(self, filename: str) -> Optional[FileDigest]:
+        try:
+            with open(self._path(filename), "r", encoding="utf-8") as fh:
+                return FileDigest.from_dict(json.load(fh))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def discard(self, filename: str) -> None:
+        try:
+            os.remove(self._path(filename))
+        except FileNotFoundError:
+            pass
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "DigestIndex",
+    "FileDigest",
+    "StreamingHasher",
+    "digest_file",
+    "digest_stream",
+    "save_stream",
+]
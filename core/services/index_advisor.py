@@ -0,0 +1,282 @@
+"""
+Asesor de índices: ejecuta bajo EXPLAIN las consultas más frecuentes de la aplicación, detecta
+recorridos completos de tabla y propone (o crea) los índices que los evitan.
+
+Soporta SQLite (``EXPLAIN QUERY PLAN``) y MySQL/MariaDB (``EXPLAIN``). Lo usan
+``rosemary db:index-advisor`` y ``rosemary db:add-dataset-indexes``.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Engine
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    table: str
+    columns: Tuple[str, ...]
+    name: Optional[str] = None
+
+    @property
+    def index_name(self) -> str:
+        return self.name or f"ix_{self.table}_{'_'.join(self.columns)}"
+
+
+@dataclass
+class RepresentativeQuery:
+    """Consulta de un camino caliente y los índices que debería aprovechar."""
+
+    name: str
+    build: Callable[[], sa.sql.Select]
+    indexes: Tuple[IndexSpec, ...] = ()
+
+
+@dataclass
+class QueryReport:
+    query: RepresentativeQuery
+    plan: List[str]
+    full_scans: List[str]
+    missing: List[IndexSpec] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def representative_queries() -> List[RepresentativeQuery]:
+    """Consultas que se ejecutan en cada vista de dataset, descarga, resolución de DOI o exploración."""
+    from app.modules.dataset.models import Author, BaseDataset, DOIMapping, DSMetaData, DSViewRecord
+    from app.modules.featuremodel.models import FeatureModel
+    from app.modules.hubfile.models import Hubfile, HubfileDownloadRecord, HubfileViewRecord
+    from app.modules.tabular.models import TabularColumn
+
+    doi = "10.1234/fifahub.1"
+    cookie = "00000000-0000-0000-0000-000000000000"
+    return [
+        RepresentativeQuery(
+            "doi_lookup",
+            lambda: sa.select(DSMetaData).where(DSMetaData.dataset_doi == doi).limit(1),
+            (IndexSpec("ds_meta_data", ("dataset_doi",)),),
+        ),
+        RepresentativeQuery(
+            "doi_mapping",
+            lambda: sa.select(DOIMapping).where(DOIMapping.dataset_doi_old == doi).limit(1),
+            # Cubre la consulta: el DOI nuevo sale del propio índice
+            (IndexSpec("doi_mapping", ("dataset_doi_old", "dataset_doi_new")),),
+        ),
+        RepresentativeQuery(
+            "synchronized_datasets",
+            lambda: sa.select(BaseDataset)
+            .join(DSMetaData, BaseDataset.ds_meta_data_id == DSMetaData.id)
+            .where(BaseDataset.user_id == 1, DSMetaData.dataset_doi.isnot(None))
+            .order_by(BaseDataset.created_at.desc()),
+            (IndexSpec("data_set", ("user_id", "created_at")),),
+        ),
+        RepresentativeQuery(
+            "dataset_view_record",
+            lambda: sa.select(DSViewRecord)
+            .where(DSViewRecord.dataset_id == 1, DSViewRecord.view_cookie == cookie, DSViewRecord.user_id.is_(None))
+            .limit(1),
+            (IndexSpec("ds_view_record", ("dataset_id", "view_cookie", "user_id")),),
+        ),
+        RepresentativeQuery(
+            "file_view_record",
+            lambda: sa.select(HubfileViewRecord)
+            .where(
+                HubfileViewRecord.file_id == 1,
+                HubfileViewRecord.view_cookie == cookie,
+                HubfileViewRecord.user_id.is_(None),
+            )
+            .limit(1),
+            (IndexSpec("file_view_record", ("file_id", "view_cookie", "user_id")),),
+        ),
+        RepresentativeQuery(
+            "file_download_record",
+            lambda: sa.select(HubfileDownloadRecord)
+            .where(
+                HubfileDownloadRecord.file_id == 1,
+                HubfileDownloadRecord.download_cookie == cookie,
+                HubfileDownloadRecord.user_id.is_(None),
+            )
+            .limit(1),
+            (IndexSpec("file_download_record", ("file_id", "download_cookie", "user_id")),),
+        ),
+        RepresentativeQuery(
+            "dataset_feature_models",
+            lambda: sa.select(FeatureModel).where(FeatureModel.data_set_id == 1),
+            (IndexSpec("feature_model", ("data_set_id",)),),
+        ),
+        RepresentativeQuery(
+            "feature_model_files",
+            lambda: sa.select(Hubfile).where(Hubfile.feature_model_id == 1),
+            (IndexSpec("file", ("feature_model_id",)),),
+        ),
+        RepresentativeQuery(
+            "dataset_authors",
+            lambda: sa.select(Author).where(Author.ds_meta_data_id == 1),
+            (IndexSpec("author", ("ds_meta_data_id",)),),
+        ),
+        RepresentativeQuery(
+            "tabular_columns",
+            lambda: sa.select(TabularColumn).where(TabularColumn.meta_id == 1),
+            (IndexSpec("tabular_column", ("meta_id",)),),
+        ),
+        RepresentativeQuery(
+            "most_viewed",
+            lambda: sa.select(BaseDataset).order_by(BaseDataset.view_count.desc()).limit(10),
+            (IndexSpec("data_set", ("view_count",)),),
+        ),
+        RepresentativeQuery(
+            "most_downloaded",
+            lambda: sa.select(BaseDataset).order_by(BaseDataset.download_count.desc()).limit(10),
+            (IndexSpec("data_set", ("download_count",)),),
+        ),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# EXPLAIN
+# ---------------------------------------------------------------------------
+def _compile(engine: Engine, statement) -> str:
+    return str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _sqlite_full_scan(line: str) -> Optional[str]:
+    """``SCAN [TABLE] t`` es un recorrido completo; ``SCAN t USING [COVERING] INDEX ix`` recorre un índice."""
+    words = line.split()
+    if not words or words[0] != "SCAN" or "USING" in words:
+        return None
+    return words[2] if len(words) > 2 and words[1] == "TABLE" else words[1]
+
+
+def explain(engine: Engine, statement) -> Tuple[List[str], List[str]]:
+    """Devuelve (líneas del plan, tablas recorridas por completo)."""
+    sql = _compile(engine, statement)
+    dialect = engine.dialect.name
+    with engine.connect() as conn:
+        if dialect == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+            plan = [row[-1] for row in rows]
+            return plan, [table for table in map(_sqlite_full_scan, plan) if table]
+        if dialect in ("mysql", "mariadb"):
+            rows = conn.exec_driver_sql(f"EXPLAIN {sql}").mappings().fetchall()
+            plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+            return plan, [row["table"] for row in rows if row["type"] == "ALL"]
+    raise ValueError(f"Unsupported database dialect for EXPLAIN: {dialect}")
+
+
+def _existing_indexes(engine: Engine, table: str) -> List[Tuple[str, ...]]:
+    inspector = sa.inspect(engine)
+    indexes = [tuple(ix["column_names"]) for ix in inspector.get_indexes(table)]
+    for constraint in inspector.get_unique_constraints(table):
+        indexes.append(tuple(constraint["column_names"]))
+    primary = inspector.get_pk_constraint(table).get("constrained_columns") or []
+    if primary:
+        indexes.append(tuple(primary))
+    return indexes
+
+
+def is_covered(engine: Engine, spec: IndexSpec) -> bool:
+    """Hay un índice existente cuyas primeras columnas son las de ``spec``."""
+    return any(existing[: len(spec.columns)] == spec.columns for existing in _existing_indexes(engine, spec.table))
+
+
+def missing_indexes(engine: Engine, specs: Iterable[IndexSpec]) -> List[IndexSpec]:
+    tables = set(sa.inspect(engine).get_table_names())
+    missing = []
+    for spec in specs:
+        if spec.table in tables and spec not in missing and not is_covered(engine, spec):
+            missing.append(spec)
+    return missing
+
+
+def advise(engine: Engine, queries: Optional[Sequence[RepresentativeQuery]] = None) -> List[QueryReport]:
+    """
+    Ejecuta cada consulta bajo EXPLAIN. Un índice se propone si la consulta recorre su tabla por
+    completo o si no existe aunque el planificador haya encontrado otro camino (tablas vacías).
+    """
+    reports = []
+    for query in queries if queries is not None else representative_queries():
+        try:
+            plan, scans = explain(engine, query.build())
+        except Exception as exc:
+            reports.append(QueryReport(query, [], [], error=str(exc)))
+            continue
+        reports.append(QueryReport(query, plan, scans, missing=missing_indexes(engine, query.indexes)))
+    return reports
+
+
+def create_indexes(engine: Engine, specs: Iterable[IndexSpec]) -> List[IndexSpec]:
+    created = []
+    with engine.begin() as conn:
+        for spec in specs:
+            columns = ", ".join(spec.columns)
+            conn.exec_driver_sql(f"CREATE INDEX {spec.index_name} ON {spec.table} ({columns})")
+            created.append(spec)
+    return created
+
+
+# ---------------------------------------------------------------------------
+# Migración
+# ---------------------------------------------------------------------------
+MIGRATION_TEMPLATE = '''"""{message}
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {create_date}
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "{revision}"
+down_revision = {down_revision_literal}
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+{upgrade}
+
+
+def downgrade():
+{downgrade}
+'''
+
+
+def render_migration(
+    specs: Sequence[IndexSpec], down_revision: Optional[str], message: str = "add indexes suggested by index advisor"
+) -> Tuple[str, str]:
+    """Devuelve (revision, código de la migración Alembic) que crea ``specs``."""
+    revision = uuid.uuid4().hex[:12]
+    upgrade = [
+        f'    op.create_index("{s.index_name}", "{s.table}", [{", ".join(f"{c!r}" for c in s.columns)}])'.replace(
+            "'", '"'
+        )
+        for s in specs
+    ]
+    downgrade = [f'    op.drop_index("{s.index_name}", table_name="{s.table}")' for s in reversed(specs)]
+    source = MIGRATION_TEMPLATE.format(
+        message=message,
+        revision=revision,
+        down_revision=down_revision or "",
+        down_revision_literal=f'"{down_revision}"' if down_revision else "None",
+        create_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
+        upgrade="\n".join(upgrade) or "    pass",
+        downgrade="\n".join(downgrade) or "    pass",
+    )
+    return revision, source
+
+
+def summarize(reports: Iterable[QueryReport]) -> Dict[str, List[IndexSpec]]:
+    """Índices a crear, agrupados por tabla y sin duplicados entre consultas."""
+    grouped: Dict[str, List[IndexSpec]] = {}
+    for report in reports:
+        for spec in report.missing:
+            if spec not in grouped.setdefault(spec.table, []):
+                grouped[spec.table].append(spec)
+    return grouped
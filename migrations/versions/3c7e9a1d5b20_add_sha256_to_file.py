@@ -0,0 +1,26 @@
+"""add sha256 digest to file
+
+Revision ID: 3c7e9a1d5b20
+Revises: 8d9c4f2b31a9
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c7e9a1d5b20"
+down_revision = "8d9c4f2b31a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("file", sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.create_index(op.f("ix_file_sha256"), "file", ["sha256"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_file_sha256"), table_name="file")
+    op.drop_column("file", "sha256")
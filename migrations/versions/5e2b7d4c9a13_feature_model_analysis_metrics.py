@@ -0,0 +1,104 @@
+"""feature model analysis metrics
+
+Revision ID: 5e2b7d4c9a13
+Revises: 3c7e9a1d5b20
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5e2b7d4c9a13"
+down_revision = "3c7e9a1d5b20"
+branch_labels = None
+depends_on = None
+
+
+def _to_int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def upgrade():
+    with op.batch_alter_table("fm_metrics") as batch_op:
+        batch_op.add_column(sa.Column("checksum", sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column("number_of_features", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("number_of_constraints", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("max_depth", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("satisfiable", sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column("core_features", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("dead_features", sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column("number_of_configurations", sa.Numeric(precision=65, scale=0), nullable=True))
+        batch_op.add_column(sa.Column("configurations_log10", sa.Float(), nullable=True))
+        batch_op.add_column(
+            sa.Column("analysis_status", sa.String(length=16), nullable=False, server_default="pending")
+        )
+        batch_op.add_column(sa.Column("analysis_error", sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column("analysis_seconds", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("analyzed_at", sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f("ix_fm_metrics_checksum"), ["checksum"], unique=True)
+        batch_op.create_index(batch_op.f("ix_fm_metrics_number_of_features"), ["number_of_features"], unique=False)
+        batch_op.create_index(batch_op.f("ix_fm_metrics_satisfiable"), ["satisfiable"], unique=False)
+        batch_op.create_index(batch_op.f("ix_fm_metrics_configurations_log10"), ["configurations_log10"], unique=False)
+
+    # ds_metrics guardaba números como texto: se limpian los valores no numéricos antes de cambiar el tipo
+    conn = op.get_bind()
+    ds_metrics = sa.table(
+        "ds_metrics",
+        sa.column("id", sa.Integer),
+        sa.column("number_of_models", sa.String),
+        sa.column("number_of_features", sa.String),
+    )
+    for row in conn.execute(sa.select(ds_metrics)).fetchall():
+        conn.execute(
+            ds_metrics.update()
+            .where(ds_metrics.c.id == row.id)
+            .values(
+                number_of_models=_to_int(row.number_of_models),
+                number_of_features=_to_int(row.number_of_features),
+            )
+        )
+
+    with op.batch_alter_table("ds_metrics") as batch_op:
+        batch_op.alter_column(
+            "number_of_models", existing_type=sa.String(length=120), type_=sa.Integer(), existing_nullable=True
+        )
+        batch_op.alter_column(
+            "number_of_features", existing_type=sa.String(length=120), type_=sa.Integer(), existing_nullable=True
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("ds_metrics") as batch_op:
+        batch_op.alter_column(
+            "number_of_features", existing_type=sa.Integer(), type_=sa.String(length=120), existing_nullable=True
+        )
+        batch_op.alter_column(
+            "number_of_models", existing_type=sa.Integer(), type_=sa.String(length=120), existing_nullable=True
+        )
+
+    with op.batch_alter_table("fm_metrics") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_fm_metrics_configurations_log10"))
+        batch_op.drop_index(batch_op.f("ix_fm_metrics_satisfiable"))
+        batch_op.drop_index(batch_op.f("ix_fm_metrics_number_of_features"))
+        batch_op.drop_index(batch_op.f("ix_fm_metrics_checksum"))
+        for column in (
+            "analyzed_at",
+            "analysis_seconds",
+            "analysis_error",
+            "analysis_status",
+            "configurations_log10",
+            "number_of_configurations",
+            "dead_features",
+            "core_features",
+            "satisfiable",
+            "max_depth",
+            "number_of_constraints",
+            "number_of_features",
+            "checksum",
+        ):
+            batch_op.drop_column(column)
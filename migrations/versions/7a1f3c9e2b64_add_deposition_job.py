@@ -0,0 +1,46 @@
+"""add deposition_job table for background Zenodo publication
+
+Revision ID: 7a1f3c9e2b64
+Revises: 5e2b7d4c9a13
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7a1f3c9e2b64"
+down_revision = "5e2b7d4c9a13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "deposition_job",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("dataset_id", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("step", sa.String(length=20), nullable=False),
+        sa.Column("deposition_id", sa.Integer(), nullable=True),
+        sa.Column("uploaded_files", sa.JSON(), nullable=False),
+        sa.Column("doi", sa.String(length=120), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["dataset_id"], ["data_set.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+    op.create_index(op.f("ix_deposition_job_dataset_id"), "deposition_job", ["dataset_id"], unique=False)
+    op.create_index(op.f("ix_deposition_job_status"), "deposition_job", ["status"], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f("ix_deposition_job_status"), table_name="deposition_job")
+    op.drop_index(op.f("ix_deposition_job_dataset_id"), table_name="deposition_job")
+    op.drop_table("deposition_job")
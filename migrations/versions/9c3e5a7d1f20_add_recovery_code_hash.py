@@ -0,0 +1,56 @@
+"""add keyed hash lookup column to two-factor recovery codes
+
+Revision ID: 9c3e5a7d1f20
+Revises: 7a1f3c9e2b64
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+import logging
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9c3e5a7d1f20"
+down_revision = "7a1f3c9e2b64"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def _backfill():
+    from core.services.encryption import InvalidToken, decrypt_text, keyed_hash
+
+    bind = op.get_bind()
+    codes = sa.table(
+        "user_two_factor_recovery_code",
+        sa.column("id", sa.Integer),
+        sa.column("encrypted_code", sa.String),
+        sa.column("code_hash", sa.String),
+    )
+    try:
+        rows = bind.execute(sa.select(codes.c.id, codes.c.encrypted_code).where(codes.c.code_hash.is_(None))).fetchall()
+        for row_id, encrypted_code in rows:
+            try:
+                code_hash = keyed_hash(decrypt_text(encrypted_code).lower())
+            except InvalidToken:
+                continue
+            bind.execute(codes.update().where(codes.c.id == row_id).values(code_hash=code_hash))
+    except RuntimeError as exc:
+        # Sin clave de cifrado no se puede rellenar: los códigos se completan al usarse
+        logger.warning("Skipping recovery code backfill: %s", exc)
+
+
+def upgrade():
+    with op.batch_alter_table("user_two_factor_recovery_code") as batch_op:
+        batch_op.add_column(sa.Column("code_hash", sa.String(length=64), nullable=True))
+        batch_op.create_index("ix_recovery_code_user_id_code_hash", ["user_id", "code_hash"])
+    _backfill()
+
+
+def downgrade():
+    with op.batch_alter_table("user_two_factor_recovery_code") as batch_op:
+        batch_op.drop_index("ix_recovery_code_user_id_code_hash")
+        batch_op.drop_column("code_hash")
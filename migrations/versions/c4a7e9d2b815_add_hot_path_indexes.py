@@ -0,0 +1,52 @@
+"""add indexes on hot lookup paths (DOI, view/download records, foreign keys)
+
+Revision ID: c4a7e9d2b815
+Revises: 9c3e5a7d1f20
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4a7e9d2b815"
+down_revision = "9c3e5a7d1f20"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_ds_meta_data_dataset_doi", "ds_meta_data", ["dataset_doi"]),
+    ("ix_data_set_user_id_created_at", "data_set", ["user_id", "created_at"]),
+    ("ix_doi_mapping_dataset_doi_old_dataset_doi_new", "doi_mapping", ["dataset_doi_old", "dataset_doi_new"]),
+    ("ix_ds_view_record_dataset_id_view_cookie_user_id", "ds_view_record", ["dataset_id", "view_cookie", "user_id"]),
+    ("ix_file_view_record_file_id_view_cookie_user_id", "file_view_record", ["file_id", "view_cookie", "user_id"]),
+    (
+        "ix_file_download_record_file_id_download_cookie_user_id",
+        "file_download_record",
+        ["file_id", "download_cookie", "user_id"],
+    ),
+]
+
+# Columnas de clave foránea: InnoDB (MariaDB) ya crea un índice para cada FK, así que sólo hacen falta en SQLite
+SQLITE_FK_INDEXES = [
+    ("ix_feature_model_data_set_id", "feature_model", ["data_set_id"]),
+    ("ix_file_feature_model_id", "file", ["feature_model_id"]),
+    ("ix_author_ds_meta_data_id", "author", ["ds_meta_data_id"]),
+    ("ix_tabular_column_meta_id", "tabular_column", ["meta_id"]),
+]
+
+
+def _indexes():
+    if op.get_bind().dialect.name == "sqlite":
+        return INDEXES + SQLITE_FK_INDEXES
+    return INDEXES
+
+
+def upgrade():
+    for name, table, columns in _indexes():
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(_indexes()):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,28 @@
+"""add revision and updated_at to dataset
+
+Revision ID: d5b8f1a3c726
+Revises: c4a7e9d2b815
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d5b8f1a3c726"
+down_revision = "c4a7e9d2b815"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("data_set") as batch_op:
+        batch_op.add_column(sa.Column("revision", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("data_set") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("revision")
@@ -4,6 +4,7 @@ from flask.cli import with_appcontext
 from sqlalchemy import inspect
 
 from app import db
+from core.services.index_advisor import IndexSpec, create_indexes, missing_indexes
 
 
 @click.command(
@@ -33,25 +34,10 @@ def add_dataset_indexes():
                 conn.execute(stmt)
         click.echo(click.style("Added missing counter columns to data_set.", fg="yellow"))
 
-    # Refresh inspector after possible column changes
-    inspector = inspect(engine)
-    existing_indexes = {ix["name"] for ix in inspector.get_indexes("data_set")}
-    index_statements = []
-
-    if "ix_data_set_view_count" not in existing_indexes and "view_count" in {
-        col["name"] for col in inspector.get_columns("data_set")
-    }:
-        index_statements.append(sa.text("CREATE INDEX ix_data_set_view_count ON data_set (view_count)"))
-
-    if "ix_data_set_download_count" not in existing_indexes and "download_count" in {
-        col["name"] for col in inspector.get_columns("data_set")
-    }:
-        index_statements.append(sa.text("CREATE INDEX ix_data_set_download_count ON data_set (download_count)"))
-
-    if index_statements:
-        with engine.begin() as conn:
-            for stmt in index_statements:
-                conn.execute(stmt)
+    specs = [IndexSpec("data_set", ("view_count",)), IndexSpec("data_set", ("download_count",))]
+    created = create_indexes(engine, missing_indexes(engine, specs))
+    if created:
         click.echo(click.style("Created missing indexes for counter columns.", fg="green"))
     else:
         click.echo(click.style("Counter indexes already present.", fg="blue"))
+    click.echo("Run 'rosemary db:index-advisor' to check the remaining hot-path indexes.")
@@ -0,0 +1,27 @@
+import click
+from flask.cli import with_appcontext
+
+from app.modules.dataset.models import DataSet
+from app.modules.featuremodel.services import FMAnalysisService
+
+
+@click.command(
+    "featuremodel:analyze",
+    help="Computes flamapy metrics (features, constraints, SAT, configurations) for UVL datasets.",
+)
+@click.option("--dataset", "dataset_id", type=int, default=None, help="Analyze a single dataset.")
+@click.option("--force", is_flag=True, help="Recompute metrics already stored for a checksum.")
+@click.option("--time-budget", type=float, default=None, help="Seconds allowed per model.")
+@with_appcontext
+def analyze_feature_models(dataset_id, force, time_budget):
+    service = FMAnalysisService()
+    query = DataSet.query
+    if dataset_id is not None:
+        query = query.filter(DataSet.id == dataset_id)
+
+    datasets = query.all()
+    for dataset in datasets:
+        service.analyze_dataset(dataset, time_budget=time_budget, force=force)
+        metrics = dataset.ds_meta_data.ds_metrics
+        click.echo(f"dataset {dataset.id}: {metrics.number_of_models} models, {metrics.number_of_features} features")
+    click.echo(click.style(f"Analyzed {len(datasets)} dataset(s).", fg="green"))
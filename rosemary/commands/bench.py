@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import click
+
+from core.services.benchmark import CatalogSize, compare, default_scenarios, report, run_benchmarks, seed_catalog
+
+
+@click.command(
+    "bench",
+    help="Seeds a synthetic catalog into SQLite, benchmarks the main endpoints in-process (p50/p95 latency and "
+    "SQL queries per request) and fails when a stored baseline regresses.",
+)
+@click.option("--datasets", default=200, show_default=True, type=click.IntRange(min=1))
+@click.option("--authors", default=3, show_default=True, type=click.IntRange(min=0), help="Authors per dataset.")
+@click.option(
+    "--columns", default=16, show_default=True, type=click.IntRange(min=0), help="Columns per tabular dataset."
+)
+@click.option("--users", default=20, show_default=True, type=click.IntRange(min=1))
+@click.option("--follows", default=5, show_default=True, type=click.IntRange(min=0), help="Follows per user.")
+@click.option("--csv-rows", default=200, show_default=True, type=click.IntRange(min=1), help="Rows per uploaded CSV.")
+@click.option("--iterations", "-n", default=50, show_default=True, type=click.IntRange(min=1))
+@click.option("--warmup", default=5, show_default=True, type=click.IntRange(min=0))
+@click.option("--scenario", "-s", "only", multiple=True, help="Run only these scenarios (repeatable).")
+@click.option("--output", "-o", default=None, help="Write the results as JSON to this file.")
+@click.option("--baseline", "-b", default=None, help="Baseline JSON to compare against.")
+@click.option("--save-baseline", is_flag=True, help="Store the results as the new baseline instead of comparing.")
+@click.option("--tolerance", default=0.25, show_default=True, help="Allowed relative p95 increase.")
+@click.option("--query-tolerance", default=0, show_default=True, help="Allowed increase in queries per request.")
+@click.option(
+    "--no-latency",
+    is_flag=True,
+    help="Only gate on queries per request and errors (latency is too noisy on shared CI runners).",
+)
+def bench(
+    datasets,
+    authors,
+    columns,
+    users,
+    follows,
+    csv_rows,
+    iterations,
+    warmup,
+    only,
+    output,
+    baseline,
+    save_baseline,
+    tolerance,
+    query_tolerance,
+    no_latency,
+):
+    from app import create_app, db
+    from app.modules.dataset.services.doi_resolver import doi_resolver
+
+    scenarios = default_scenarios()
+    if only:
+        unknown = set(only) - {scenario.name for scenario in scenarios}
+        if unknown:
+            raise click.BadParameter(f"unknown scenario(s): {', '.join(sorted(unknown))}", param_hint="--scenario")
+        scenarios = [scenario for scenario in scenarios if scenario.name in only]
+    if save_baseline and not baseline:
+        raise click.UsageError("--save-baseline needs --baseline PATH")
+
+    size = CatalogSize(
+        datasets=datasets, authors=authors, columns=columns, users=users, follows=follows, csv_rows=csv_rows
+    )
+    app = create_app("benchmark")
+    uploads = tempfile.mkdtemp(prefix="fifahub-bench-")
+    app.config["UPLOAD_FOLDER"] = uploads
+    # Los ficheros sembrados (y los zips de descarga) salen de <uploads>/uploads/user_<id>/dataset_<id>
+    previous_working_dir = os.environ.get("WORKING_DIR")
+    os.environ["WORKING_DIR"] = uploads
+    try:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            click.echo(f"Seeding {datasets} datasets into {db.engine.url}...")
+            catalog = seed_catalog(db, size)
+            doi_resolver.invalidate()
+            db.session.remove()
+
+            results = run_benchmarks(app, catalog, scenarios, iterations=iterations, warmup=warmup)
+    finally:
+        if previous_working_dir is None:
+            os.environ.pop("WORKING_DIR", None)
+        else:
+            os.environ["WORKING_DIR"] = previous_working_dir
+        shutil.rmtree(uploads, ignore_errors=True)
+
+    document = report(results, size, iterations)
+    click.echo(f"{'scenario':<18}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'errors':>8}")
+    for name, row in document["scenarios"].items():
+        click.echo(f"{name:<18}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['queries']:>10}{row['errors']:>8}")
+
+    if output:
+        with open(output, "w") as fh:
+            json.dump(document, fh, indent=2)
+
+    if save_baseline:
+        with open(baseline, "w") as fh:
+            json.dump(document, fh, indent=2)
+        click.echo(click.style(f"Baseline written to {baseline}.", fg="green"))
+        return
+
+    if not baseline:
+        return
+    if not os.path.exists(baseline):
+        raise click.UsageError(f"baseline {baseline} does not exist (create it with --save-baseline)")
+    with open(baseline) as fh:
+        stored = json.load(fh)
+    if stored.get("catalog") != document["catalog"]:
+        click.echo(click.style("Warning: the baseline was recorded with a different catalog size.", fg="yellow"))
+
+    regressions = compare(
+        document, stored, tolerance=None if no_latency else tolerance, query_tolerance=query_tolerance
+    )
+    if not regressions:
+        click.echo(click.style("No regressions against the baseline.", fg="green"))
+        return
+    for regression in regressions:
+        click.echo(click.style(f"REGRESSION {regression}", fg="red"))
+    sys.exit(1)
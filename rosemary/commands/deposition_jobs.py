@@ -0,0 +1,24 @@
+import click
+from flask.cli import with_appcontext
+
+from app.modules.zenodo.services import DepositionJobService
+
+
+@click.command(
+    "zenodo:process-jobs",
+    help="Runs pending, retrying or abandoned Zenodo deposition jobs, resuming each at its last step.",
+)
+@click.option("--job", "job_id", type=int, default=None, help="Process a single job.")
+@with_appcontext
+def process_deposition_jobs(job_id):
+    service = DepositionJobService()
+    job_ids = [job_id] if job_id is not None else service.resumable_ids()
+
+    for current_id in job_ids:
+        job = service.process(current_id, reschedule=False)
+        if job is None:
+            click.echo(f"job {current_id}: taken by another worker or waiting for its retry")
+            continue
+        colour = "green" if job.status == "done" else "yellow"
+        click.echo(click.style(f"job {job.id} (dataset {job.dataset_id}): {job.status}/{job.step}", fg=colour))
+    click.echo(f"Processed {len(job_ids)} job(s).")
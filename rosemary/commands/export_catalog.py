@@ -0,0 +1,39 @@
+import sys
+
+import click
+from flask.cli import with_appcontext
+
+from app.modules.dataset.services import CatalogExporter
+from app.modules.dataset.services.catalog_export import parse_watermark
+
+
+@click.command(
+    "dataset:export",
+    help="Streams every dataset (metadata, authors, files, tabular schema) as NDJSON, optionally gzipped.",
+)
+@click.option("--output", "-o", default="-", help="Output file ('-' for stdout). A .gz suffix enables gzip.")
+@click.option("--gzip", "use_gzip", is_flag=True, help="Compress the output with gzip.")
+@click.option("--updated-since", default=None, help="Only datasets created or modified since this ISO 8601 date.")
+@click.option("--batch-size", default=500, show_default=True, type=click.IntRange(min=1))
+@with_appcontext
+def export_catalog(output, use_gzip, updated_since, batch_size):
+    try:
+        since = parse_watermark(updated_since)
+    except ValueError:
+        raise click.BadParameter("must be an ISO 8601 date", param_hint="--updated-since")
+
+    exporter = CatalogExporter(updated_since=since, batch_size=batch_size)
+    chunks = exporter.iter_gzip() if use_gzip or output.endswith(".gz") else exporter.iter_ndjson()
+
+    stream = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        for chunk in chunks:
+            stream.write(chunk)
+    finally:
+        if stream is not sys.stdout.buffer:
+            stream.close()
+        else:
+            stream.flush()
+
+    # A stderr para no mezclarse con el NDJSON cuando se escribe a stdout
+    click.echo(f"Exported {exporter.exported} dataset(s). Watermark: {exporter.watermark.isoformat()}Z", err=True)
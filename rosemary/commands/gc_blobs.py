@@ -0,0 +1,26 @@
+import click
+from flask.cli import with_appcontext
+
+from app.modules.hubfile.services import HubfileService
+
+
+@click.command(
+    "uploads:gc-blobs",
+    help="Removes blobs from uploads/blobs that no file or dataset version references anymore "
+    "(re-uploads release theirs immediately; this catches everything else).",
+)
+@click.option("--dry-run", is_flag=True, help="Only list the unreferenced blobs.")
+@with_appcontext
+def gc_blobs(dry_run):
+    service = HubfileService()
+
+    if dry_run:
+        referenced = service.referenced_sha256s()
+        orphans = [sha for sha in service.blob_store.iter_digests() if sha not in referenced]
+        for sha in orphans:
+            click.echo(sha)
+        click.echo(click.style(f"{len(orphans)} unreferenced blob(s).", fg="yellow"))
+        return
+
+    removed = service.collect_garbage()
+    click.echo(click.style(f"Removed {len(removed)} unreferenced blob(s).", fg="green"))
@@ -0,0 +1,66 @@
+import os
+
+import click
+from alembic.script import ScriptDirectory
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from core.services.index_advisor import advise, create_indexes, render_migration, summarize
+
+
+def _alembic_head():
+    migrate = current_app.extensions["migrate"]
+    script = ScriptDirectory.from_config(migrate.migrate.get_config(migrate.directory))
+    return script, script.get_current_head()
+
+
+@click.command(
+    "db:index-advisor",
+    help="Runs hot-path queries under EXPLAIN, reports full table scans and emits a migration with missing indexes.",
+)
+@click.option("--verbose", "-v", is_flag=True, help="Print the full query plan of every query.")
+@click.option("--dry-run", is_flag=True, help="Print the migration instead of writing it to migrations/versions.")
+@click.option("--apply", "apply_now", is_flag=True, help="Create the missing indexes directly (no migration).")
+@with_appcontext
+def index_advisor(verbose, dry_run, apply_now):
+    engine = db.engine
+    reports = advise(engine)
+
+    for report in reports:
+        if report.error:
+            click.echo(click.style(f"{report.query.name}: EXPLAIN failed ({report.error})", fg="red"))
+            continue
+        if report.full_scans:
+            status = click.style(f"full scan on {', '.join(report.full_scans)}", fg="yellow")
+        else:
+            status = click.style("indexed", fg="green")
+        click.echo(f"{report.query.name}: {status}")
+        for spec in report.missing:
+            click.echo(f"    missing {spec.index_name} ON {spec.table} ({', '.join(spec.columns)})")
+        if verbose:
+            for line in report.plan:
+                click.echo(f"    | {line}")
+
+    missing = [spec for specs in summarize(reports).values() for spec in specs]
+    if not missing:
+        click.echo(click.style("No missing indexes.", fg="green"))
+        return
+
+    if apply_now:
+        create_indexes(engine, missing)
+        click.echo(click.style(f"Created {len(missing)} index(es).", fg="green"))
+        return
+
+    script, head = _alembic_head()
+    revision, source = render_migration(missing, head)
+    if dry_run:
+        click.echo(source)
+        return
+
+    path = os.path.join(script.versions, f"{revision}_index_advisor.py")
+    with open(path, "w") as fh:
+        fh.write(source)
+    click.echo(
+        click.style(f"Wrote {path} with {len(missing)} index(es). Review it and run 'flask db upgrade'.", fg="green")
+    )